@@ -0,0 +1,3 @@
+"""
+Benchmarks for Multi-Fuel Dispenser System.
+"""
@@ -0,0 +1,45 @@
+"""
+Benchmark Dispenser.get_available_fuels against catalog size.
+
+Compares the maintained view with the full scan it replaced. A tenth of
+the catalog is out of stock, as on a busy multi-grade forecourt.
+
+Run with: python -m benchmarks.bench_available
+"""
+import timeit
+
+from mfd import Dispenser, Fuel
+
+CATALOG_SIZES = (2, 10, 100, 1_000, 10_000)
+REPEAT = 5
+
+
+def build_dispenser(fuels: int) -> Dispenser:
+    dispenser = Dispenser()
+    for index in range(fuels):
+        dispenser.add_fuel(Fuel(f"Grade {index}", 650.0, 0.0 if index % 10 == 9 else 1000.0))
+    return dispenser
+
+
+def full_scan(dispenser: Dispenser) -> dict:
+    # What get_available_fuels used to do on every call.
+    return {name: fuel for name, fuel in dispenser._fuels.items() if fuel.is_available()}
+
+
+def best(function, number: int) -> float:
+    return min(timeit.repeat(function, repeat=REPEAT, number=number)) / number
+
+
+def main():
+    print(f"{'fuels':>8} {'scan (us)':>12} {'view (us)':>12} {'speed-up':>10}")
+    for size in CATALOG_SIZES:
+        dispenser = build_dispenser(size)
+        number = max(10, 100_000 // size)
+        assert set(full_scan(dispenser)) == set(dispenser.get_available_fuels())
+        scan = best(lambda: full_scan(dispenser), number)
+        view = best(dispenser.get_available_fuels, 100_000)
+        print(f"{size:>8,} {scan * 1e6:>12.3f} {view * 1e6:>12.3f} {scan / view:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
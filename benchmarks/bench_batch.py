@@ -0,0 +1,59 @@
+"""
+dispense_batch throughput versus the single-sale methods in a loop.
+
+Run with: python -m benchmarks.bench_batch
+"""
+import time
+
+from mfd import DispenseRequest, Dispenser, FuelAttendant
+
+FUELS = ("Petrol", "Diesel", "Kerosene", "Gas")
+BATCH_SIZES = (10, 100, 1_000)
+SALES = 100_000
+
+
+def make_attendant() -> FuelAttendant:
+    attendant = FuelAttendant("Bench Attendant", Dispenser(thread_safe=True))
+    for fuel_name in FUELS:
+        attendant.add_fuel(fuel_name, 650.0, SALES * 20.0)
+    return attendant
+
+
+def make_requests(count: int) -> list:
+    return [
+        DispenseRequest(FUELS[i % len(FUELS)], liters=10.0) if i % 2
+        else DispenseRequest(FUELS[i % len(FUELS)], amount=6500.0)
+        for i in range(count)
+    ]
+
+
+def loop_rate(requests: list) -> float:
+    attendant = make_attendant()
+    start = time.perf_counter()
+    for request in requests:
+        if request.liters is not None:
+            attendant.dispense_by_liters(request.fuel_name, request.liters)
+        else:
+            attendant.dispense_by_amount(request.fuel_name, request.amount)
+    return len(requests) / (time.perf_counter() - start)
+
+
+def batch_rate(requests: list, batch_size: int) -> float:
+    attendant = make_attendant()
+    start = time.perf_counter()
+    for offset in range(0, len(requests), batch_size):
+        attendant.dispense_batch(requests[offset:offset + batch_size])
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main():
+    requests = make_requests(SALES)
+    baseline = loop_rate(requests)
+    print(f"{'single-sale loop':<22} {baseline:>12,.0f} sales/s")
+    for batch_size in BATCH_SIZES:
+        rate = batch_rate(requests, batch_size)
+        print(f"{f'batch of {batch_size}':<22} {rate:>12,.0f} sales/s ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
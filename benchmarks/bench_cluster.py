@@ -0,0 +1,50 @@
+"""
+Measure aggregate dispense throughput of a StationCluster as workers are added.
+
+Every round sends one dispense batch to each station; stations on different
+workers run in parallel, so throughput should grow with worker count up to
+the number of cores (os.cpu_count() is printed for reference).
+
+Run with: python -m benchmarks.bench_cluster
+"""
+import os
+import time
+
+from mfd import DispenseRequest
+from mfd.cluster import StationCluster
+
+STATIONS = 32
+BATCH_SIZE = 500
+ROUNDS = 20
+
+
+def run(workers: int) -> float:
+    with StationCluster(workers=workers) as cluster:
+        for number in range(STATIONS):
+            cluster.add_station(f"Station {number}", [("Petrol", 650.0, 1e12), ("Diesel", 700.0, 1e12)])
+        batch = [
+            DispenseRequest("Petrol" if index % 2 else "Diesel", liters=10.0)
+            for index in range(BATCH_SIZE)
+        ]
+        batches = {f"Station {number}": batch for number in range(STATIONS)}
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            cluster.dispense_batches(batches)
+        elapsed = time.perf_counter() - start
+        assert cluster.global_summary()["total_transactions"] == STATIONS * BATCH_SIZE * ROUNDS
+    return STATIONS * BATCH_SIZE * ROUNDS / elapsed
+
+
+def main():
+    cores = os.cpu_count() or 1
+    print(f"{STATIONS} stations, {BATCH_SIZE} sales per batch, {cores} cores")
+    print(f"{'workers':>8} {'sales/s':>12} {'speed-up':>9}")
+    baseline = None
+    for workers in sorted({1, 2, 4, cores}):
+        rate = run(workers)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12,.0f} {rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
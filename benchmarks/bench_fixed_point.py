@@ -0,0 +1,70 @@
+"""
+Price and total a million sales with floats, Decimal and fixed-point integers.
+
+Each engine charges every sale to the kobo and keeps running totals of
+volume and money, as get_transaction_summary does. The drift column is how
+far each engine's total is from the exact answer.
+
+Run with: python -m benchmarks.bench_fixed_point
+"""
+import random
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from mfd.units import cost_in_kobo, from_kobo
+
+SALES = 1_000_000
+PRICES_KOBO = (61_737, 70_019, 89_995)
+
+
+def float_engine(liters, prices):
+    total_liters = 0.0
+    total_amount = 0.0
+    for volume, price in zip(liters, prices):
+        total_liters += volume
+        total_amount += round(volume * price, 2)
+    return total_amount
+
+
+def decimal_engine(liters, prices):
+    kobo = Decimal("0.01")
+    total_liters = Decimal(0)
+    total_amount = Decimal(0)
+    for volume, price in zip(liters, prices):
+        total_liters += volume
+        total_amount += (volume * price).quantize(kobo, rounding=ROUND_HALF_UP)
+    return float(total_amount)
+
+
+def fixed_point_engine(milliliters, prices_kobo):
+    total_ml = 0
+    total_kobo = 0
+    for volume, price in zip(milliliters, prices_kobo):
+        total_ml += volume
+        total_kobo += cost_in_kobo(volume, price)
+    return from_kobo(total_kobo)
+
+
+def main():
+    generator = random.Random(42)
+    milliliters = [generator.randint(1_000, 50_000) for _ in range(SALES)]
+    prices_kobo = [generator.choice(PRICES_KOBO) for _ in range(SALES)]
+    exact = fixed_point_engine(milliliters, prices_kobo)
+
+    engines = (
+        ("float", float_engine, [v / 1000 for v in milliliters], [p / 100 for p in prices_kobo]),
+        ("Decimal", decimal_engine,
+         [Decimal(v).scaleb(-3) for v in milliliters], [Decimal(p).scaleb(-2) for p in prices_kobo]),
+        ("fixed-point", fixed_point_engine, milliliters, prices_kobo),
+    )
+    print(f"{SALES:,} sales")
+    print(f"{'engine':>12} {'seconds':>8} {'ns/sale':>8} {'drift (naira)':>14}")
+    for name, engine, volumes, prices in engines:
+        start = time.perf_counter()
+        total = engine(volumes, prices)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12} {elapsed:>8.3f} {elapsed / SALES * 1e9:>8.0f} {total - exact:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark stockout forecasting over months of sales history.
+
+Builds 20 stations, each with 90 days of one sale a minute spread over
+four fuels, then times a forecast refresh over the trailing 24 hours
+and hourly rolling rates over the whole history. A plain-Python pass
+over the same window is timed for comparison.
+
+Run with: python -m benchmarks.bench_forecast
+"""
+import timeit
+from datetime import datetime, timedelta
+
+from mfd import Dispenser, Fuel, FuelAttendant, Transaction
+from mfd.forecast import consumption_rates, forecast_stockouts
+
+STATIONS = 20
+DAYS = 90
+FUELS = ("Petrol", "Diesel", "Kerosene", "Gas")
+NOW = datetime(2024, 6, 1)
+REPEAT = 5
+
+
+def build_station() -> tuple:
+    dispenser = Dispenser()
+    for fuel_name in FUELS:
+        dispenser.add_fuel(Fuel(fuel_name, 650.0, 50_000.0))
+    attendant = FuelAttendant("Bench", dispenser)
+    first = NOW - timedelta(days=DAYS)
+    attendant._transactions.extend([
+        Transaction.from_fixed_point(
+            FUELS[minute % len(FUELS)], 20_000 + minute % 7 * 1000, 1_300_000, "liters", "Bench",
+            timestamp=first + timedelta(minutes=minute),
+        )
+        for minute in range(DAYS * 24 * 60)
+    ])
+    return dispenser, [attendant]
+
+
+def python_forecast(stations: dict) -> list:
+    start = NOW - timedelta(hours=24)
+    forecasts = []
+    for station_id, (dispenser, attendants) in stations.items():
+        sold = {}
+        for attendant in attendants:
+            for transaction in attendant.query_transactions(start=start, end=NOW):
+                key = transaction.fuel_name.lower()
+                sold[key] = sold.get(key, 0) + transaction.milliliters
+        for fuel in dispenser.get_all_fuels().values():
+            rate = sold.get(fuel.fuel_name.lower(), 0) / 24
+            hours = fuel.quantity_ml / rate if rate else None
+            forecasts.append((hours is None, hours, station_id, fuel.fuel_name))
+    return sorted(forecasts)
+
+
+def best(function, number: int) -> float:
+    return min(timeit.repeat(function, repeat=REPEAT, number=number)) / number
+
+
+def main():
+    stations = {f"Station {index}": build_station() for index in range(STATIONS)}
+    rows = STATIONS * DAYS * 24 * 60
+    print(f"{STATIONS} stations x {DAYS} days = {rows:,} sales\n")
+
+    vectorized = best(lambda: forecast_stockouts(stations, now=NOW), 20)
+    python = best(lambda: python_forecast(stations), 3)
+    print(f"24 h stockout forecast: {vectorized * 1e3:.2f} ms numpy, {python * 1e3:.2f} ms python")
+
+    attendants = [attendant for _, station in stations.values() for attendant in station]
+    rates = best(lambda: consumption_rates(attendants, end=NOW), 3)
+    print(f"hourly rolling rates over full history: {rates * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
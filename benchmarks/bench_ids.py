@@ -0,0 +1,94 @@
+"""
+Benchmark transaction ID generation and check IDs stay unique in parallel.
+
+Run with: python -m benchmarks.bench_ids
+"""
+import multiprocessing
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from mfd.ids import SnowflakeIdGenerator, format_transaction_id, use_node_id
+
+SINGLE_THREAD_IDS = 1_000_000
+WORKERS = 4
+IDS_PER_WORKER = 1_000_000
+
+
+def strftime_id() -> str:
+    return f"TXN{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+
+def rate(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def mint_in_process(node_id: int, count: int, queue):
+    # The process-wide generator, as Transactions use it; a forked worker
+    # has to be given its own node ID first.
+    generator = use_node_id(node_id)
+    queue.put(array("q", (generator.next_id() for _ in range(count))).tobytes())
+
+
+def check_threads() -> float:
+    generator = SnowflakeIdGenerator(node_id=1)
+    chunks = [None] * WORKERS
+
+    def mint(slot: int):
+        chunks[slot] = array("q", (generator.next_id() for _ in range(IDS_PER_WORKER)))
+
+    threads = [threading.Thread(target=mint, args=(slot,)) for slot in range(WORKERS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    minted = set()
+    for chunk in chunks:
+        minted.update(chunk)
+    assert len(minted) == WORKERS * IDS_PER_WORKER, "duplicate IDs across threads"
+    return WORKERS * IDS_PER_WORKER / elapsed
+
+
+def check_processes() -> float:
+    queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=mint_in_process, args=(node_id, IDS_PER_WORKER, queue))
+        for node_id in range(WORKERS)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    minted = set()
+    for _ in processes:
+        chunk = array("q")
+        chunk.frombytes(queue.get())
+        minted.update(chunk)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    assert len(minted) == WORKERS * IDS_PER_WORKER, "duplicate IDs across processes"
+    return WORKERS * IDS_PER_WORKER / elapsed
+
+
+def main():
+    generator = SnowflakeIdGenerator(node_id=0)
+    legacy = rate(strftime_id, SINGLE_THREAD_IDS)
+    snowflake = rate(generator.next_id, SINGLE_THREAD_IDS)
+    rendered = rate(lambda: format_transaction_id(generator.next_id()), SINGLE_THREAD_IDS)
+    print(f"strftime IDs/s:            {legacy:>12,.0f}")
+    print(f"snowflake IDs/s:           {snowflake:>12,.0f} ({snowflake / legacy:.1f}x)")
+    print(f"snowflake + render IDs/s:  {rendered:>12,.0f} ({rendered / legacy:.1f}x)")
+    print(f"{WORKERS} threads, {WORKERS * IDS_PER_WORKER:,} IDs, no duplicates: "
+          f"{check_threads():,.0f} IDs/s")
+    print(f"{WORKERS} processes, {WORKERS * IDS_PER_WORKER:,} IDs, no duplicates: "
+          f"{check_processes():,.0f} IDs/s")
+
+
+if __name__ == "__main__":
+    main()
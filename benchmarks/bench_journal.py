@@ -0,0 +1,56 @@
+"""
+Compare dispense throughput with no journal, group commit and fsync per write.
+
+Run with: python -m benchmarks.bench_journal
+"""
+import os
+import tempfile
+import time
+
+from mfd import Dispenser, FuelAttendant
+from mfd.journal import Journal
+
+SALES = 20_000
+FSYNC_PER_WRITE_SALES = 2_000
+
+
+def sales_per_second(journal, sales: int) -> float:
+    dispenser = Dispenser(journal=journal)
+    attendant = FuelAttendant("Bench Attendant", dispenser)
+    attendant.add_fuel("Petrol", 650.0, sales * 10.0)
+    start = time.perf_counter()
+    for _ in range(sales):
+        attendant.dispense_by_liters("Petrol", 10.0)
+    if journal is not None:
+        journal.sync()
+    return sales / (time.perf_counter() - start)
+
+
+def with_journal(directory: str, name: str, sales: int, **options) -> float:
+    journal = Journal(os.path.join(directory, name), **options)
+    try:
+        return sales_per_second(journal, sales)
+    finally:
+        journal.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "no journal": sales_per_second(None, SALES),
+            "group commit (batch 256, 50 ms)": with_journal(directory, "group.journal", SALES),
+            "group commit (batch 64, 5 ms)": with_journal(
+                directory, "small.journal", SALES, batch_size=64, sync_interval=0.005
+            ),
+            "fsync per write": with_journal(
+                directory, "fsync.journal", FSYNC_PER_WRITE_SALES,
+                batch_size=1, sync_interval=None,
+            ),
+        }
+    baseline = results["fsync per write"]
+    for label, rate in results.items():
+        print(f"{label:<34} {rate:>12,.0f} sales/s ({rate / baseline:>6.1f}x fsync per write)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+First-page latency and memory of the paged transaction listing.
+
+Run with: python -m benchmarks.bench_listing
+"""
+import time
+import tracemalloc
+
+from mfd import Dispenser, FuelAttendant
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+PAGE_SIZE = 20
+
+
+def build_attendant(transactions: int) -> FuelAttendant:
+    attendant = FuelAttendant("Bench Attendant", Dispenser())
+    attendant.add_fuel("Petrol", 650.0, transactions * 10.0)
+    for _ in range(transactions):
+        attendant.dispense_by_liters("Petrol", 10.0)
+    return attendant
+
+
+def measure(func) -> tuple:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    print(f"{'history':>10} {'first page (ms)':>16} {'peak (KiB)':>11} "
+          f"{'full list (ms)':>15} {'peak (KiB)':>11}")
+    for size in HISTORY_SIZES:
+        attendant = build_attendant(size)
+        page_time, page_peak = measure(lambda: attendant.list_transactions(PAGE_SIZE))
+        list_time, list_peak = measure(attendant.show_all_transactions)
+        print(f"{size:>10,} {page_time * 1e3:>16.3f} {page_peak / 1024:>11.1f} "
+              f"{list_time * 1e3:>15.1f} {list_peak / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the low-stock index against scanning the catalog.
+
+Reports the extra cost a watched fuel adds to each sale, the cost of
+finding the most urgent fuel, and the time to plan a restock run across
+100 stations where a few fuels per station are low.
+
+Run with: python -m benchmarks.bench_low_stock
+"""
+import timeit
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.low_stock import plan_restock
+
+CATALOG_SIZES = (10, 1_000, 10_000)
+STATIONS = 100
+REPEAT = 5
+
+
+def build_dispenser(fuels: int, watched: bool) -> Dispenser:
+    dispenser = Dispenser()
+    for index in range(fuels):
+        dispenser.add_fuel(Fuel(f"Grade {index}", 650.0, 1e9 if index else 1e12))
+        if watched:
+            dispenser.set_low_stock_threshold(f"Grade {index}", 1000.0 + index)
+    return dispenser
+
+
+def scan_most_urgent(dispenser: Dispenser, thresholds: dict) -> Fuel:
+    return min(
+        dispenser.get_all_fuels().values(),
+        key=lambda fuel: fuel.quantity / thresholds[fuel.fuel_name],
+    )
+
+
+def best(function, number: int) -> float:
+    return min(timeit.repeat(function, repeat=REPEAT, number=number)) / number
+
+
+def sale_cost(watched: bool) -> float:
+    attendant = FuelAttendant("Bench", build_dispenser(10, watched))
+    return best(lambda: attendant.dispense_by_liters("Grade 0", 10.0), 20_000)
+
+
+def main():
+    plain, indexed = sale_cost(False), sale_cost(True)
+    print(f"sale: {plain * 1e6:.2f} us unwatched, {indexed * 1e6:.2f} us watched\n")
+
+    print(f"{'fuels':>8} {'scan (us)':>12} {'index (us)':>12}")
+    for size in CATALOG_SIZES:
+        dispenser = build_dispenser(size, True)
+        thresholds = {f"Grade {index}": 1000.0 + index for index in range(size)}
+        scan = best(lambda: scan_most_urgent(dispenser, thresholds), max(5, 20_000 // size))
+        index = best(dispenser.low_stock.most_urgent, 100_000)
+        print(f"{size:>8,} {scan * 1e6:>12.2f} {index * 1e6:>12.3f}")
+
+    stations = {}
+    for number in range(STATIONS):
+        dispenser = build_dispenser(100, True)
+        for index in range(number % 5):
+            fuel = dispenser.get_fuel(f"Grade {index + 1}")
+            fuel.reduce_quantity(fuel.quantity - 500.0)
+        stations[f"Station {number}"] = dispenser
+    plan = best(lambda: plan_restock(stations, truck_liters=40_000.0), 100)
+    print(f"\nrestock plan for {STATIONS} stations x 100 fuels: {plan * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
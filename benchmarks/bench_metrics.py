@@ -0,0 +1,58 @@
+"""
+Benchmark what metering costs a sale, with metrics off and on.
+
+"bare" calls the sale body directly, which is what dispense_by_liters
+ran before metering existed; "off" is dispense_by_liters without a
+Metrics, which only adds a None check and one call; "on" records a
+counter, a latency histogram and sales totals. All three are timed
+interleaved, with and without thread-safe locking.
+
+Run with: python -m benchmarks.bench_metrics
+"""
+import timeit
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.metrics import Metrics
+
+SALES = 10_000
+REPEAT = 25
+
+
+def build_attendant(thread_safe: bool, metered: bool) -> FuelAttendant:
+    metrics = Metrics() if metered else None
+    dispenser = Dispenser(thread_safe=thread_safe, metrics=metrics)
+    dispenser.add_fuel(Fuel("Petrol", 650.0, 1e12))
+    return FuelAttendant("Bench", dispenser)
+
+
+def best_of(*functions) -> list:
+    # Interleaved, so a noisy neighbour slows every path alike.
+    times = [[] for _ in functions]
+    for _ in range(REPEAT):
+        for function, results in zip(functions, times):
+            results.append(timeit.timeit(function, number=SALES) / SALES)
+    return [min(results) for results in times]
+
+
+def main():
+    print(
+        f"{'mode':<12} {'bare (us)':>10} {'off (us)':>10} {'off cost':>9} "
+        f"{'on (us)':>10} {'on cost':>9}"
+    )
+    for thread_safe in (False, True):
+        plain = build_attendant(thread_safe, metered=False)
+        metered = build_attendant(thread_safe, metered=True)
+        bare, off, on = best_of(
+            lambda: plain._dispense_by_liters("Petrol", 10.0),
+            lambda: plain.dispense_by_liters("Petrol", 10.0),
+            lambda: metered.dispense_by_liters("Petrol", 10.0),
+        )
+        mode = "thread-safe" if thread_safe else "plain"
+        print(
+            f"{mode:<12} {bare * 1e6:>10.2f} {off * 1e6:>10.2f} {(off / bare - 1):>9.1%} "
+            f"{on * 1e6:>10.2f} {(on / bare - 1):>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
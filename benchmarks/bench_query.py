@@ -0,0 +1,64 @@
+"""
+Indexed transaction queries versus filtering the full history in Python.
+
+Run with: python -m benchmarks.bench_query
+"""
+import time
+from datetime import datetime, timedelta
+
+from mfd import Transaction
+from mfd.ledger import TransactionLedger
+
+HISTORY_SIZES = (10_000, 100_000, 1_000_000)
+FUELS = ("Petrol", "Diesel", "Kerosene", "Gas")
+DAY_START = datetime(2026, 3, 1)
+
+
+def build_ledger(size: int) -> TransactionLedger:
+    ledger = TransactionLedger()
+    step = timedelta(days=1) / size
+    for i in range(size):
+        ledger.append(
+            Transaction(
+                fuel_name=FUELS[i % len(FUELS)],
+                liters=10.0,
+                amount=6500.0,
+                transaction_type="by_liters" if i % 3 else "by_amount",
+                attendant_name="Bench Attendant",
+                timestamp=DAY_START + step * i,
+            )
+        )
+    return ledger
+
+
+def best_of(func, repeat: int = 3) -> tuple:
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    start, end = DAY_START.replace(hour=14), DAY_START.replace(hour=15)
+    print(f"{'history':>10} {'matches':>8} {'indexed (ms)':>13} {'full scan (ms)':>15}")
+    for size in HISTORY_SIZES:
+        ledger = build_ledger(size)
+        indexed, found = best_of(
+            lambda: list(ledger.query(start=start, end=end, fuel_name="Diesel"))
+        )
+        scanned, expected = best_of(
+            lambda: [
+                txn for txn in list(ledger)
+                if txn.fuel_name == "Diesel" and start <= txn.timestamp < end
+            ],
+            repeat=1,
+        )
+        assert found == expected
+        print(f"{size:>10,} {len(found):>8,} {indexed * 1e3:>13.2f} {scanned * 1e3:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
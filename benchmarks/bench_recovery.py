@@ -0,0 +1,54 @@
+"""
+Startup time: full journal replay versus snapshot plus journal tail.
+
+Run with: python -m benchmarks.bench_recovery
+"""
+import os
+import tempfile
+import time
+
+from mfd import FuelAttendant
+from mfd.journal import recover as replay_journal
+from mfd.snapshot import recover, take_snapshot
+
+HISTORY_SIZES = (10_000, 100_000, 300_000)
+TAIL = 1_000
+
+
+def build_history(directory: str, sales: int) -> tuple:
+    journal_path = os.path.join(directory, "station.journal")
+    snapshot_dir = os.path.join(directory, "snapshots")
+    os.makedirs(snapshot_dir)
+    dispenser, attendants, journal = recover(journal_path, snapshot_dir, sync_interval=None)
+    attendant = attendants["Bench Attendant"] = FuelAttendant("Bench Attendant", dispenser)
+    attendant.add_fuel("Petrol", 650.0, (sales + TAIL) * 10.0)
+    attendant.add_fuel("Diesel", 700.0, (sales + TAIL) * 10.0)
+    for i in range(sales):
+        attendant.dispense_by_liters("Petrol" if i % 2 else "Diesel", 10.0)
+    take_snapshot(snapshot_dir, dispenser, attendants, journal)
+    for i in range(TAIL):
+        attendant.dispense_by_liters("Petrol" if i % 2 else "Diesel", 10.0)
+    journal.close()
+    return journal_path, snapshot_dir
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    _, _, journal = func(*args, sync_interval=None)
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return elapsed
+
+
+def main():
+    print(f"{'history':>10} {'full replay (s)':>16} {'snapshot + tail (s)':>20}")
+    for sales in HISTORY_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path, snapshot_dir = build_history(directory, sales)
+            full = timed(replay_journal, journal_path)
+            fast = timed(recover, journal_path, snapshot_dir)
+        print(f"{sales:>10,} {full:>16.3f} {fast:>20.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark pump reservations with thousands of sessions open.
+
+For each count of open reservations, times a full pump session
+(reserve, then commit at the metered volume), a plain sale, and the
+expiry sweep every call makes. Open sessions expire through a timer
+wheel, so none of these should grow with the number open. A last run
+lets half of 100,000 reservations lapse at once.
+
+Run with: python -m benchmarks.bench_reservations
+"""
+import timeit
+
+from mfd import Dispenser, Fuel, FuelAttendant
+
+OPEN_COUNTS = (0, 1_000, 10_000, 100_000)
+SESSIONS = 10_000
+REPEAT = 5
+
+
+def build_attendant(thread_safe: bool = True) -> FuelAttendant:
+    dispenser = Dispenser(thread_safe=thread_safe)
+    dispenser.add_fuel(Fuel("Petrol", 650.0, 1e12))
+    dispenser.add_fuel(Fuel("Diesel", 700.0, 1e12))
+    return FuelAttendant("Bench", dispenser)
+
+
+def best(function, number: int) -> float:
+    return min(timeit.repeat(function, repeat=REPEAT, number=number)) / number
+
+
+def session(attendant: FuelAttendant):
+    reservation = attendant.reserve_by_liters("Petrol", 40.0)
+    attendant.commit_reservation(reservation.reservation_id, 32.5)
+
+
+def main():
+    print(
+        f"{'open':>8} {'session (us)':>13} {'sessions/s':>11} "
+        f"{'sale (us)':>10} {'sweep (us)':>11}"
+    )
+    for count in OPEN_COUNTS:
+        attendant = build_attendant()
+        for index in range(count):
+            # Spread over ten minutes, so some fall due during the run.
+            attendant.reserve_by_liters("Diesel", 10.0, timeout=60.0 + index % 600)
+        per_session = best(lambda: session(attendant), SESSIONS)
+        sale = best(lambda: attendant.dispense_by_liters("Petrol", 32.5), SESSIONS)
+        sweep = best(attendant.dispenser.expire_reservations, SESSIONS)
+        print(
+            f"{count:>8,} {per_session * 1e6:>13.2f} {1 / per_session:>11,.0f} "
+            f"{sale * 1e6:>10.2f} {sweep * 1e6:>11.2f}"
+        )
+
+    attendant = build_attendant()
+    dispenser = attendant.dispenser
+    for index in range(100_000):
+        attendant.reserve_by_liters("Diesel", 10.0, timeout=30.0 if index % 2 else 600.0)
+    now = dispenser.reservations.clock()
+    elapsed = timeit.timeit(lambda: dispenser.expire_reservations(now + 31.0), number=1)
+    print(f"\nexpiring 50,000 of 100,000 open: {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Load-test the asyncio station server with hundreds of pump connections.
+
+The server runs in its own process, on one core, as `python -m mfd.server`
+would; the load client runs here.
+
+Run with: python -m benchmarks.bench_server
+"""
+import asyncio
+import multiprocessing
+import socket
+
+from mfd.client import run_load
+from mfd.server import _main as serve
+
+CONNECTIONS = (10, 100, 500)
+REQUESTS_PER_CONNECTION = 50
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def run_server(port: int):
+    asyncio.run(serve("127.0.0.1", port))
+
+
+async def wait_for_server(port: int):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return
+    raise RuntimeError("station server did not start")
+
+
+def main():
+    port = free_port()
+    server = multiprocessing.Process(target=run_server, args=(port,), daemon=True)
+    server.start()
+    try:
+        asyncio.run(wait_for_server(port))
+        print(f"{'connections':>12} {'requests/s':>12} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        for connections in CONNECTIONS:
+            report = asyncio.run(
+                run_load("127.0.0.1", port, connections, REQUESTS_PER_CONNECTION)
+            )
+            assert report["errors"] == 0
+            print(f"{connections:>12} {report['requests_per_second']:>12,.0f} "
+                  f"{report['p50_ms']:>9.2f} {report['p99_ms']:>9.2f}")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare stock updates through shared memory with a Manager-served tank.
+
+Each pump process does check-and-reduce operations on one tank. With
+SharedInventory that is a slot lock plus two memory accesses; with a
+multiprocessing Manager every operation is a round trip over a pipe to
+the server process.
+
+Run with: python -m benchmarks.bench_shared_inventory
+"""
+import multiprocessing
+import time
+from multiprocessing.managers import BaseManager
+
+from mfd import Dispenser, Fuel
+from mfd.shared_inventory import SharedInventory
+
+OPERATIONS = 20_000
+PUMPS = (1, 4)
+
+
+class Tank:
+    def __init__(self, quantity: float):
+        self._quantity = quantity
+
+    def reduce(self, liters: float):
+        if liters > self._quantity:
+            raise ValueError("Insufficient fuel")
+        self._quantity -= liters
+
+    def quantity(self) -> float:
+        return self._quantity
+
+
+class TankManager(BaseManager):
+    pass
+
+
+TankManager.register("Tank", Tank)
+
+
+def shared_pump(inventory: SharedInventory, results):
+    dispenser = Dispenser(inventory=inventory)
+    fuel = dispenser.get_fuel("Petrol")
+    lock = dispenser.fuel_lock("Petrol")
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        with lock:
+            fuel.reduce_quantity(1.0)
+    results.put(time.perf_counter() - start)
+    inventory.close()
+
+
+def managed_pump(tank, results):
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        tank.reduce(1.0)
+    results.put(time.perf_counter() - start)
+
+
+def run_pumps(target, shared, pumps: int) -> float:
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=target, args=(shared, results)) for _ in range(pumps)]
+    for process in processes:
+        process.start()
+    seconds = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(seconds) / (pumps * OPERATIONS)
+
+
+def main():
+    print(f"{'backend':>10} {'pumps':>6} {'latency (us)':>13}")
+    for pumps in PUMPS:
+        stock = float(OPERATIONS * pumps)
+        with SharedInventory(capacity=1) as inventory:
+            Dispenser(inventory=inventory).add_fuel(Fuel("Petrol", 650.0, stock))
+            shared = run_pumps(shared_pump, inventory, pumps)
+            assert inventory.fuels()[0].quantity == 0.0
+        with TankManager() as manager:
+            tank = manager.Tank(stock)
+            managed = run_pumps(managed_pump, tank, pumps)
+            assert tank.quantity() == 0.0
+        print(f"{'shared':>10} {pumps:>6} {shared * 1e6:>13.2f}")
+        print(f"{'manager':>10} {pumps:>6} {managed * 1e6:>13.2f}  ({managed / shared:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
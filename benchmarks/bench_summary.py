@@ -0,0 +1,44 @@
+"""
+Benchmark FuelAttendant.get_transaction_summary against history size.
+
+Run with: python -m benchmarks.bench_summary
+"""
+import timeit
+
+from mfd import Dispenser, FuelAttendant
+
+HISTORY_SIZES = (100, 10_000, 1_000_000)
+FUELS = ("Petrol", "Diesel", "Kerosene", "Gas")
+REPEAT = 5
+NUMBER = 10_000
+
+
+def build_attendant(transactions: int) -> FuelAttendant:
+    attendant = FuelAttendant("Bench Attendant", Dispenser())
+    for fuel_name in FUELS:
+        attendant.add_fuel(fuel_name, 650.0, transactions * 50.0)
+    for i in range(transactions):
+        attendant.dispense_by_liters(FUELS[i % len(FUELS)], 10.0)
+    return attendant
+
+
+def time_summary(attendant: FuelAttendant) -> float:
+    timings = timeit.repeat(
+        attendant.get_transaction_summary, repeat=REPEAT, number=NUMBER
+    )
+    return min(timings) / NUMBER
+
+
+def main():
+    print(f"{'transactions':>14} {'summary (us)':>14}")
+    results = {}
+    for size in HISTORY_SIZES:
+        attendant = build_attendant(size)
+        results[size] = time_summary(attendant)
+        print(f"{size:>14,} {results[size] * 1e6:>14.3f}")
+    smallest, largest = results[HISTORY_SIZES[0]], results[HISTORY_SIZES[-1]]
+    print(f"\nratio {HISTORY_SIZES[-1]:,} / {HISTORY_SIZES[0]:,}: {largest / smallest:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
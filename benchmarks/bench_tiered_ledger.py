@@ -0,0 +1,85 @@
+"""
+Benchmark the tiered ledger against the all-in-memory ledger.
+
+Appends the same long history to both and reports resident memory
+(tracemalloc) after the load, append cost, bytes on disk, and the cost
+of a query over the last hour against one over a window that has long
+been sealed.
+
+Run with: python -m benchmarks.bench_tiered_ledger
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from mfd import Transaction
+from mfd.ledger import TransactionLedger
+from mfd.tiered_ledger import TieredLedger
+
+ROWS = 500_000
+BUDGET = 4 * 1024 * 1024
+FUELS = ("Petrol", "Diesel", "Kerosene", "Gas")
+START = datetime(2026, 1, 1)
+
+
+def transactions():
+    for i in range(ROWS):
+        yield Transaction.from_fixed_point(
+            FUELS[i % 4], 10_000 + i % 40 * 1000, 650_000 + i % 40 * 65_000,
+            "by_liters", "Bench", timestamp=START + timedelta(seconds=10 * i),
+        )
+
+
+def load(ledger) -> tuple:
+    tracemalloc.start()
+    began = time.perf_counter()
+    for transaction in transactions():
+        ledger.append(transaction)
+    elapsed = time.perf_counter() - began
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / ROWS, current, peak
+
+
+def time_query(ledger, start: datetime, end: datetime) -> tuple:
+    began = time.perf_counter()
+    count = sum(1 for _ in ledger.query(start=start, end=end))
+    return count, time.perf_counter() - began
+
+
+def main():
+    last = START + timedelta(seconds=10 * ROWS)
+    windows = (
+        ("last hour", last - timedelta(hours=1), last),
+        ("hour, day 2", START + timedelta(days=1), START + timedelta(days=1, hours=1)),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        ledgers = (
+            ("in-memory", TransactionLedger()),
+            ("tiered 4 MiB", TieredLedger(directory, memory_budget=BUDGET)),
+        )
+        print(f"{ROWS:,} transactions\n")
+        print(f"{'ledger':<14} {'append (us)':>12} {'resident (MiB)':>15} {'peak (MiB)':>11}")
+        for name, ledger in ledgers:
+            per_append, current, peak = load(ledger)
+            print(
+                f"{name:<14} {per_append * 1e6:>12.2f} {current / 2**20:>15.1f} "
+                f"{peak / 2**20:>11.1f}"
+            )
+
+        tiered = ledgers[1][1]
+        disk = sum(os.path.getsize(segment.path) for segment in tiered.segments)
+        print(
+            f"\n{len(tiered.segments)} segments, {tiered.sealed_rows:,} rows sealed, "
+            f"{disk / 2**20:.1f} MiB on disk ({disk / tiered.sealed_rows:.1f} B/row)\n"
+        )
+        for label, start, end in windows:
+            for name, ledger in ledgers:
+                count, elapsed = time_query(ledger, start, end)
+                print(f"query {label:<12} {name:<14} {count:>4} rows {elapsed * 1e3:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
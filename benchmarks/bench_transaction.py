@@ -0,0 +1,60 @@
+"""
+Benchmark building Transaction objects and the memory each one holds.
+
+Times construction through the float constructor and through
+from_fixed_point (the dispense path), each with the current time taken
+by the transaction; a supplied ID leaves out the ID generator's cost, then measures bytes per live instance with
+tracemalloc, before and after its timestamp has been read.
+
+Run with: python -m benchmarks.bench_transaction
+"""
+import timeit
+import tracemalloc
+
+from mfd import Transaction
+
+COUNT = 100_000
+REPEAT = 5
+
+
+def build_float() -> Transaction:
+    return Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+
+
+def build_fixed_point() -> Transaction:
+    return Transaction.from_fixed_point("Petrol", 10_000, 650_000, "by_liters", "John Doe")
+
+
+def build_with_id() -> Transaction:
+    return Transaction.from_fixed_point(
+        "Petrol", 10_000, 650_000, "by_liters", "John Doe", transaction_id=7
+    )
+
+
+def best(function) -> float:
+    return min(timeit.repeat(function, repeat=REPEAT, number=COUNT)) / COUNT
+
+
+def bytes_per_instance(read_timestamp: bool) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    transactions = [build_fixed_point() for _ in range(COUNT)]
+    if read_timestamp:
+        for transaction in transactions:
+            transaction.timestamp
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding them is not part of a transaction.
+    return (size - 8 * len(transactions)) / COUNT
+
+
+def main():
+    print(f"Transaction(...)             {best(build_float) * 1e9:>7.0f} ns")
+    print(f"Transaction.from_fixed_point {best(build_fixed_point) * 1e9:>7.0f} ns")
+    print(f"  with a supplied ID         {best(build_with_id) * 1e9:>7.0f} ns")
+    print(f"bytes per instance           {bytes_per_instance(False):>7.0f}")
+    print(f"  after reading timestamp    {bytes_per_instance(True):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
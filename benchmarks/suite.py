@@ -0,0 +1,230 @@
+"""
+Benchmark suite for the hot paths, with JSON results and regression checks.
+
+Times dispense_by_liters, dispense_by_amount, get_transaction_summary,
+Dispenser.get_available_fuels and Transaction.generate_receipt across
+history and fuel-catalog sizes, and records the memory each call keeps
+and its peak (tracemalloc). Only the standard library is used.
+
+    python -m benchmarks.suite run --output results.json
+    python -m benchmarks.suite compare baseline.json results.json --threshold 10
+
+compare exits with status 1 if any case slowed down by more than the
+threshold percentage; with --memory, memory kept per call is checked
+too. Ledger columns grow in amortized steps, so retained bytes of the
+dispense cases are lumpy on large histories. A full run takes a minute
+or two; --quick runs the smallest sizes only.
+
+Run with: python -m benchmarks.suite run
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from mfd import Dispenser, Fuel, FuelAttendant, Transaction
+
+HISTORY_SIZES = (1_000, 100_000)
+CATALOG_SIZES = (4, 100, 10_000)
+QUICK_HISTORY_SIZES = (1_000,)
+QUICK_CATALOG_SIZES = (4,)
+REPEAT = 7
+# Each timed repeat runs for at least this long.
+MIN_REPEAT_NS = 20_000_000
+MEMORY_CALLS = 1_000
+# Retained memory is only compared when it is at least this many
+# bytes per call.
+MIN_COMPARED_BYTES = 16
+
+
+def build_attendant(catalog: int, history: int) -> FuelAttendant:
+    """An attendant at a station with catalog fuels and history past sales."""
+    dispenser = Dispenser()
+    for index in range(catalog):
+        dispenser.add_fuel(Fuel(f"Grade {index}", 650.0 + index % 50, 1e12))
+    attendant = FuelAttendant("Bench Attendant", dispenser)
+    names = [f"Grade {index}" for index in range(min(catalog, 8))]
+    attendant._record_transactions([
+        Transaction.from_fixed_point(
+            names[index % len(names)], 10_000, 6_500_000, "by_liters", "Bench Attendant",
+            transaction_id=index + 1,
+        )
+        for index in range(history)
+    ])
+    return attendant
+
+
+def cases(history_sizes, catalog_sizes) -> Iterator[Tuple[str, Callable[[], Callable]]]:
+    """(name, setup) pairs; setup builds state and returns the call to time."""
+    for catalog in catalog_sizes:
+        for history in history_sizes:
+            params = f"catalog={catalog},history={history}"
+
+            def by_liters(catalog=catalog, history=history):
+                attendant = build_attendant(catalog, history)
+                return lambda: attendant.dispense_by_liters("Grade 0", 10.0)
+
+            def by_amount(catalog=catalog, history=history):
+                attendant = build_attendant(catalog, history)
+                return lambda: attendant.dispense_by_amount("Grade 0", 6500.0)
+
+            yield f"dispense_by_liters[{params}]", by_liters
+            yield f"dispense_by_amount[{params}]", by_amount
+
+    for history in history_sizes:
+        def summary(history=history):
+            return build_attendant(8, history).get_transaction_summary
+
+        yield f"get_transaction_summary[history={history}]", summary
+
+    for catalog in catalog_sizes:
+        def available(catalog=catalog):
+            return build_attendant(catalog, 0).dispenser.get_available_fuels
+
+        yield f"get_available_fuels[catalog={catalog}]", available
+
+    def receipt():
+        return Transaction("Petrol", 10.0, 6500.0, "by_liters", "Bench Attendant").generate_receipt
+
+    yield "generate_receipt", receipt
+
+
+def measure(call: Callable) -> dict:
+    timer = timeit.Timer(call, timer=time.perf_counter_ns)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= MIN_REPEAT_NS:
+            break
+        number *= max(2, min(10, MIN_REPEAT_NS // max(elapsed, 1)))
+    timings = [elapsed / number] + [
+        timer.timeit(number) / number for _ in range(REPEAT - 1)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for _ in range(MEMORY_CALLS):
+        call()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ns_per_op": min(timings),
+        "median_ns_per_op": statistics.median(timings),
+        "calls_per_repeat": number,
+        "retained_bytes_per_op": (current - before) / MEMORY_CALLS,
+        "peak_bytes": peak - before,
+    }
+
+
+def run(history_sizes, catalog_sizes, out=sys.stdout) -> dict:
+    results = {}
+    print(f"{'case':<56} {'ns/op':>12} {'retained B/op':>14}", file=out)
+    for name, setup in cases(history_sizes, catalog_sizes):
+        result = results[name] = measure(setup())
+        print(
+            f"{name:<56} {result['ns_per_op']:>12,.0f} {result['retained_bytes_per_op']:>14.1f}",
+            file=out,
+        )
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "history_sizes": list(history_sizes),
+            "catalog_sizes": list(catalog_sizes),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float, memory: bool = False
+) -> List[Tuple[str, str, float]]:
+    """(case, metric, percent change) for every regression past threshold percent."""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        checks = [("ns_per_op", base["ns_per_op"], result["ns_per_op"])]
+        base_bytes, new_bytes = base["retained_bytes_per_op"], result["retained_bytes_per_op"]
+        if memory and max(base_bytes, new_bytes) >= MIN_COMPARED_BYTES:
+            checks.append(("retained_bytes_per_op", base_bytes, new_bytes))
+        for metric, before, after in checks:
+            change = (after - before) / before * 100 if before > 0 else float("inf")
+            if change > threshold:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def print_comparison(baseline: dict, current: dict, out=sys.stdout):
+    print(f"{'case':<56} {'baseline ns':>12} {'current ns':>12} {'change':>8}", file=out)
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<56} {'-':>12} {result['ns_per_op']:>12,.0f} {'new':>8}", file=out)
+            continue
+        change = (result["ns_per_op"] - base["ns_per_op"]) / base["ns_per_op"] * 100
+        print(
+            f"{name:<56} {base['ns_per_op']:>12,.0f} {result['ns_per_op']:>12,.0f} "
+            f"{change:>+7.1f}%",
+            file=out,
+        )
+
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--output", "-o", help="file to write results to")
+    run_parser.add_argument("--quick", action="store_true", help="smallest sizes only")
+    compare_parser = commands.add_parser("compare", help="check results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=10.0,
+        help="percent slowdown or memory growth that counts as a regression (default 10)",
+    )
+    compare_parser.add_argument(
+        "--memory", action="store_true", help="also compare memory kept per call"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.quick:
+            results = run(QUICK_HISTORY_SIZES, QUICK_CATALOG_SIZES)
+        else:
+            results = run(HISTORY_SIZES, CATALOG_SIZES)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"\nresults written to {args.output}")
+        return 0
+
+    baseline, current = load(args.baseline), load(args.current)
+    print_comparison(baseline, current)
+    regressions = compare(baseline, current, args.threshold, args.memory)
+    if not regressions:
+        print(f"\nno regressions past {args.threshold:g}%")
+        return 0
+    print(f"\n{len(regressions)} regression(s) past {args.threshold:g}%:")
+    for name, metric, change in regressions:
+        print(f"  {name} {metric} {change:+.1f}%")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
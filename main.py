@@ -1,5 +1,14 @@
 
+import argparse
+import sys
+import tempfile
+from contextlib import ExitStack
+from datetime import datetime
+from typing import List, Optional
+
 from mfd import Dispenser, FuelAttendant
+from mfd.profiling import PROFILE_MODES, ActionTimings, profiled
+from mfd.replay import DEFAULT_ATTENDANT, Replayer, read_operations, tiered_ledgers, totals
 
 
 def display_menu():
@@ -137,19 +146,47 @@ def dispense_by_amount(attendant: FuelAttendant):
         print(f"Error: {e}")
 
 
+TRANSACTIONS_PAGE_SIZE = 10
+
+
+def parse_date(text: str) -> datetime:
+    for date_format in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{text}'. Use YYYY-MM-DD or YYYY-MM-DD HH:MM.")
+
+
 def show_all_transactions(attendant: FuelAttendant):
-    print("\n" + "-" * 60)
-    print("ALL TRANSACTIONS")
-    print("-" * 60)
-    transactions = attendant.show_all_transactions()
-    if not transactions:
-        print("No transactions recorded yet.")
-    else:
-        for i, txn in enumerate(transactions, 1):
+    cursor = None
+    while True:
+        print("\n" + "-" * 60)
+        print("ALL TRANSACTIONS")
+        print("-" * 60)
+        page = attendant.list_transactions(TRANSACTIONS_PAGE_SIZE, cursor)
+        if not page.transactions:
+            print("No transactions recorded yet." if page.position == 0 else "No more transactions.")
+        for i, txn in enumerate(page.transactions, page.position + 1):
             print(f"\n{i}. {txn}")
             print(f"   Date: {txn.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"   Type: {txn.transaction_type.replace('_', ' ').title()}")
-    print("-" * 60)
+        print("-" * 60)
+        if page.next_cursor is None and page.previous_cursor is None and page.position == 0:
+            return
+
+        choice = input("[n]ext, [p]revious, [d]ate, [q]uit: ").strip().lower()
+        if choice == "n" and page.next_cursor is not None:
+            cursor = page.next_cursor
+        elif choice == "p" and page.previous_cursor is not None:
+            cursor = page.previous_cursor
+        elif choice == "d":
+            try:
+                cursor = attendant.cursor_at(parse_date(input("Jump to date: ").strip()))
+            except ValueError as e:
+                print(f"Error: {e}")
+        elif choice in ("q", ""):
+            return
 
 
 def show_transaction_summary(attendant: FuelAttendant):
@@ -172,7 +209,19 @@ def show_transaction_summary(attendant: FuelAttendant):
     print("-" * 60)
 
 
-def main():
+MENU_ACTIONS = {
+    "1": display_available_fuels,
+    "2": add_new_fuel,
+    "3": update_fuel_price,
+    "4": restock_fuel,
+    "5": dispense_by_liters,
+    "6": dispense_by_amount,
+    "7": show_all_transactions,
+    "8": show_transaction_summary,
+}
+
+
+def run_session(timings: Optional[ActionTimings] = None):
     dispenser = Dispenser()
     attendant_name = input("Enter attendant name: ").strip()
     if not attendant_name:
@@ -192,22 +241,13 @@ def main():
         try:
             choice = input("\nEnter your choice (1-9): ").strip()
 
-            if choice == "1":
-                display_available_fuels(attendant)
-            elif choice == "2":
-                add_new_fuel(attendant)
-            elif choice == "3":
-                update_fuel_price(attendant)
-            elif choice == "4":
-                restock_fuel(attendant)
-            elif choice == "5":
-                dispense_by_liters(attendant)
-            elif choice == "6":
-                dispense_by_amount(attendant)
-            elif choice == "7":
-                show_all_transactions(attendant)
-            elif choice == "8":
-                show_transaction_summary(attendant)
+            action = MENU_ACTIONS.get(choice)
+            if action is not None:
+                if timings is None:
+                    action(attendant)
+                else:
+                    with timings.timed(action.__name__):
+                        action(attendant)
             elif choice == "9":
                 print("\nThank you for using MFDS. Goodbye!")
                 break
@@ -220,5 +260,103 @@ def main():
             print(f"\nUnexpected error: {e}")
 
 
+def run_replay(args: argparse.Namespace, timings: Optional[ActionTimings] = None) -> int:
+    dispenser = Dispenser()
+    with ExitStack() as stack:
+        # Sales are sealed to disk as they pile up, so memory stays flat
+        # however long the file.
+        ledger_dir = args.ledger_dir or stack.enter_context(
+            tempfile.TemporaryDirectory(prefix="mfd-replay-")
+        )
+        replayer = Replayer(
+            dispenser,
+            default_attendant=args.attendant,
+            ledger_factory=tiered_ledgers(ledger_dir),
+            timings=timings,
+        )
+        summary = replayer.run(
+            read_operations(args.path, args.format),
+            receipts=sys.stdout if args.receipts else None,
+            errors=sys.stderr,
+            max_errors=args.max_errors,
+        )
+        sales, liters, amount = totals(replayer.attendants.values())
+
+    print("\n" + "-" * 60)
+    print("REPLAY SUMMARY")
+    print("-" * 60)
+    rate = summary.operations / summary.elapsed if summary.elapsed else 0.0
+    print(f"Operations: {summary.operations} in {summary.elapsed:.2f}s ({rate:,.0f}/s)")
+    print(f"Applied: {summary.applied}")
+    print(f"Failed: {summary.failed}")
+    for op, (applied, failed) in sorted(summary.by_op.items()):
+        print(f"  • {op or 'unreadable'}: {applied} applied, {failed} failed")
+    print(f"Sales: {sales}, {liters:.2f}L, ₦{amount:.2f}")
+    print("\nFinal stock:")
+    for fuel in dispenser.get_all_fuels().values():
+        print(f"  • {fuel}")
+    print("-" * 60)
+    return 1 if summary.failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mfd", description="Multi-Fuel Dispenser System")
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help="profile the session: cpu (cProfile), mem (tracemalloc) or actions "
+        "(time per menu action only); the report is printed to stderr on exit. "
+        "Action times include time spent at the action's prompts.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="PATH",
+        help="also save the pstats file (cpu), tracemalloc snapshot (mem) "
+        "or timings report (actions) to PATH",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    replay = commands.add_parser(
+        "replay",
+        help="apply recorded operations from a file without prompts",
+        description="Apply operations from a JSON-lines or CSV file to an empty "
+        "dispenser. Each operation is an object (or CSV row) with an op of add_fuel, "
+        "update_price, restock, remove_fuel, dispense_by_liters or dispense_by_amount, "
+        "and fuel_name, liters, amount, price, quantity and attendant as the op needs. "
+        "Rejected lines are reported on stderr; the exit status is 1 if any were.",
+    )
+    replay.add_argument("path", help="operations file (.jsonl or .csv)")
+    replay.add_argument(
+        "--format", choices=("jsonl", "csv"), help="file format (default: from the extension)"
+    )
+    replay.add_argument("--receipts", action="store_true", help="print a receipt for every sale")
+    replay.add_argument(
+        "--attendant",
+        default=DEFAULT_ATTENDANT,
+        help="attendant for sales that do not name one (default: %(default)s)",
+    )
+    replay.add_argument(
+        "--ledger-dir",
+        metavar="DIR",
+        help="keep the replayed sales as ledger segments in DIR (default: a temporary directory)",
+    )
+    replay.add_argument(
+        "--max-errors",
+        type=int,
+        default=100,
+        metavar="N",
+        help="report at most N rejected lines; all are counted (default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    with profiled(args.profile, args.profile_output) as timings:
+        if args.command == "replay":
+            return run_replay(args, timings)
+        run_session(timings)
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
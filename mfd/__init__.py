@@ -1,8 +1,16 @@
 
 from mfd.dispenser import Dispenser
 from mfd.fuel import Fuel
-from mfd.fuel_attendant import FuelAttendant
+from mfd.fuel_attendant import DispenseRequest, DispenseResult, FuelAttendant, Nozzle
 from mfd.transaction import Transaction
 
 __version__ = "0.1.0"
-__all__ = ["Fuel", "Dispenser", "Transaction", "FuelAttendant"]
+__all__ = [
+    "Fuel",
+    "Dispenser",
+    "Transaction",
+    "FuelAttendant",
+    "DispenseRequest",
+    "DispenseResult",
+    "Nozzle",
+]
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import itertools
+import time
+from typing import List, Optional
+
+from mfd.server import encode_frame, read_frame
+
+
+class StationError(Exception):
+    pass
+
+
+class StationClient:
+    """Async client for StationServer; one request in flight at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "StationClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **arguments):
+        request_id = next(self._ids)
+        self._writer.write(encode_frame({"id": request_id, "op": op, **arguments}))
+        await self._writer.drain()
+        response = await read_frame(self._reader)
+        if response is None:
+            raise ConnectionError("Station server closed the connection")
+        if response.get("id") != request_id:
+            raise StationError(f"Response for request {response.get('id')}, expected {request_id}")
+        if "error" in response:
+            raise StationError(response["error"])
+        return response.get("result")
+
+    async def dispense_by_liters(self, attendant: str, fuel_name: str, liters: float) -> dict:
+        return await self.request(
+            "dispense_by_liters", attendant=attendant, fuel_name=fuel_name, liters=liters
+        )
+
+    async def dispense_by_amount(self, attendant: str, fuel_name: str, amount: float) -> dict:
+        return await self.request(
+            "dispense_by_amount", attendant=attendant, fuel_name=fuel_name, amount=amount
+        )
+
+    async def update_price(self, fuel_name: str, price: float):
+        await self.request("update_price", fuel_name=fuel_name, price=price)
+
+    async def restock(self, fuel_name: str, liters: float):
+        await self.request("restock", fuel_name=fuel_name, liters=liters)
+
+    async def summary(self, attendant: str) -> dict:
+        return await self.request("summary", attendant=attendant)
+
+    async def list_transactions(
+        self, attendant: str, page_size: int = 20, cursor: Optional[str] = None
+    ) -> dict:
+        return await self.request("list", attendant=attendant, page_size=page_size, cursor=cursor)
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_load(
+    host: str,
+    port: int,
+    connections: int = 200,
+    requests_per_connection: int = 100,
+    fuel_name: str = "Petrol",
+) -> dict:
+    """Drive many concurrent pump connections and report rate and latency."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def pump(number: int):
+        nonlocal errors
+        client = await StationClient.connect(host, port)
+        attendant = f"Pump {number}"
+        try:
+            for _ in range(requests_per_connection):
+                start = time.perf_counter()
+                try:
+                    await client.dispense_by_liters(attendant, fuel_name, 10.0)
+                except StationError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pump(number) for number in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test an MFDS station server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=100, help="requests per connection")
+    parser.add_argument("--fuel", default="Petrol")
+    args = parser.parse_args()
+    report = asyncio.run(
+        run_load(args.host, args.port, args.connections, args.requests, args.fuel)
+    )
+    print(f"requests:  {report['requests']:,} ({report['errors']:,} errors)")
+    print(f"rate:      {report['requests_per_second']:,.0f} requests/s")
+    print(f"latency:   p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
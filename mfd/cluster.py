@@ -0,0 +1,350 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from mfd import ids
+from mfd.dispenser import Dispenser
+from mfd.fuel import Fuel
+from mfd.fuel_attendant import DispenseRequest, FuelAttendant
+from mfd.units import from_kobo, from_milliliters, to_kobo, to_milliliters
+
+DEFAULT_ATTENDANT = "Default Attendant"
+
+# Node IDs held by the workers of this process's open clusters.
+_nodes_in_use: Set[int] = set()
+_nodes_lock = threading.Lock()
+
+
+class _Station:
+    def __init__(self):
+        self.dispenser = Dispenser()
+        self.attendants: Dict[str, FuelAttendant] = {}
+
+    def attendant(self, name: str) -> FuelAttendant:
+        attendant = self.attendants.get(name)
+        if attendant is None:
+            attendant = self.attendants[name] = FuelAttendant(name, self.dispenser)
+        return attendant
+
+
+class _Worker:
+    """Runs inside a worker process and owns the stations routed to it."""
+
+    def __init__(self):
+        self._stations: Dict[str, _Station] = {}
+
+    def _station(self, station_id: str) -> _Station:
+        station = self._stations.get(station_id)
+        if station is None:
+            raise ValueError(f"Station '{station_id}' not found")
+        return station
+
+    def add_station(self, station_id: str, fuels: List[Tuple[str, float, float]]):
+        if station_id in self._stations:
+            raise ValueError(f"Station '{station_id}' already exists")
+        station = _Station()
+        for fuel_name, price, quantity in fuels:
+            station.dispenser.add_fuel(Fuel(fuel_name, price, quantity))
+        self._stations[station_id] = station
+
+    def dispense_by_liters(self, station_id: str, attendant: str, fuel_name: str, liters: float):
+        station = self._station(station_id)
+        return station.attendant(attendant).dispense_by_liters(fuel_name, liters).to_dict()
+
+    def dispense_by_amount(self, station_id: str, attendant: str, fuel_name: str, amount: float):
+        station = self._station(station_id)
+        return station.attendant(attendant).dispense_by_amount(fuel_name, amount).to_dict()
+
+    def dispense_batch(self, station_id: str, attendant: str, requests: List[tuple]):
+        station = self._station(station_id)
+        results = station.attendant(attendant).dispense_batch(
+            DispenseRequest(*request) for request in requests
+        )
+        return [
+            (None, str(result.error)) if result.error is not None
+            else (result.transaction.to_dict(), None)
+            for result in results
+        ]
+
+    def station_summary(self, station_id: str):
+        station = self._station(station_id)
+        return {
+            name: attendant.get_transaction_summary()
+            for name, attendant in station.attendants.items()
+        }
+
+    def fuels(self, station_id: str):
+        return [
+            (fuel.fuel_name, fuel.price_per_liter, fuel.quantity)
+            for fuel in self._station(station_id).dispenser.get_all_fuels().values()
+        ]
+
+    def update_price_everywhere(self, fuel_name: str, new_price: float) -> int:
+        updated = 0
+        for station in self._stations.values():
+            if station.dispenser.has_fuel(fuel_name):
+                station.dispenser.update_fuel_price(fuel_name, new_price)
+                updated += 1
+        return updated
+
+    def restock_everywhere(self, fuel_name: str, liters: float) -> int:
+        restocked = 0
+        for station in self._stations.values():
+            if station.dispenser.has_fuel(fuel_name):
+                station.dispenser.restock_fuel(fuel_name, liters)
+                restocked += 1
+        return restocked
+
+    def summaries(self):
+        return {station_id: self.station_summary(station_id) for station_id in self._stations}
+
+
+# The only _Worker methods a coordinator may call.
+_WORKER_OPERATIONS = frozenset({
+    "add_station",
+    "dispense_by_liters",
+    "dispense_by_amount",
+    "dispense_batch",
+    "station_summary",
+    "fuels",
+    "update_price_everywhere",
+    "restock_everywhere",
+    "summaries",
+})
+
+
+def _worker_main(connection, node_id: int):
+    # Stamp this worker's sales with its own node ID, never its parent's.
+    ids.use_node_id(node_id)
+    worker = _Worker()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        # Every call gets a reply, whatever fails; a worker that died here
+        # would leave the coordinator waiting on its pipe.
+        try:
+            operation, arguments = message
+            if operation not in _WORKER_OPERATIONS:
+                raise ValueError(f"Unknown operation '{operation}'")
+            connection.send((True, getattr(worker, operation)(*arguments)))
+        except Exception as e:
+            connection.send((False, str(e) or type(e).__name__))
+    connection.close()
+
+
+def merge_summaries(summaries: Iterable[dict]) -> dict:
+    """Fold attendant summaries into one summary of the same shape.
+
+    Sums are taken in millilitres and kobo so merging never drifts.
+    """
+    count, milliliters, kobo = 0, 0, 0
+    by_fuel_type: Dict[str, List[int]] = {}
+    for summary in summaries:
+        count += summary["total_transactions"]
+        milliliters += to_milliliters(summary["total_liters"])
+        kobo += to_kobo(summary["total_amount"])
+        for fuel_name, stats in summary["by_fuel_type"].items():
+            total = by_fuel_type.setdefault(fuel_name, [0, 0, 0])
+            total[0] += to_milliliters(stats["liters"])
+            total[1] += to_kobo(stats["amount"])
+            total[2] += stats["count"]
+    return {
+        "total_transactions": count,
+        "total_liters": from_milliliters(milliliters),
+        "total_amount": from_kobo(kobo),
+        "by_fuel_type": {
+            fuel_name: {
+                "liters": from_milliliters(fuel_ml),
+                "amount": from_kobo(fuel_kobo),
+                "count": fuel_count,
+            }
+            for fuel_name, (fuel_ml, fuel_kobo, fuel_count) in by_fuel_type.items()
+        },
+    }
+
+
+def _claim_node_ids(workers: int, node_ids: Optional[Sequence[int]]) -> List[int]:
+    """Reserve one node ID per worker, or raise if they could collide."""
+    own = ids.get_id_generator()
+    taken = {own.node_id} if isinstance(own, ids.SnowflakeIdGenerator) else set()
+    with _nodes_lock:
+        taken |= _nodes_in_use
+        if node_ids is None:
+            free = (node_id for node_id in range(ids.MAX_NODE_ID + 1) if node_id not in taken)
+            node_ids = list(itertools.islice(free, workers))
+            if len(node_ids) < workers:
+                raise ValueError(f"Only {len(node_ids)} node IDs are free for {workers} workers")
+        else:
+            node_ids = list(node_ids)
+            if len(node_ids) != workers:
+                raise ValueError(f"Expected {workers} node IDs, got {len(node_ids)}")
+            if len(set(node_ids)) != len(node_ids):
+                raise ValueError("Worker node IDs must be distinct")
+            for node_id in node_ids:
+                if not 0 <= node_id <= ids.MAX_NODE_ID:
+                    raise ValueError(f"Node ID must be between 0 and {ids.MAX_NODE_ID}")
+                if node_id in taken:
+                    raise ValueError(f"Node ID {node_id} is already in use in this process")
+        _nodes_in_use.update(node_ids)
+    return node_ids
+
+
+class StationCluster:
+    """Hosts many stations across a pool of worker processes.
+
+    Each station lives in exactly one worker, chosen by a stable hash of
+    its ID, so stations on different workers dispense in parallel without
+    sharing a GIL. Fleet-wide operations are scattered to every worker at
+    once and the replies gathered.
+
+    Every worker mints transaction IDs under its own node ID: node_ids
+    when given, else the lowest IDs not used by this process or another
+    of its open clusters. Workers of clusters in other processes on the
+    same ledger need node_ids chosen to keep clear of them.
+    """
+
+    def __init__(self, workers: Optional[int] = None, node_ids: Optional[Sequence[int]] = None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("A cluster needs at least one worker")
+        self._node_ids = _claim_node_ids(workers, node_ids)
+        self._connections = []
+        self._processes = []
+        self._locks = []
+        for node_id in self._node_ids:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker_main, args=(child, node_id), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._locks.append(threading.Lock())
+
+    @property
+    def workers(self) -> int:
+        return len(self._processes)
+
+    @property
+    def node_ids(self) -> List[int]:
+        return list(self._node_ids)
+
+    def worker_for(self, station_id: str) -> int:
+        return zlib.crc32(station_id.encode("utf-8")) % len(self._connections)
+
+    def _call(self, worker: int, operation: str, *arguments):
+        with self._locks[worker]:
+            self._connections[worker].send((operation, arguments))
+            ok, result = self._connections[worker].recv()
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    def _scatter(self, calls: Dict[int, Tuple[str, tuple]]) -> Dict[int, object]:
+        """Send one call to each listed worker, then gather every reply."""
+        workers = sorted(calls)
+        for worker in workers:
+            self._locks[worker].acquire()
+        try:
+            for worker in workers:
+                self._connections[worker].send(calls[worker])
+            replies = {worker: self._connections[worker].recv() for worker in workers}
+        finally:
+            for worker in workers:
+                self._locks[worker].release()
+        for ok, result in replies.values():
+            if not ok:
+                raise ValueError(result)
+        return {worker: result for worker, (ok, result) in replies.items()}
+
+    def _broadcast(self, operation: str, *arguments) -> List[object]:
+        calls = {worker: (operation, arguments) for worker in range(self.workers)}
+        return list(self._scatter(calls).values())
+
+    def add_station(self, station_id: str, fuels: Iterable[Tuple[str, float, float]]):
+        self._call(self.worker_for(station_id), "add_station", station_id, list(fuels))
+
+    def dispense_by_liters(
+        self, station_id: str, fuel_name: str, liters: float, attendant: str = DEFAULT_ATTENDANT
+    ) -> dict:
+        return self._call(
+            self.worker_for(station_id), "dispense_by_liters", station_id, attendant, fuel_name, liters
+        )
+
+    def dispense_by_amount(
+        self, station_id: str, fuel_name: str, amount: float, attendant: str = DEFAULT_ATTENDANT
+    ) -> dict:
+        return self._call(
+            self.worker_for(station_id), "dispense_by_amount", station_id, attendant, fuel_name, amount
+        )
+
+    def dispense_batches(
+        self,
+        batches: Dict[str, List[DispenseRequest]],
+        attendant: str = DEFAULT_ATTENDANT,
+    ) -> Dict[str, list]:
+        """Run one dispense batch per station, all workers in parallel.
+
+        Returns, per station, a list of (transaction dict, error) pairs.
+        """
+        results: Dict[str, list] = {}
+        pending = dict(batches)
+        while pending:
+            # At most one call per worker per round keeps replies in order.
+            calls, stations = {}, {}
+            for station_id in list(pending):
+                worker = self.worker_for(station_id)
+                if worker in calls:
+                    continue
+                requests = [tuple(request) for request in pending.pop(station_id)]
+                calls[worker] = ("dispense_batch", (station_id, attendant, requests))
+                stations[worker] = station_id
+            for worker, reply in self._scatter(calls).items():
+                results[stations[worker]] = reply
+        return results
+
+    def fuels(self, station_id: str) -> List[Tuple[str, float, float]]:
+        return self._call(self.worker_for(station_id), "fuels", station_id)
+
+    def station_summary(self, station_id: str) -> dict:
+        summaries = self._call(self.worker_for(station_id), "station_summary", station_id)
+        return merge_summaries(summaries.values())
+
+    def update_price_everywhere(self, fuel_name: str, new_price: float) -> int:
+        """Change a fuel's price at every station that sells it."""
+        return sum(self._broadcast("update_price_everywhere", fuel_name, new_price))
+
+    def restock_everywhere(self, fuel_name: str, liters: float) -> int:
+        return sum(self._broadcast("restock_everywhere", fuel_name, liters))
+
+    def global_summary(self) -> dict:
+        by_station = {}
+        for worker_summaries in self._broadcast("summaries"):
+            for station_id, attendants in worker_summaries.items():
+                by_station[station_id] = merge_summaries(attendants.values())
+        summary = merge_summaries(by_station.values())
+        summary["by_station"] = by_station
+        return summary
+
+    def close(self):
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                connection.send(None)
+        for connection, process in zip(self._connections, self._processes):
+            process.join()
+            connection.close()
+        with _nodes_lock:
+            _nodes_in_use.difference_update(self._node_ids)
+        self._node_ids = []
+
+    def __enter__(self) -> "StationCluster":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,61 +1,418 @@
 
 
-from typing import Dict, Optional
+import threading
+from types import MappingProxyType
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterator, List, Mapping, Optional
 
+from mfd.errors import UnknownFuelError
 from mfd.fuel import Fuel
+from mfd.low_stock import LowStockIndex, StockThreshold
+from mfd.metrics import Metrics
+from mfd.pricing import PriceTable, PriceVersion
+from mfd.reservations import Reservation, ReservationBook
+from mfd.units import to_milliliters
+
+if TYPE_CHECKING:
+    from mfd.journal import Journal
+    from mfd.shared_inventory import SharedInventory
+
+_NO_LOCK = nullcontext()
+
+
+class FuelBinding:
+    """A fuel resolved once by name, with its lock.
+
+    removed is set when the fuel leaves the dispenser; it must be checked
+    with the lock held.
+    """
+
+    __slots__ = ("fuel", "key", "lock", "removed")
+
+    def __init__(self, fuel: Fuel, lock: ContextManager):
+        self.fuel = fuel
+        self.key = fuel.fuel_name.lower()
+        self.lock = lock
+        self.removed = False
 
 
 class Dispenser:
 
 
-    def __init__(self):
+    def __init__(
+        self,
+        thread_safe: bool = False,
+        journal: Optional["Journal"] = None,
+        inventory: Optional["SharedInventory"] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self._fuels: Dict[str, Fuel] = {}
+        self._journal = journal
+        # In thread-safe mode each fuel gets its own lock, so pumps selling
+        # different fuels never wait on each other. A shared inventory is
+        # always locked, with the slot locks it shares across processes.
+        self._inventory = inventory
+        self._thread_safe = thread_safe or inventory is not None
+        self._locks: Dict[str, ContextManager] = {}
+        self._catalog_lock = threading.Lock() if self._thread_safe else _NO_LOCK
+        # Sales price from an immutable PriceVersion read once, so a price
+        # change never lands halfway through a sale or batch.
+        self._prices = PriceTable()
+        # Fuels in stock, kept up to date by each Fuel's availability
+        # listener. It is replaced rather than mutated, so a view handed
+        # out never changes under a reader that is iterating it.
+        self._available: Mapping[str, Fuel] = MappingProxyType({})
+        self._available_lock = threading.Lock() if self._thread_safe else _NO_LOCK
+        self._low_stock = LowStockIndex(thread_safe=self._thread_safe)
+        self._bindings: Dict[str, FuelBinding] = {}
+        # Pump sessions hold stock on the Fuel without holding its lock.
+        self._reservations = ReservationBook(thread_safe=self._thread_safe)
+        self._metrics = metrics
+        if metrics is not None:
+            metrics.track(self.has_fuel)
+        if inventory is not None:
+            # Sales here mint IDs alongside the other processes' sales.
+            inventory.claim_node_id()
+            self._load_shared_fuels()
+
+    @property
+    def thread_safe(self) -> bool:
+        return self._thread_safe
+
+    @property
+    def journal(self) -> Optional["Journal"]:
+        return self._journal
+
+    def attach_journal(self, journal: "Journal"):
+        self._journal = journal
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        return self._metrics
+
+    @property
+    def inventory(self) -> Optional["SharedInventory"]:
+        return self._inventory
+
+    @property
+    def low_stock(self) -> LowStockIndex:
+        return self._low_stock
+
+    def set_low_stock_threshold(
+        self, fuel_name: str, liters: float, restock_to: Optional[float] = None
+    ):
+        """Flag fuel_name as low at or below liters; restock_to defaults to twice that."""
+        fuel = self.get_fuel(fuel_name)
+        if fuel is None:
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+        # Checked in millilitres: under half of one rounds to a zero
+        # threshold, which the index cannot rank against.
+        threshold_ml = to_milliliters(liters)
+        if threshold_ml <= 0:
+            raise ValueError("Low-stock threshold must be positive")
+        restock_ml = 2 * threshold_ml if restock_to is None else to_milliliters(restock_to)
+        if restock_ml < threshold_ml:
+            raise ValueError("Restock level cannot be below the low-stock threshold")
+        with self.fuel_lock(fuel_name):
+            threshold = StockThreshold(threshold_ml, restock_ml)
+            fuel.set_quantity_listener(self._low_stock.update)
+            self._low_stock.watch(fuel, threshold)
+
+    def clear_low_stock_threshold(self, fuel_name: str):
+        fuel = self.get_fuel(fuel_name)
+        if fuel is None:
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+        with self.fuel_lock(fuel_name):
+            fuel.set_quantity_listener(None)
+            self._low_stock.unwatch(fuel_name)
+
+    @property
+    def reservations(self) -> ReservationBook:
+        return self._reservations
+
+    def expire_reservations(self, now: Optional[float] = None) -> List[Reservation]:
+        """Release the stock of reservations past their deadline.
+
+        now is on the reservation clock (time.monotonic by default).
+        """
+        expired = self._reservations.take_expired(now)
+        for reservation in expired:
+            self._release(reservation)
+        return expired
+
+    def release_expired(self, fuel: Fuel, now: Optional[float] = None) -> List[Reservation]:
+        """Release the stock of fuel's reservations past their deadline.
+
+        Call with fuel's lock held, e.g. before a sale finds too little
+        unreserved stock.
+        """
+        expired = self._reservations.take_expired_of(fuel, now)
+        for reservation in expired:
+            fuel.release_milliliters(reservation.milliliters)
+        return expired
+
+    def cancel_reservation(self, reservation_id: int) -> bool:
+        reservation = self._reservations.take(reservation_id)
+        if reservation is None:
+            return False
+        self._release(reservation)
+        return True
+
+    def _release(self, reservation: Reservation):
+        # The fuel may have been removed since; its stock no longer matters.
+        lock = self._locks.get(reservation.fuel_name.lower(), _NO_LOCK)
+        with lock:
+            reservation.fuel.release_milliliters(reservation.milliliters)
+
+    @property
+    def prices(self) -> PriceTable:
+        return self._prices
+
+    def price_snapshot(self) -> PriceVersion:
+        """The price version in force now; take it once per sale or batch."""
+        version = self._prices.current()
+        if self._inventory is not None:
+            # Another process may have repriced a shared slot.
+            # Fuels another process has removed are left for the sale to reject.
+            changed = {
+                fuel.fuel_name: fuel.price_kobo
+                for name, fuel in self._fuels.items()
+                if not fuel.removed and version.prices.get(name) != fuel.price_kobo
+            }
+            if changed:
+                version = self._prices.publish(changed)
+        return version
+
+    def fuel_lock(self, fuel_name: str) -> ContextManager:
+        if not self._thread_safe:
+            return _NO_LOCK
+        lock = self._locks.get(fuel_name.lower())
+        if lock is None:
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+        return lock
+
+    def bind(self, fuel_name: str) -> FuelBinding:
+        """Resolve fuel_name once, for callers that sell it over and over.
+
+        Every call for the same fuel returns the same binding until the
+        fuel is removed.
+        """
+        fuel_name_lower = fuel_name.lower()
+        with self._catalog_lock:
+            if self._inventory is not None:
+                self._load_shared_fuels()
+            fuel = self._fuels.get(fuel_name_lower)
+            if fuel is None:
+                raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+            binding = self._bindings.get(fuel_name_lower)
+            if binding is None:
+                lock = self._locks[fuel_name_lower] if self._thread_safe else _NO_LOCK
+                binding = self._bindings[fuel_name_lower] = FuelBinding(fuel, lock)
+            return binding
+
+    @contextmanager
+    def locked(self) -> Iterator["Dispenser"]:
+        """Hold the catalog lock and every fuel lock, freezing all stock."""
+        with ExitStack() as stack:
+            stack.enter_context(self._catalog_lock)
+            for fuel_name in sorted(self._locks):
+                stack.enter_context(self._locks[fuel_name])
+            yield self
 
     def add_fuel(self, fuel: Fuel):
+        if self._metrics is not None:
+            return self._metrics.measure("add_fuel", fuel.fuel_name, self._add_fuel, fuel)
+        self._add_fuel(fuel)
 
+    def _add_fuel(self, fuel: Fuel):
         fuel_name_lower = fuel.fuel_name.lower()
-        if fuel_name_lower in self._fuels:
-            raise ValueError(f"Fuel '{fuel.fuel_name}' already exists in the dispenser")
-        self._fuels[fuel_name_lower] = fuel
+        with self._catalog_lock:
+            known = self._fuels.get(fuel_name_lower)
+            # A removed shared fuel's name is free again; the inventory
+            # rejects it if another process has taken it since.
+            if known is not None and not (self._inventory is not None and known.removed):
+                raise ValueError(f"Fuel '{fuel.fuel_name}' already exists in the dispenser")
+            if self._inventory is not None:
+                fuel = self._inventory.add(fuel)
+                self._locks[fuel_name_lower] = fuel.lock
+            elif self._thread_safe:
+                self._locks[fuel_name_lower] = threading.Lock()
+            self._fuels[fuel_name_lower] = fuel
+            fuel.set_price_listener(self._price_set)
+            if self._inventory is None:
+                fuel.set_availability_listener(self._availability_changed)
+                if fuel.is_available():
+                    self._availability_changed(fuel, True)
+            self._prices.update({fuel.fuel_name: fuel.price_kobo})
+            if self._journal is not None:
+                self._journal.log_add_fuel(fuel)
 
     def get_fuel(self, fuel_name: str) -> Optional[Fuel]:
 
-        return self._fuels.get(fuel_name.lower())
+        fuel = self._fuels.get(fuel_name.lower())
+        if self._inventory is not None and (fuel is None or fuel.removed):
+            # Another process may have added the fuel, or removed and
+            # added it again, since this dispenser last looked.
+            with self._catalog_lock:
+                self._load_shared_fuels()
+            fuel = self._fuels.get(fuel_name.lower())
+        return fuel
+
+    def _load_shared_fuels(self):
+        """Take in shared fuels this dispenser lacks or holds a removed view of."""
+        for fuel in self._inventory.fuels():
+            fuel_name_lower = fuel.fuel_name.lower()
+            known = self._fuels.get(fuel_name_lower)
+            if known is not None and not known.removed:
+                continue
+            binding = self._bindings.pop(fuel_name_lower, None)
+            if binding is not None:
+                binding.removed = True
+            self._fuels[fuel_name_lower] = fuel
+            self._locks[fuel_name_lower] = fuel.lock
+            fuel.set_price_listener(self._price_set)
+            self._prices.update({fuel.fuel_name: fuel.price_kobo})
 
     def get_all_fuels(self) -> Dict[str, Fuel]:
 
+        if self._inventory is not None:
+            with self._catalog_lock:
+                self._load_shared_fuels()
         return self._fuels.copy()
 
-    def get_available_fuels(self) -> Dict[str, Fuel]:
+    def get_available_fuels(self) -> Mapping[str, Fuel]:
+        """Read-only view of the fuels in stock, keyed by lowercased name."""
+        if self._inventory is not None:
+            # Shared tanks are drained and filled by other processes as well.
+            with self._catalog_lock:
+                self._load_shared_fuels()
+            return MappingProxyType({
+                name: fuel
+                for name, fuel in self._fuels.items()
+                if not fuel.removed and fuel.is_available()
+            })
+        return self._available
 
-        return {
-            name: fuel for name, fuel in self._fuels.items() if fuel.is_available()
-        }
+    def _availability_changed(self, fuel: Fuel, available: bool):
+        fuel_name_lower = fuel.fuel_name.lower()
+        with self._available_lock:
+            updated = dict(self._available)
+            if available:
+                updated[fuel_name_lower] = fuel
+            else:
+                updated.pop(fuel_name_lower, None)
+            self._available = MappingProxyType(updated)
 
     def update_fuel_price(self, fuel_name: str, new_price: float):
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "update_fuel_price", fuel_name, self._update_fuel_price, fuel_name, new_price
+            )
+        self._update_fuel_price(fuel_name, new_price)
 
+    def _update_fuel_price(self, fuel_name: str, new_price: float):
         fuel = self.get_fuel(fuel_name)
         if fuel is None:
-            raise ValueError(f"Fuel '{fuel_name}' not found in the dispenser")
-        fuel.price_per_liter = new_price
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+        if new_price < 0:
+            raise ValueError("Price per liter cannot be negative")
+        with self.fuel_lock(fuel_name):
+            fuel._set_price(new_price)
+            self._prices.update({fuel.fuel_name: fuel.price_kobo})
+            if self._journal is not None:
+                self._journal.log_price_update(fuel.fuel_name, new_price)
+
+    def _price_set(self, fuel: Fuel, new_price: float):
+        # fuel.price_per_liter = new_price on a fuel in this dispenser.
+        if self._fuels.get(fuel.fuel_name.lower()) is not fuel:
+            fuel._set_price(new_price)
+            return
+        self.update_fuel_price(fuel.fuel_name, new_price)
+
+    def update_fuel_prices(self, new_prices: Dict[str, float]) -> PriceVersion:
+        """Change several prices at once; sales see all of them or none."""
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "update_fuel_prices", "", self._update_fuel_prices, new_prices
+            )
+        return self._update_fuel_prices(new_prices)
+
+    def _update_fuel_prices(self, new_prices: Dict[str, float]) -> PriceVersion:
+        fuels = []
+        for fuel_name, new_price in new_prices.items():
+            fuel = self.get_fuel(fuel_name)
+            if fuel is None:
+                raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+            if new_price < 0:
+                raise ValueError("Price per liter cannot be negative")
+            fuels.append((fuel, new_price))
+        with ExitStack() as stack:
+            for fuel_name in sorted({fuel.fuel_name.lower() for fuel, _ in fuels}):
+                stack.enter_context(self.fuel_lock(fuel_name))
+            for fuel, new_price in fuels:
+                fuel._set_price(new_price)
+            version = self._prices.publish({fuel.fuel_name: fuel.price_kobo for fuel, _ in fuels})
+            if self._journal is not None:
+                for fuel, new_price in fuels:
+                    self._journal.log_price_update(fuel.fuel_name, new_price)
+        return version
 
     def restock_fuel(self, fuel_name: str, liters: float):
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "restock_fuel", fuel_name, self._restock_fuel, fuel_name, liters
+            )
+        self._restock_fuel(fuel_name, liters)
 
+    def _restock_fuel(self, fuel_name: str, liters: float):
         fuel = self.get_fuel(fuel_name)
         if fuel is None:
-            raise ValueError(f"Fuel '{fuel_name}' not found in the dispenser")
-        fuel.add_quantity(liters)
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found in the dispenser")
+        with self.fuel_lock(fuel_name):
+            fuel.add_quantity(liters)
+            if self._journal is not None:
+                self._journal.log_restock(fuel.fuel_name, liters)
 
     def remove_fuel(self, fuel_name: str) -> bool:
+        if self._metrics is not None:
+            return self._metrics.measure("remove_fuel", fuel_name, self._remove_fuel, fuel_name)
+        return self._remove_fuel(fuel_name)
 
+    def _remove_fuel(self, fuel_name: str) -> bool:
         fuel_name_lower = fuel_name.lower()
-        if fuel_name_lower in self._fuels:
-            del self._fuels[fuel_name_lower]
-            return True
-        return False
+        with self._catalog_lock:
+            if self._inventory is not None:
+                self._load_shared_fuels()
+            if fuel_name_lower in self._fuels:
+                fuel = self._fuels.pop(fuel_name_lower)
+                binding = self._bindings.pop(fuel_name_lower, None)
+                # Under the fuel lock, so no bound sale or settlement is
+                # halfway through.
+                with self.fuel_lock(fuel_name):
+                    if binding is not None:
+                        binding.removed = True
+                    for reservation in self._reservations.take_fuel(fuel):
+                        fuel.release_milliliters(reservation.milliliters)
+                if self._inventory is None:
+                    fuel.set_availability_listener(None)
+                    self._availability_changed(fuel, False)
+                fuel.set_quantity_listener(None)
+                fuel.set_price_listener(None)
+                self._low_stock.unwatch(fuel_name)
+                self._locks.pop(fuel_name_lower, None)
+                self._prices.update(removed=[fuel_name])
+                if self._inventory is not None:
+                    self._inventory.remove(fuel_name)
+                if self._journal is not None:
+                    self._journal.log_remove_fuel(fuel_name)
+                return True
+            return False
 
     def has_fuel(self, fuel_name: str) -> bool:
 
+        if self._inventory is not None:
+            fuel = self.get_fuel(fuel_name)
+            return fuel is not None and not fuel.removed
         return fuel_name.lower() in self._fuels
 
     def __str__(self) -> str:
@@ -0,0 +1,35 @@
+"""Why a dispensing operation was rejected.
+
+Each is a ValueError, so callers that catch ValueError are unaffected;
+outcome is the label Metrics counts the rejection under.
+"""
+
+
+class DispenseError(ValueError):
+    outcome = "rejected"
+
+
+class UnknownFuelError(DispenseError):
+    """The fuel is not in the dispenser, or has been removed from it."""
+
+    outcome = "unknown_fuel"
+
+
+class OutOfStockError(DispenseError):
+    outcome = "out_of_stock"
+
+
+class InsufficientFuelError(DispenseError):
+    outcome = "insufficient_fuel"
+
+
+class InvalidLitersError(DispenseError):
+    outcome = "invalid_liters"
+
+
+class AmountTooLowError(DispenseError):
+    outcome = "amount_too_low"
+
+
+class ReservationNotFoundError(DispenseError):
+    outcome = "no_reservation"
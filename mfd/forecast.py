@@ -0,0 +1,185 @@
+"""Consumption rates and stockout forecasts from sales history.
+
+Needs NumPy, which is optional: pip install "mfd[forecast]". Sales are
+read straight from each attendant's ledger columns and every station is
+forecast in one vectorized pass.
+"""
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from mfd.dispenser import Dispenser
+from mfd.fuel_attendant import FuelAttendant
+from mfd.ledger import from_micros, to_micros
+from mfd.units import MILLILITERS_PER_LITER
+
+if TYPE_CHECKING:
+    import numpy
+
+_HOUR = timedelta(hours=1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "mfd.forecast needs NumPy; install it with: pip install 'mfd[forecast]'"
+        ) from e
+    return numpy
+
+
+class StockoutForecast(NamedTuple):
+    station_id: str
+    fuel_name: str
+    quantity: float
+    liters_per_hour: float
+    # None when the fuel sold nothing during the window.
+    stockout_at: Optional[datetime]
+
+
+class ConsumptionSeries(NamedTuple):
+    """Rolling consumption, one row per fuel and one column per step."""
+
+    fuel_names: List[str]
+    # End of each step; column k covers the window ending at ends[k].
+    ends: List[datetime]
+    liters_per_hour: "numpy.ndarray"
+
+
+def _gather(
+    np, attendants: Iterable[FuelAttendant], keys: Dict[str, int], names: List[str], start, end
+):
+    """Concatenate (timestamps, fuel keys, millilitres) of the attendants' sales.
+
+    keys maps lowercased fuel names to indexes; a name met for the first
+    time gets the next index and its spelling is appended to names.
+    """
+    timestamps, fuel_keys, milliliters = [], [], []
+    for attendant in attendants:
+        stamps, volumes, codes, values = attendant._sales_columns(start, end)
+        if not stamps:
+            continue
+        for value in values:
+            if value.lower() not in keys:
+                keys[value.lower()] = len(keys)
+                names.append(value)
+        lookup = np.array([keys[value.lower()] for value in values], dtype=np.int64)
+        timestamps.append(np.frombuffer(stamps, dtype=np.int64))
+        fuel_keys.append(lookup[np.frombuffer(codes, dtype=codes.typecode)])
+        milliliters.append(np.frombuffer(volumes, dtype=np.int64))
+    if not timestamps:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(timestamps), np.concatenate(fuel_keys), np.concatenate(milliliters)
+
+
+def forecast_stockouts(
+    stations: Mapping[str, Tuple[Dispenser, Iterable[FuelAttendant]]],
+    window: timedelta = timedelta(hours=24),
+    now: Optional[datetime] = None,
+) -> List[StockoutForecast]:
+    """Predict when every fuel at every station runs dry, soonest first.
+
+    Each fuel's rate is what it sold over the trailing window; the
+    forecast assumes that rate holds until the tank is empty. Only the
+    rows inside the window are read, so the cost does not grow with
+    months of older history.
+    """
+    np = _numpy()
+    now = now or datetime.now()
+    start = now - window
+    start_micros, end_micros = to_micros(start), to_micros(now)
+
+    labels: List[Tuple[str, str]] = []
+    quantities: List[int] = []
+    parts = []
+    for station_id, (dispenser, attendants) in stations.items():
+        keys: Dict[str, int] = {}
+        names: List[str] = []
+        offset = len(labels)
+        for fuel in dispenser.get_all_fuels().values():
+            keys[fuel.fuel_name.lower()] = len(keys)
+            names.append(fuel.fuel_name)
+            labels.append((station_id, fuel.fuel_name))
+            quantities.append(fuel.quantity_ml)
+        stocked = len(keys)
+        timestamps, fuel_keys, milliliters = _gather(np, attendants, keys, names, start, now)
+        # Keep sales in the window of fuels the station still stocks.
+        keep = (
+            (timestamps >= start_micros) & (timestamps < end_micros)
+            & (fuel_keys < stocked)
+        )
+        parts.append((fuel_keys[keep] + offset, milliliters[keep]))
+
+    if not labels:
+        return []
+    fuel_keys = np.concatenate([keys for keys, _ in parts])
+    milliliters = np.concatenate([volumes for _, volumes in parts])
+    sold = np.bincount(fuel_keys, weights=milliliters, minlength=len(labels))
+    rates = sold / (window / _HOUR)
+    quantity = np.array(quantities, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hours_left = np.where(rates > 0, quantity / rates, np.inf)
+
+    forecasts = []
+    for index in np.argsort(hours_left, kind="stable"):
+        station_id, fuel_name = labels[index]
+        hours = hours_left[index]
+        forecasts.append(StockoutForecast(
+            station_id=station_id,
+            fuel_name=fuel_name,
+            quantity=quantities[index] / MILLILITERS_PER_LITER,
+            liters_per_hour=float(rates[index]) / MILLILITERS_PER_LITER,
+            stockout_at=None if np.isinf(hours) else now + timedelta(hours=float(hours)),
+        ))
+    return forecasts
+
+
+def consumption_rates(
+    attendants: Iterable[FuelAttendant],
+    step: timedelta = timedelta(hours=1),
+    window: timedelta = timedelta(hours=24),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> ConsumptionSeries:
+    """Rolling liters-per-hour for each fuel, sampled every step.
+
+    Sales are summed into step-sized buckets with one bincount, and each
+    rolling window is a difference of cumulative sums.
+    """
+    np = _numpy()
+    if step <= timedelta(0) or window < step:
+        raise ValueError("Step must be positive and no longer than the window")
+    keys: Dict[str, int] = {}
+    fuel_names: List[str] = []
+    timestamps, fuel_keys, milliliters = _gather(np, attendants, keys, fuel_names, start, end)
+
+    step_micros = step // _MICROSECOND
+    if start is not None:
+        first = to_micros(start)
+    else:
+        first = int(timestamps.min()) if len(timestamps) else 0
+    if end is not None:
+        last = to_micros(end)
+    else:
+        last = int(timestamps.max()) + 1 if len(timestamps) else first + 1
+    steps = max(1, -(-(last - first) // step_micros))
+    keep = (timestamps >= first) & (timestamps < last)
+    buckets = (timestamps[keep] - first) // step_micros
+    flat = fuel_keys[keep] * steps + buckets
+    totals = np.bincount(flat, weights=milliliters[keep], minlength=len(keys) * steps)
+    totals = totals.reshape(len(keys), steps)
+
+    cumulative = np.zeros((len(keys), steps + 1))
+    np.cumsum(totals, axis=1, out=cumulative[:, 1:])
+    width = window // step
+    ends = np.arange(1, steps + 1)
+    rolling = cumulative[:, ends] - cumulative[:, np.maximum(ends - width, 0)]
+    rates = rolling / MILLILITERS_PER_LITER / (width * step / _HOUR)
+
+    return ConsumptionSeries(
+        fuel_names=fuel_names,
+        ends=[from_micros(first + int(index) * step_micros) for index in ends],
+        liters_per_hour=rates,
+    )
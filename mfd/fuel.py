@@ -1,4 +1,17 @@
 
+from typing import Callable, Optional
+
+from mfd.errors import AmountTooLowError, InsufficientFuelError
+from mfd.units import (
+    cost_in_kobo,
+    from_kobo,
+    from_milliliters,
+    milliliters_for,
+    to_kobo,
+    to_milliliters,
+)
+
+
 class Fuel:
     def __init__(self, fuel_name: str, price_per_liter: float, quantity: float):
         if price_per_liter < 0:
@@ -9,8 +22,14 @@ class Fuel:
             raise ValueError("Fuel name cannot be empty")
 
         self._fuel_name = fuel_name.strip()
-        self._price_per_liter = price_per_liter
-        self._quantity = quantity
+        # Held as integer kobo and millilitres; see mfd.units.
+        self._price_kobo = to_kobo(price_per_liter)
+        self._quantity_ml = to_milliliters(quantity)
+        # Held for open pump reservations; still in the tank, but not for sale.
+        self._reserved_ml = 0
+        self._availability_listener: Optional[Callable[["Fuel", bool], None]] = None
+        self._quantity_listener: Optional[Callable[["Fuel"], None]] = None
+        self._price_listener: Optional[Callable[["Fuel", float], None]] = None
 
     @property
     def fuel_name(self) -> str:
@@ -18,47 +37,114 @@ class Fuel:
 
     @property
     def price_per_liter(self) -> float:
-        return self._price_per_liter
+        return from_kobo(self._price_kobo)
 
     @price_per_liter.setter
     def price_per_liter(self, new_price: float):
         if new_price < 0:
             raise ValueError("Price per liter cannot be negative")
-        self._price_per_liter = new_price
+        # A fuel in a dispenser is repriced through it, so sales priced
+        # from its price table see the change too.
+        if self._price_listener is not None:
+            self._price_listener(self, new_price)
+        else:
+            self._set_price(new_price)
+
+    def _set_price(self, new_price: float):
+        self._price_kobo = to_kobo(new_price)
+
+    @property
+    def price_kobo(self) -> int:
+        return self._price_kobo
 
     @property
     def quantity(self) -> float:
-        return self._quantity
+        return from_milliliters(self._quantity_ml)
+
+    @property
+    def quantity_ml(self) -> int:
+        return self._quantity_ml
+
+    @property
+    def reserved_ml(self) -> int:
+        return self._reserved_ml
+
+    @property
+    def unreserved_ml(self) -> int:
+        """Millilitres that can still be sold or reserved."""
+        return self._quantity_ml - self._reserved_ml
+
+    def reserve_milliliters(self, milliliters: int):
+        if milliliters > self.unreserved_ml:
+            raise InsufficientFuelError(
+                f"Insufficient fuel. Available: {from_milliliters(self.unreserved_ml)}L, "
+                f"Requested: {from_milliliters(milliliters)}L"
+            )
+        self._reserved_ml += milliliters
+
+    def release_milliliters(self, milliliters: int):
+        self._reserved_ml = max(self._reserved_ml - milliliters, 0)
+
+    def set_availability_listener(self, listener: Optional[Callable[["Fuel", bool], None]]):
+        """Call listener(fuel, available) whenever the quantity crosses zero."""
+        self._availability_listener = listener
+
+    def set_price_listener(self, listener: Optional[Callable[["Fuel", float], None]]):
+        """Hand price_per_liter changes to listener(fuel, new_price) instead of applying them."""
+        self._price_listener = listener
+
+    def set_quantity_listener(self, listener: Optional[Callable[["Fuel"], None]]):
+        """Call listener(fuel) after every change to the quantity."""
+        self._quantity_listener = listener
 
     def add_quantity(self, liters: float):
         if liters < 0:
             raise ValueError("Cannot add negative quantity")
-        self._quantity += liters
+        milliliters = to_milliliters(liters)
+        was_empty = self._quantity_ml == 0
+        self._quantity_ml += milliliters
+        if was_empty and milliliters and self._availability_listener is not None:
+            self._availability_listener(self, True)
+        if self._quantity_listener is not None:
+            self._quantity_listener(self)
 
     def reduce_quantity(self, liters: float):
         if liters < 0:
             raise ValueError("Cannot reduce negative quantity")
-        if liters > self._quantity:
-            raise ValueError(f"Insufficient fuel. Available: {self._quantity}L, Requested: {liters}L")
-        self._quantity -= liters
+        self.reduce_milliliters(to_milliliters(liters))
+
+    def reduce_milliliters(self, milliliters: int):
+        if milliliters > self._quantity_ml:
+            raise InsufficientFuelError(
+                f"Insufficient fuel. Available: {self.quantity}L, "
+                f"Requested: {from_milliliters(milliliters)}L"
+            )
+        self._quantity_ml -= milliliters
+        if not self._quantity_ml and milliliters and self._availability_listener is not None:
+            self._availability_listener(self, False)
+        if self._quantity_listener is not None:
+            self._quantity_listener(self)
 
     def calculate_cost(self, liters: float) -> float:
         if liters < 0:
             raise ValueError("Liters cannot be negative")
-        return liters * self._price_per_liter
+        return from_kobo(cost_in_kobo(to_milliliters(liters), self._price_kobo))
 
     def calculate_liters(self, amount: float) -> float:
         if amount < 0:
             raise ValueError("Amount cannot be negative")
-        if amount < self._price_per_liter:
-            raise ValueError(f"Amount must be at least ₦{self._price_per_liter} (price per liter)")
-        return amount / self._price_per_liter
+        kobo = to_kobo(amount)
+        if kobo < self._price_kobo:
+            raise AmountTooLowError(
+                f"Amount must be at least ₦{self.price_per_liter:.2f} (price per liter)"
+            )
+        return from_milliliters(milliliters_for(kobo, self._price_kobo))
 
     def is_available(self) -> bool:
-        return self._quantity > 0
+        return self._quantity_ml > 0
 
     def __str__(self) -> str:
-        return f"{self._fuel_name}: ₦{self._price_per_liter:.2f}/L, Available: {self._quantity:.2f}L"
+        return f"{self._fuel_name}: ₦{self.price_per_liter:.2f}/L, Available: {self.quantity:.2f}L"
 
     def __repr__(self) -> str:
-        return f"Fuel(name='{self._fuel_name}', price={self._price_per_liter}, quantity={self._quantity})"
+        return f"Fuel(name='{self._fuel_name}', price={self.price_per_liter}, quantity={self.quantity})"
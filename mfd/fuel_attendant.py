@@ -1,19 +1,86 @@
 
-from typing import List, Optional
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
 
-from mfd.dispenser import Dispenser
+from mfd.dispenser import Dispenser, FuelBinding
+from mfd.errors import (
+    AmountTooLowError,
+    InsufficientFuelError,
+    InvalidLitersError,
+    OutOfStockError,
+    ReservationNotFoundError,
+    UnknownFuelError,
+)
 from mfd.fuel import Fuel
+from mfd.ledger import TransactionLedger
+from mfd.metrics import Metrics, outcome_of
+from mfd.pricing import PriceVersion
+from mfd.reservations import DEFAULT_RESERVATION_TIMEOUT, Reservation
+from mfd.tiered_ledger import TieredLedger
 from mfd.transaction import Transaction
+from mfd.units import (
+    cost_in_kobo,
+    from_kobo,
+    from_milliliters,
+    milliliters_for,
+    to_kobo,
+    to_milliliters,
+)
+
+
+class TransactionPage(NamedTuple):
+    transactions: List[Transaction]
+    position: int
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+class DispenseRequest(NamedTuple):
+    fuel_name: str
+    liters: Optional[float] = None
+    amount: Optional[float] = None
+
+
+class DispenseResult(NamedTuple):
+    request: DispenseRequest
+    transaction: Optional[Transaction]
+    error: Optional[ValueError]
+
+
+def _check_liters(liters: float):
+    if liters < 1 or liters > 50:
+        raise InvalidLitersError("Liters must be between 1 and 50")
 
 
 class FuelAttendant:
-    def __init__(self, full_name: str, dispenser: Dispenser):
+    def __init__(
+        self,
+        full_name: str,
+        dispenser: Dispenser,
+        ledger: Optional[Union[TransactionLedger, TieredLedger]] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         if not full_name or not full_name.strip():
             raise ValueError("Attendant name cannot be empty")
 
         self._full_name = full_name.strip()
         self._dispenser = dispenser
-        self._transactions: List[Transaction] = []
+        # Pass a TieredLedger to keep memory bounded over a long history.
+        self._transactions = TransactionLedger() if ledger is None else ledger
+        self._transaction_count = 0
+        # Totals are integer millilitres and kobo, so they never drift;
+        # per fuel they are [millilitres, kobo, count].
+        self._total_ml = 0
+        self._total_kobo = 0
+        self._by_fuel_type: Dict[str, List[int]] = {}
+        self._record_lock = threading.Lock() if dispenser.thread_safe else nullcontext()
+        # Sales are metered into the dispenser's Metrics unless given others.
+        self._metrics = dispenser.metrics if metrics is None else metrics
+        if metrics is not None:
+            metrics.track(dispenser.has_fuel)
 
     @property
     def full_name(self) -> str:
@@ -27,7 +94,7 @@ class FuelAttendant:
         fuel = Fuel(fuel_name, price_per_liter, quantity)
         self._dispenser.add_fuel(fuel)
 
-    def get_available_fuels(self) -> dict:
+    def get_available_fuels(self) -> Mapping[str, Fuel]:
         return self._dispenser.get_available_fuels()
 
     def update_fuel_price(self, fuel_name: str, new_price: float):
@@ -39,104 +106,528 @@ class FuelAttendant:
     def dispense_by_liters(
         self, fuel_name: str, liters: float
     ) -> Optional[Transaction]:
-        if liters < 1 or liters > 50:
-            raise ValueError("Liters must be between 1 and 50")
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "dispense_by_liters", fuel_name, self._dispense_by_liters, fuel_name, liters
+            )
+        return self._dispense_by_liters(fuel_name, liters)
+
+    def _dispense_by_liters(self, fuel_name: str, liters: float) -> Transaction:
+        _check_liters(liters)
+
+        fuel = self._dispenser.get_fuel(fuel_name)
+        if fuel is None:
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found")
+
+        # The stock check and the deduction must happen under one lock, or
+        # two pumps could both pass the check and oversell the tank.
+        with self._dispenser.fuel_lock(fuel_name):
+            price_kobo = self._price_of(fuel_name, self._dispenser.price_snapshot())
+            milliliters, kobo = self._quote_by_liters(fuel, fuel_name, liters, price_kobo)
+            return self._complete_sale(fuel, milliliters, kobo, "by_liters")
+
+    def dispense_by_amount(
+        self, fuel_name: str, amount: float
+    ) -> Optional[Transaction]:
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "dispense_by_amount", fuel_name, self._dispense_by_amount, fuel_name, amount
+            )
+        return self._dispense_by_amount(fuel_name, amount)
 
+    def _dispense_by_amount(self, fuel_name: str, amount: float) -> Transaction:
         fuel = self._dispenser.get_fuel(fuel_name)
         if fuel is None:
-            raise ValueError(f"Fuel '{fuel_name}' not found")
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found")
+
+        with self._dispenser.fuel_lock(fuel_name):
+            price_kobo = self._price_of(fuel_name, self._dispenser.price_snapshot())
+            milliliters, kobo = self._quote_by_amount(fuel, fuel_name, amount, price_kobo)
+            return self._complete_sale(fuel, milliliters, kobo, "by_amount")
+
+    def dispense_batch(self, requests: Iterable[DispenseRequest]) -> List[DispenseResult]:
+        """Dispense many sales, resolving and locking each fuel only once.
+
+        Requests are grouped by fuel; each group is validated and applied
+        in request order under a single hold of that fuel's lock, and the
+        whole batch is priced from one price version. Results come back in
+        request order, with the error for any request that was rejected:
+        a ValueError, or a TypeError for a fuel name that is not a string
+        or a quantity that is not a number.
+        """
+        if self._metrics is None:
+            return self._dispense_batch(requests)
+        start = time.perf_counter_ns()
+        results = self._dispense_batch(requests)
+        self._metrics.record("dispense_batch", "", "ok", time.perf_counter_ns() - start)
+        for request, transaction, error in results:
+            if error is None:
+                self._metrics.record(
+                    "dispense_batch_request", request.fuel_name, "ok", sale=transaction
+                )
+            else:
+                self._metrics.record(
+                    "dispense_batch_request", request.fuel_name, outcome_of(error)
+                )
+        return results
 
+    def _dispense_batch(self, requests: Iterable[DispenseRequest]) -> List[DispenseResult]:
+        prices = self._dispenser.price_snapshot()
+        requests = list(requests)
+        results: List[Optional[DispenseResult]] = [None] * len(requests)
+        groups: Dict[str, List[int]] = {}
+        for index, request in enumerate(requests):
+            if not isinstance(request.fuel_name, str):
+                error = TypeError("Fuel name must be a string")
+                results[index] = DispenseResult(request, None, error)
+                continue
+            groups.setdefault(request.fuel_name.lower(), []).append(index)
+
+        for indices in groups.values():
+            fuel_name = requests[indices[0]].fuel_name
+            fuel = self._dispenser.get_fuel(fuel_name)
+            if fuel is None:
+                error = UnknownFuelError(f"Fuel '{fuel_name}' not found")
+                for index in indices:
+                    results[index] = DispenseResult(requests[index], None, error)
+                continue
+
+            with self._dispenser.fuel_lock(fuel_name):
+                price_kobo = prices.price_kobo(fuel_name)
+                # (index, millilitres, kobo, transaction type) per sale.
+                sold = []
+                # Whatever stops the group part way, the sales already
+                # taken from the tank are recorded and journaled.
+                try:
+                    for index in indices:
+                        request = requests[index]
+                        try:
+                            if (request.liters is None) == (request.amount is None):
+                                raise ValueError("Specify exactly one of liters or amount")
+                            if price_kobo is None:
+                                raise UnknownFuelError(f"Fuel '{fuel_name}' not found")
+                            if request.liters is not None:
+                                _check_liters(request.liters)
+                                milliliters, kobo = self._quote_by_liters(
+                                    fuel, fuel_name, request.liters, price_kobo
+                                )
+                                transaction_type = "by_liters"
+                            else:
+                                milliliters, kobo = self._quote_by_amount(
+                                    fuel, fuel_name, request.amount, price_kobo
+                                )
+                                transaction_type = "by_amount"
+                        except (ValueError, TypeError) as error:
+                            results[index] = DispenseResult(request, None, error)
+                            continue
+                        fuel.reduce_milliliters(milliliters)
+                        sold.append((index, milliliters, kobo, transaction_type))
+                finally:
+                    # The group is applied as one step, so its sales share a
+                    # timestamp and are recorded together.
+                    transactions = self._record_sales(
+                        fuel.fuel_name, [sale[1:] for sale in sold]
+                    )
+                    for (index, *_), transaction in zip(sold, transactions):
+                        results[index] = DispenseResult(requests[index], transaction, None)
+                    for transaction in transactions:
+                        self._log_dispense(transaction)
+        return results
+
+    @staticmethod
+    def _price_of(fuel_name: str, prices: PriceVersion) -> int:
+        price_kobo = prices.price_kobo(fuel_name)
+        if price_kobo is None:
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found")
+        return price_kobo
+
+    def _unreserved_ml(self, fuel: Fuel, milliliters: int) -> int:
+        # Expired holds are only swept when they stand in the way of a sale,
+        # so the common case never touches the reservation book.
+        if milliliters > fuel.unreserved_ml and fuel.reserved_ml:
+            self._dispenser.release_expired(fuel)
+        return fuel.unreserved_ml
+
+    def _quote_by_liters(
+        self, fuel: Fuel, fuel_name: str, liters: float, price_kobo: int
+    ) -> Tuple[int, int]:
+        """(millilitres, kobo) for a sale by volume; call with the fuel's lock held."""
         if not fuel.is_available():
-            raise ValueError(f"Fuel '{fuel_name}' is out of stock")
+            raise OutOfStockError(f"Fuel '{fuel_name}' is out of stock")
 
-        if liters > fuel.quantity:
-            raise ValueError(
-                f"Insufficient fuel. Available: {fuel.quantity:.2f}L, Requested: {liters}L"
+        milliliters = to_milliliters(liters)
+        if milliliters > self._unreserved_ml(fuel, milliliters):
+            raise InsufficientFuelError(
+                f"Insufficient fuel. Available: {from_milliliters(fuel.unreserved_ml):.2f}L, "
+                f"Requested: {liters}L"
             )
+        return milliliters, cost_in_kobo(milliliters, price_kobo)
 
-        amount = fuel.calculate_cost(liters)
-        fuel.reduce_quantity(liters)
+    def _quote_by_amount(
+        self, fuel: Fuel, fuel_name: str, amount: float, price_kobo: int
+    ) -> Tuple[int, int]:
+        """(millilitres, kobo) for a sale by amount; the charge never exceeds it."""
+        if not fuel.is_available():
+            raise OutOfStockError(f"Fuel '{fuel_name}' is out of stock")
 
-        transaction = Transaction(
-            fuel_name=fuel.fuel_name,
-            liters=liters,
-            amount=amount,
-            transaction_type="by_liters",
-            attendant_name=self._full_name,
-        )
-        self._transactions.append(transaction)
+        kobo = to_kobo(amount)
+        if kobo < price_kobo:
+            raise AmountTooLowError(
+                f"Amount must be at least ₦{from_kobo(price_kobo):.2f} (price per liter)"
+            )
+
+        milliliters = milliliters_for(kobo, price_kobo)
+        if milliliters > self._unreserved_ml(fuel, milliliters):
+            raise InsufficientFuelError(
+                f"Insufficient fuel. Available: {from_milliliters(fuel.unreserved_ml):.2f}L, "
+                f"Requested: {from_milliliters(milliliters):.2f}L (for ₦{amount:.2f})"
+            )
+        return milliliters, cost_in_kobo(milliliters, price_kobo)
+
+    def _complete_sale(
+        self, fuel: Fuel, milliliters: int, kobo: int, transaction_type: str
+    ) -> Transaction:
+        # Must be called with the fuel lock held.
+        fuel.reduce_milliliters(milliliters)
+        transaction = self._record_sales(fuel.fuel_name, [(milliliters, kobo, transaction_type)])[0]
+        self._log_dispense(transaction)
         return transaction
 
-    def dispense_by_amount(
-        self, fuel_name: str, amount: float
-    ) -> Optional[Transaction]:
+    def reserve_by_liters(
+        self, fuel_name: str, liters: float, timeout: float = DEFAULT_RESERVATION_TIMEOUT
+    ) -> Reservation:
+        """Authorize a pump for up to liters, holding that stock for timeout seconds.
+
+        The held stock cannot be sold to anyone else, but no lock is kept
+        while fuel flows; settle with commit_reservation() or
+        cancel_reservation(). The price is fixed when the pump is
+        authorized.
+        """
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "reserve_by_liters", fuel_name, self._reserve_by_liters, fuel_name, liters, timeout
+            )
+        return self._reserve_by_liters(fuel_name, liters, timeout)
+
+    def _reserve_by_liters(self, fuel_name: str, liters: float, timeout: float) -> Reservation:
+        _check_liters(liters)
+        fuel = self._fuel_for_reservation(fuel_name)
+        with self._dispenser.fuel_lock(fuel_name):
+            price_kobo = self._price_of(fuel_name, self._dispenser.price_snapshot())
+            milliliters, kobo = self._quote_by_liters(fuel, fuel_name, liters, price_kobo)
+            return self._dispenser.reservations.hold(
+                fuel, milliliters, price_kobo, kobo, "by_liters", timeout
+            )
+
+    def reserve_by_amount(
+        self, fuel_name: str, amount: float, timeout: float = DEFAULT_RESERVATION_TIMEOUT
+    ) -> Reservation:
+        """Authorize a pump for up to amount; see reserve_by_liters()."""
+        if self._metrics is not None:
+            return self._metrics.measure(
+                "reserve_by_amount", fuel_name, self._reserve_by_amount, fuel_name, amount, timeout
+            )
+        return self._reserve_by_amount(fuel_name, amount, timeout)
+
+    def _reserve_by_amount(self, fuel_name: str, amount: float, timeout: float) -> Reservation:
+        fuel = self._fuel_for_reservation(fuel_name)
+        with self._dispenser.fuel_lock(fuel_name):
+            price_kobo = self._price_of(fuel_name, self._dispenser.price_snapshot())
+            milliliters, kobo = self._quote_by_amount(fuel, fuel_name, amount, price_kobo)
+            return self._dispenser.reservations.hold(
+                fuel, milliliters, price_kobo, kobo, "by_amount", timeout
+            )
+
+    def _fuel_for_reservation(self, fuel_name: str) -> Fuel:
+        # Stale holds are swept first, so they never block a new pump.
+        self._dispenser.expire_reservations()
         fuel = self._dispenser.get_fuel(fuel_name)
         if fuel is None:
-            raise ValueError(f"Fuel '{fuel_name}' not found")
+            raise UnknownFuelError(f"Fuel '{fuel_name}' not found")
+        return fuel
 
-        if not fuel.is_available():
-            raise ValueError(f"Fuel '{fuel_name}' is out of stock")
+    def commit_reservation(self, reservation_id: int, liters: float) -> Optional[Transaction]:
+        """Settle a reservation at the metered volume, releasing the rest.
 
-        if amount < fuel.price_per_liter:
-            raise ValueError(
-                f"Amount must be at least ₦{fuel.price_per_liter:.2f} (price per liter)"
+        Charged at the authorized price, never more than was authorized.
+        Returns None when nothing was pumped.
+        """
+        if self._metrics is not None:
+            reservation = self._dispenser.reservations.get(reservation_id)
+            fuel_name = "" if reservation is None else reservation.fuel_name
+            return self._metrics.measure(
+                "commit_reservation", fuel_name, self._commit_reservation, reservation_id, liters
             )
+        return self._commit_reservation(reservation_id, liters)
 
-        liters = fuel.calculate_liters(amount)
-        if liters > fuel.quantity:
+    def _commit_reservation(self, reservation_id: int, liters: float) -> Optional[Transaction]:
+        self._dispenser.expire_reservations()
+        reservation = self._dispenser.reservations.get(reservation_id)
+        if reservation is None:
+            raise ReservationNotFoundError(f"Reservation {reservation_id} not found or expired")
+        if liters < 0:
+            raise ValueError("Metered liters cannot be negative")
+        milliliters = to_milliliters(liters)
+        if milliliters > reservation.milliliters:
             raise ValueError(
-                f"Insufficient fuel. Available: {fuel.quantity:.2f}L, "
-                f"Requested: {liters:.2f}L (for ₦{amount:.2f})"
+                f"Metered {liters}L exceeds the {reservation.liters:.2f}L reserved"
             )
-        actual_amount = fuel.calculate_cost(liters)
-        fuel.reduce_quantity(liters)
-
-        transaction = Transaction(
-            fuel_name=fuel.fuel_name,
-            liters=liters,
-            amount=actual_amount,
-            transaction_type="by_amount",
-            attendant_name=self._full_name,
-        )
-        self._transactions.append(transaction)
-        return transaction
+
+        fuel = reservation.fuel
+        with self._dispenser.fuel_lock(fuel.fuel_name):
+            # Expiry or another settlement may have closed it meanwhile.
+            if self._dispenser.reservations.take(reservation_id) is None:
+                raise ReservationNotFoundError(f"Reservation {reservation_id} not found or expired")
+            fuel.release_milliliters(reservation.milliliters)
+            if not milliliters:
+                return None
+            kobo = min(cost_in_kobo(milliliters, reservation.price_kobo), reservation.kobo)
+            return self._complete_sale(fuel, milliliters, kobo, reservation.transaction_type)
+
+    def cancel_reservation(self, reservation_id: int) -> bool:
+        return self._dispenser.cancel_reservation(reservation_id)
+
+    def nozzle(self, fuel_name: str) -> "Nozzle":
+        """A pump nozzle bound to one fuel, for repeated sales of it."""
+        return Nozzle(self, self._dispenser.bind(fuel_name))
 
     def show_all_transactions(self) -> List[Transaction]:
-        return self._transactions.copy()
+        with self._record_lock:
+            count = len(self._transactions)
+        return [self._transactions[row] for row in range(count)]
 
-    def get_transaction_summary(self) -> dict:
+    def iter_transactions(self, cursor: Optional[str] = None) -> Iterator[Transaction]:
+        """Lazily yield transactions in timestamp order, starting at cursor."""
+        position = self._decode_cursor(cursor)
+        while True:
+            with self._record_lock:
+                if position >= len(self._transactions):
+                    return
+                row = self._transactions.row_at_position(position)
+            yield self._transactions[row]
+            position += 1
+
+    def list_transactions(
+        self, page_size: int = 20, cursor: Optional[str] = None
+    ) -> TransactionPage:
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1")
+        position = self._decode_cursor(cursor)
+        with self._record_lock:
+            count = len(self._transactions)
+            rows = [
+                self._transactions.row_at_position(index)
+                for index in range(position, min(position + page_size, count))
+            ]
+        end = position + len(rows)
+        return TransactionPage(
+            transactions=[self._transactions[row] for row in rows],
+            position=position,
+            next_cursor=str(end) if end < count else None,
+            previous_cursor=str(max(position - page_size, 0)) if position > 0 else None,
+        )
+
+    def cursor_at(self, timestamp: datetime) -> str:
+        """Cursor for the first transaction at or after timestamp."""
+        with self._record_lock:
+            return str(self._transactions.time_position(timestamp))
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> int:
+        if cursor is None:
+            return 0
+        if not cursor.isdigit():
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        return int(cursor)
+
+    def query_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        fuel_name: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        min_liters: Optional[float] = None,
+        max_liters: Optional[float] = None,
+    ) -> Iterator[Transaction]:
+        with self._record_lock:
+            return self._transactions.query(
+                start=start,
+                end=end,
+                fuel_name=fuel_name,
+                transaction_type=transaction_type,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                min_liters=min_liters,
+                max_liters=max_liters,
+            )
+
+    def _sales_columns(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        # Copied under the lock: pumps keep appending to the live arrays.
+        with self._record_lock:
+            return self._transactions.sales_columns(start, end)
+
+    def _log_dispense(self, transaction: Transaction):
+        # Sales are logged and recorded under the fuel lock, so the journal
+        # sees each fuel's changes in the order they were applied and a
+        # snapshot taken with every fuel locked never splits a sale.
+        journal = self._dispenser.journal
+        if journal is not None:
+            journal.log_dispense(transaction)
+
+    def _record_sales(
+        self, fuel_name: str, sales: List[Tuple[int, int, str]]
+    ) -> List[Transaction]:
+        """Record (millilitres, kobo, transaction type) sales as transactions.
+
+        They are stamped under the record lock, so sales on different fuels
+        reach the ledger in time order and it never needs a time index.
+        """
+        with self._record_lock:
+            timestamp = datetime.now()
+            transactions = [
+                Transaction.from_fixed_point(
+                    fuel_name=fuel_name,
+                    milliliters=milliliters,
+                    kobo=kobo,
+                    transaction_type=transaction_type,
+                    attendant_name=self._full_name,
+                    timestamp=timestamp,
+                )
+                for milliliters, kobo, transaction_type in sales
+            ]
+            self._transactions.extend(transactions)
+            for transaction in transactions:
+                self._add_to_totals(transaction)
+        return transactions
+
+    def _record_transaction(self, transaction: Transaction):
+        with self._record_lock:
+            self._transactions.append(transaction)
+            self._add_to_totals(transaction)
 
-        if not self._transactions:
+    def _record_transactions(self, transactions: List[Transaction]):
+        with self._record_lock:
+            self._transactions.extend(transactions)
+            for transaction in transactions:
+                self._add_to_totals(transaction)
+
+    def _add_to_totals(self, transaction: Transaction):
+        milliliters = transaction._milliliters
+        kobo = transaction._kobo
+        self._transaction_count += 1
+        self._total_ml += milliliters
+        self._total_kobo += kobo
+
+        stats = self._by_fuel_type.get(transaction.fuel_name)
+        if stats is None:
+            stats = self._by_fuel_type[transaction.fuel_name] = [0, 0, 0]
+        stats[0] += milliliters
+        stats[1] += kobo
+        stats[2] += 1
+
+    def get_transaction_summary(self) -> dict:
+        # Totals are maintained by _record_transaction, so this is
+        # O(number of fuel types) rather than O(number of transactions).
+        with self._record_lock:
             return {
-                "total_transactions": 0,
-                "total_liters": 0.0,
-                "total_amount": 0.0,
-                "by_fuel_type": {},
+                "total_transactions": self._transaction_count,
+                "total_liters": from_milliliters(self._total_ml),
+                "total_amount": from_kobo(self._total_kobo),
+                "by_fuel_type": {
+                    fuel_name: {
+                        "liters": from_milliliters(milliliters),
+                        "amount": from_kobo(kobo),
+                        "count": count,
+                    }
+                    for fuel_name, (milliliters, kobo, count) in self._by_fuel_type.items()
+                },
             }
 
-        total_liters = sum(txn.liters for txn in self._transactions)
-        total_amount = sum(txn.amount for txn in self._transactions)
-
-        by_fuel_type = {}
-        for txn in self._transactions:
-            fuel_name = txn.fuel_name
-            if fuel_name not in by_fuel_type:
-                by_fuel_type[fuel_name] = {"liters": 0.0, "amount": 0.0, "count": 0}
-            by_fuel_type[fuel_name]["liters"] += txn.liters
-            by_fuel_type[fuel_name]["amount"] += txn.amount
-            by_fuel_type[fuel_name]["count"] += 1
-
-        return {
-            "total_transactions": len(self._transactions),
-            "total_liters": total_liters,
-            "total_amount": total_amount,
-            "by_fuel_type": by_fuel_type,
-        }
+    def _restore_summary(self, summary: dict):
+        # Loads totals saved by a snapshot; transactions older than the
+        # snapshot are not replayed into the ledger.
+        with self._record_lock:
+            self._transaction_count = summary["total_transactions"]
+            self._total_ml = to_milliliters(summary["total_liters"])
+            self._total_kobo = to_kobo(summary["total_amount"])
+            self._by_fuel_type = {
+                fuel_name: [
+                    to_milliliters(stats["liters"]), to_kobo(stats["amount"]), stats["count"]
+                ]
+                for fuel_name, stats in summary["by_fuel_type"].items()
+            }
 
     def __str__(self) -> str:
         """String representation of the FuelAttendant."""
-        return f"FuelAttendant(name='{self._full_name}', transactions={len(self._transactions)})"
+        return f"FuelAttendant(name='{self._full_name}', transactions={self._transaction_count})"
 
     def __repr__(self) -> str:
         """Developer representation of the FuelAttendant."""
-        return f"FuelAttendant(name='{self._full_name}', transactions={len(self._transactions)})"
+        return f"FuelAttendant(name='{self._full_name}', transactions={self._transaction_count})"
+
+
+class Nozzle:
+    """Sells one fuel for one attendant, with the fuel resolved up front.
+
+    Sales skip the name lookup and lowercasing of the attendant's own
+    dispense methods. Once the fuel is removed from the dispenser every
+    sale raises ValueError, even if a fuel of the same name is added back;
+    the check is made under the fuel lock, so a sale in flight finishes
+    before remove_fuel() returns.
+    """
+
+    def __init__(self, attendant: FuelAttendant, binding: FuelBinding):
+        self._attendant = attendant
+        self._binding = binding
+
+    @property
+    def fuel_name(self) -> str:
+        return self._binding.fuel.fuel_name
+
+    @property
+    def active(self) -> bool:
+        return not self._binding.removed
+
+    def dispense_by_liters(self, liters: float) -> Transaction:
+        metrics = self._attendant._metrics
+        if metrics is not None:
+            return metrics.measure(
+                "dispense_by_liters", self._binding.key, self._dispense_by_liters, liters
+            )
+        return self._dispense_by_liters(liters)
+
+    def _dispense_by_liters(self, liters: float) -> Transaction:
+        _check_liters(liters)
+        binding = self._binding
+        attendant = self._attendant
+        with binding.lock:
+            if binding.removed:
+                raise UnknownFuelError(f"Fuel '{self.fuel_name}' has been removed")
+            fuel = binding.fuel
+            price_kobo = attendant._dispenser.price_snapshot().prices[binding.key]
+            milliliters, kobo = attendant._quote_by_liters(fuel, fuel.fuel_name, liters, price_kobo)
+            return attendant._complete_sale(fuel, milliliters, kobo, "by_liters")
+
+    def dispense_by_amount(self, amount: float) -> Transaction:
+        metrics = self._attendant._metrics
+        if metrics is not None:
+            return metrics.measure(
+                "dispense_by_amount", self._binding.key, self._dispense_by_amount, amount
+            )
+        return self._dispense_by_amount(amount)
+
+    def _dispense_by_amount(self, amount: float) -> Transaction:
+        binding = self._binding
+        attendant = self._attendant
+        with binding.lock:
+            if binding.removed:
+                raise UnknownFuelError(f"Fuel '{self.fuel_name}' has been removed")
+            fuel = binding.fuel
+            price_kobo = attendant._dispenser.price_snapshot().prices[binding.key]
+            milliliters, kobo = attendant._quote_by_amount(fuel, fuel.fuel_name, amount, price_kobo)
+            return attendant._complete_sale(fuel, milliliters, kobo, "by_amount")
+
+    def __repr__(self) -> str:
+        return f"Nozzle(fuel='{self.fuel_name}', attendant='{self._attendant.full_name}')"
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from typing import Optional, Protocol
+
+# Custom epoch (2025-01-01T00:00:00Z) keeps the 41-bit millisecond field
+# good for roughly seventy years.
+EPOCH_MS = 1_735_689_600_000
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+
+class IdGenerator(Protocol):
+    def next_id(self) -> int:
+        ...
+
+
+def format_transaction_id(value: int) -> str:
+    return f"TXN{value:019d}"
+
+
+def default_node_id() -> int:
+    """MFD_NODE_ID if set, else 0.
+
+    Node 0 only suits a process that mints IDs on its own. Processes
+    that mint side by side each need their own node ID: MFD_NODE_ID,
+    use_node_id(), or one handed out by StationCluster to its workers or
+    by SharedInventory to the processes attached to it.
+    """
+    value = os.environ.get("MFD_NODE_ID")
+    if value is None:
+        return 0
+    try:
+        node_id = int(value)
+    except ValueError:
+        node_id = -1
+    if not 0 <= node_id <= MAX_NODE_ID:
+        raise ValueError(
+            f"MFD_NODE_ID must be a whole number between 0 and {MAX_NODE_ID}, got {value!r}"
+        )
+    return node_id
+
+
+class SnowflakeIdGenerator:
+    """Monotonic 64-bit IDs made of milliseconds, node ID and a sequence.
+
+    IDs never repeat within one generator, even if the wall clock steps
+    backwards: the generator keeps counting from the last millisecond it
+    issued and borrows the next millisecond when the sequence wraps.
+    Every process minting IDs at the same time needs its own node ID.
+    """
+
+    def __init__(self, node_id: Optional[int] = None, epoch_ms: int = EPOCH_MS):
+        if node_id is None:
+            node_id = default_node_id()
+        if not 0 <= node_id <= MAX_NODE_ID:
+            raise ValueError(f"Node ID must be between 0 and {MAX_NODE_ID}")
+        self._node_bits = node_id << SEQUENCE_BITS
+        self._node_id = node_id
+        self._epoch_ms = epoch_ms
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @property
+    def node_id(self) -> int:
+        return self._node_id
+
+    def next_id(self) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000 - self._epoch_ms
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                self._sequence = (self._sequence + 1) & SEQUENCE_MASK
+                if self._sequence == 0:
+                    self._last_ms += 1
+            return (
+                (self._last_ms << (NODE_BITS + SEQUENCE_BITS))
+                | self._node_bits
+                | self._sequence
+            )
+
+    @staticmethod
+    def split_id(value: int) -> tuple:
+        """Return the (milliseconds, node ID, sequence) parts of an ID."""
+        return (
+            value >> (NODE_BITS + SEQUENCE_BITS),
+            (value >> SEQUENCE_BITS) & MAX_NODE_ID,
+            value & SEQUENCE_MASK,
+        )
+
+
+class _ForkedNode:
+    """Generator of a child forked from a process with a node ID.
+
+    The child cannot tell which node ID would be its own, and reusing its
+    parent's would mint duplicates, so it refuses to mint at all.
+    """
+
+    def __init__(self, parent_node_id: Optional[int]):
+        self._parent_node_id = parent_node_id
+
+    def next_id(self) -> int:
+        parent = "another process" if self._parent_node_id is None else (
+            f"node {self._parent_node_id}"
+        )
+        raise RuntimeError(
+            f"This process was forked from {parent} and has no node ID of its own; "
+            "call mfd.ids.use_node_id() before minting IDs"
+        )
+
+
+# Made on first use, so a bad MFD_NODE_ID is reported when an ID is
+# minted rather than when mfd is imported.
+_default_generator: Optional[SnowflakeIdGenerator] = None
+_generator: Optional[IdGenerator] = None
+_generator_lock = threading.Lock()
+
+
+def get_id_generator() -> IdGenerator:
+    generator = _generator
+    if generator is None:
+        generator = _make_default_generator()
+    return generator
+
+
+def _make_default_generator() -> IdGenerator:
+    global _default_generator, _generator
+    with _generator_lock:
+        if _generator is None:
+            _default_generator = _generator = SnowflakeIdGenerator(default_node_id())
+        return _generator
+
+
+def assigned_node_id() -> Optional[int]:
+    """The node ID this process mints under, or None if it has none yet.
+
+    A process has one once given it (MFD_NODE_ID or use_node_id()) or
+    once it has minted under the default. A forked child has none until
+    use_node_id().
+    """
+    if _generator is None and "MFD_NODE_ID" not in os.environ:
+        return None
+    return getattr(get_id_generator(), "node_id", None)
+
+
+def set_id_generator(generator: IdGenerator):
+    global _generator
+    _generator = generator
+
+
+def use_node_id(node_id: int) -> SnowflakeIdGenerator:
+    """Mint this process's IDs as node_id, e.g. first thing in a pool worker.
+
+    Keeping node IDs unique across the processes that mint side by side
+    is up to the caller; StationCluster does it for its workers.
+    """
+    global _default_generator, _generator
+    _default_generator = _generator = SnowflakeIdGenerator(node_id)
+    return _default_generator
+
+
+def _reset_after_fork():
+    # A forked child must not mint under its parent's node ID, nor fall
+    # back to the same default, so it fails loudly until given its own.
+    # A generator installed with set_id_generator() is left alone.
+    global _generator, _generator_lock
+    _generator_lock = threading.Lock()
+    if _generator is not _default_generator:
+        return
+    parent = None if _default_generator is None else _default_generator.node_id
+    _generator = _ForkedNode(parent)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
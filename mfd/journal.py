@@ -0,0 +1,295 @@
+import os
+import struct
+import threading
+import zlib
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from mfd.dispenser import Dispenser
+from mfd.fuel import Fuel
+from mfd.fuel_attendant import FuelAttendant
+from mfd.ledger import from_micros
+from mfd.transaction import Transaction
+from mfd.units import from_kobo, from_milliliters, to_kobo, to_milliliters
+
+MAGIC = b"MFDJRNL2"
+
+ADD_FUEL = 1
+UPDATE_PRICE = 2
+RESTOCK = 3
+REMOVE_FUEL = 4
+DISPENSE = 5
+
+# Every record is framed as (payload length, CRC-32 of payload, type).
+_HEADER = struct.Struct("<IIB")
+# Prices and amounts are stored in kobo, volumes in millilitres.
+_FUEL_AMOUNTS = struct.Struct("<qq")
+_FUEL_VALUE = struct.Struct("<q")
+_DISPENSE = struct.Struct("<qqqq")
+_STRING_LENGTH = struct.Struct("<H")
+# No record is longer than a sale with four strings of the longest length.
+_MAX_PAYLOAD = _DISPENSE.size + 4 * (_STRING_LENGTH.size + 0xFFFF)
+
+
+def _pack_strings(*values: str) -> bytes:
+    parts = []
+    for value in values:
+        encoded = value.encode("utf-8")
+        parts.append(_STRING_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _unpack_strings(payload: bytes, offset: int, count: int) -> list:
+    values = []
+    for _ in range(count):
+        (length,) = _STRING_LENGTH.unpack_from(payload, offset)
+        offset += _STRING_LENGTH.size
+        values.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    return values
+
+
+def _decode(record_type: int, payload: bytes) -> tuple:
+    if record_type == ADD_FUEL:
+        price, quantity = _FUEL_AMOUNTS.unpack_from(payload)
+        (name,) = _unpack_strings(payload, _FUEL_AMOUNTS.size, 1)
+        return name, from_kobo(price), from_milliliters(quantity)
+    if record_type == UPDATE_PRICE:
+        (price,) = _FUEL_VALUE.unpack_from(payload)
+        (name,) = _unpack_strings(payload, _FUEL_VALUE.size, 1)
+        return name, from_kobo(price)
+    if record_type == RESTOCK:
+        (milliliters,) = _FUEL_VALUE.unpack_from(payload)
+        (name,) = _unpack_strings(payload, _FUEL_VALUE.size, 1)
+        return name, from_milliliters(milliliters)
+    if record_type == REMOVE_FUEL:
+        return tuple(_unpack_strings(payload, 0, 1))
+    if record_type == DISPENSE:
+        id_value, micros, milliliters, kobo = _DISPENSE.unpack_from(payload)
+        fuel_name, attendant_name, transaction_type, custom_id = _unpack_strings(
+            payload, _DISPENSE.size, 4
+        )
+        return Transaction.from_fixed_point(
+            fuel_name=fuel_name,
+            milliliters=milliliters,
+            kobo=kobo,
+            transaction_type=transaction_type,
+            attendant_name=attendant_name,
+            transaction_id=custom_id or id_value,
+            timestamp=from_micros(micros),
+        )
+    raise ValueError(f"Unknown journal record type {record_type}")
+
+
+class Journal:
+    """Append-only binary journal of stock changes and sales, with group commit.
+
+    Records are written straight away but fsynced in batches: whenever
+    batch_size records are waiting, and otherwise every sync_interval
+    seconds from a background thread. sync() is the explicit durability
+    barrier. batch_size=1 with sync_interval=None fsyncs every record.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        sync_interval: Optional[float] = 0.05,
+        truncate_at: Optional[int] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self._path = path
+        self._file: BinaryIO = open(path, "ab")
+        if truncate_at is not None:
+            # Drops a torn record left at the tail by a crash.
+            self._file.truncate(truncate_at)
+            self._file.seek(0, os.SEEK_END)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._appended = 0
+        self._synced = 0
+        self._closed = False
+
+        self._wakeup = threading.Event()
+        self._flusher = None
+        if sync_interval is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, args=(sync_interval,), daemon=True
+            )
+            self._flusher.start()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def offset(self) -> int:
+        with self._lock:
+            return self._file.tell()
+
+    def _append(self, record_type: int, payload: bytes):
+        header = _HEADER.pack(len(payload), zlib.crc32(payload), record_type)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Journal is closed")
+            self._file.write(header)
+            self._file.write(payload)
+            self._appended += 1
+            pending = self._appended - self._synced
+        if pending >= self._batch_size:
+            self.sync()
+
+    def log_add_fuel(self, fuel: Fuel):
+        self._append(
+            ADD_FUEL,
+            _FUEL_AMOUNTS.pack(fuel.price_kobo, fuel.quantity_ml)
+            + _pack_strings(fuel.fuel_name),
+        )
+
+    def log_price_update(self, fuel_name: str, new_price: float):
+        self._append(UPDATE_PRICE, _FUEL_VALUE.pack(to_kobo(new_price)) + _pack_strings(fuel_name))
+
+    def log_restock(self, fuel_name: str, liters: float):
+        self._append(RESTOCK, _FUEL_VALUE.pack(to_milliliters(liters)) + _pack_strings(fuel_name))
+
+    def log_remove_fuel(self, fuel_name: str):
+        self._append(REMOVE_FUEL, _pack_strings(fuel_name))
+
+    def log_dispense(self, transaction: Transaction):
+        self._append(
+            DISPENSE,
+            _DISPENSE.pack(
+                transaction._id_value,
+                transaction._micros,
+                transaction.milliliters,
+                transaction.kobo,
+            )
+            + _pack_strings(
+                transaction.fuel_name,
+                transaction.attendant_name,
+                transaction.transaction_type,
+                transaction._transaction_id or "",
+            ),
+        )
+
+    def sync(self):
+        """Block until every record appended so far is on disk."""
+        with self._lock:
+            if self._closed:
+                return
+            self._file.flush()
+            target = self._appended
+        with self._sync_lock:
+            if target <= self._synced:
+                return
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+    def _flush_periodically(self, interval: float):
+        while not self._wakeup.wait(interval):
+            if self._appended != self._synced:
+                self.sync()
+
+    def close(self):
+        if self._closed:
+            return
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.sync()
+        with self._lock:
+            self._closed = True
+            self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_journal(path: str, start: int = 0) -> Iterator[Tuple[int, int, tuple]]:
+    """Yield (end offset, record type, fields) for each intact record.
+
+    Reading stops quietly at a short or corrupt final record, which is
+    what a crash in the middle of a write leaves behind. A corrupt record
+    with more of the journal after it is not a torn write, so it raises
+    ValueError rather than have recovery throw away the records after it.
+    """
+    with open(path, "rb") as journal_file:
+        if journal_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not an MFD journal")
+        size = os.fstat(journal_file.fileno()).st_size
+        offset = max(start, len(MAGIC))
+        journal_file.seek(offset)
+        while True:
+            header = journal_file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length, checksum, record_type = _HEADER.unpack(header)
+            if length > _MAX_PAYLOAD:
+                raise ValueError(f"Journal '{path}' is corrupt at offset {offset}")
+            payload = journal_file.read(length)
+            if len(payload) < length:
+                return
+            end = journal_file.tell()
+            if zlib.crc32(payload) != checksum:
+                if end == size:
+                    return
+                raise ValueError(f"Journal '{path}' is corrupt at offset {offset}")
+            yield end, record_type, _decode(record_type, payload)
+            offset = end
+
+
+def apply_record(
+    record_type: int,
+    fields,
+    dispenser: Dispenser,
+    attendants: Dict[str, FuelAttendant],
+):
+    if record_type == ADD_FUEL:
+        dispenser.add_fuel(Fuel(*fields))
+    elif record_type == UPDATE_PRICE:
+        dispenser.update_fuel_price(*fields)
+    elif record_type == RESTOCK:
+        dispenser.restock_fuel(*fields)
+    elif record_type == REMOVE_FUEL:
+        dispenser.remove_fuel(*fields)
+    elif record_type == DISPENSE:
+        transaction = fields
+        fuel = dispenser.get_fuel(transaction.fuel_name)
+        if fuel is None:
+            raise ValueError(f"Journal sale of unknown fuel '{transaction.fuel_name}'")
+        fuel.reduce_milliliters(transaction.milliliters)
+        attendant = attendants.get(transaction.attendant_name)
+        if attendant is None:
+            attendant = attendants[transaction.attendant_name] = FuelAttendant(
+                transaction.attendant_name, dispenser
+            )
+        attendant._record_transaction(transaction)
+
+
+def recover(
+    path: str,
+    thread_safe: bool = False,
+    **journal_options,
+) -> Tuple[Dispenser, Dict[str, FuelAttendant], Journal]:
+    """Rebuild a Dispenser and its attendants from the journal at path.
+
+    Returns the dispenser, the attendants keyed by name and the reopened
+    journal, which is already attached to the dispenser.
+    """
+    dispenser = Dispenser(thread_safe=thread_safe)
+    attendants: Dict[str, FuelAttendant] = {}
+    end = None
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        end = len(MAGIC)
+        for end, record_type, fields in read_journal(path):
+            apply_record(record_type, fields, dispenser, attendants)
+    journal = Journal(path, truncate_at=end, **journal_options)
+    dispenser.attach_journal(journal)
+    return dispenser, attendants, journal
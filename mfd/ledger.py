@@ -0,0 +1,380 @@
+import sys
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from mfd.transaction import Transaction
+from mfd.units import to_kobo, to_milliliters
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+class EncodedColumn:
+    """Dictionary-encoded string column.
+
+    Codes start out one byte wide and the column is widened in place the
+    first time the number of distinct values outgrows the current width.
+    """
+
+    _WIDTHS = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._width = 0
+        self._column = array(self._WIDTHS[0][0])
+        # Rows holding each code, in row order; built on first use.
+        self._postings: Optional[List[array]] = None
+
+    def _add_value(self, value: str) -> int:
+        code = self._codes[value] = len(self._values)
+        self._values.append(value)
+        if code == self._WIDTHS[self._width][1]:
+            self._width += 1
+            self._column = array(self._WIDTHS[self._width][0], self._column)
+        if self._postings is not None:
+            self._postings.append(array("I"))
+        return code
+
+    def append(self, value: str):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._add_value(value)
+        if self._postings is not None:
+            self._postings[code].append(len(self._column))
+        self._column.append(code)
+
+    def extend(self, values: List[str]):
+        codes = []
+        for value in values:
+            code = self._codes.get(value)
+            if code is None:
+                code = self._add_value(value)
+            codes.append(code)
+        if self._postings is not None:
+            for row, code in enumerate(codes, len(self._column)):
+                self._postings[code].append(row)
+        self._column.extend(codes)
+
+    def codes_for(self, value: str) -> List[int]:
+        """Codes of every stored value equal to value, ignoring case."""
+        folded = value.casefold()
+        return [code for code, stored in enumerate(self._values) if stored.casefold() == folded]
+
+    def code_at(self, row: int) -> int:
+        return self._column[row]
+
+    def codes(self, start: int, stop: int) -> array:
+        return self._column[start:stop]
+
+    @property
+    def values(self) -> List[str]:
+        """Distinct values, indexed by code."""
+        return list(self._values)
+
+    @classmethod
+    def from_codes(cls, values: List[str], codes: array) -> "EncodedColumn":
+        column = cls()
+        column._values = list(values)
+        column._codes = {value: code for code, value in enumerate(column._values)}
+        while len(column._values) > cls._WIDTHS[column._width][1]:
+            column._width += 1
+        column._column = array(cls._WIDTHS[column._width][0], codes)
+        return column
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the codes, values and postings."""
+        size = len(self._column) * self._column.itemsize
+        size += sum(sys.getsizeof(value) for value in self._values)
+        if self._postings is not None:
+            size += sum(len(postings) * postings.itemsize for postings in self._postings)
+        return size
+
+    def postings(self, code: int) -> array:
+        if self._postings is None:
+            postings = [array("I") for _ in self._values]
+            for row, row_code in enumerate(self._column):
+                postings[row_code].append(row)
+            self._postings = postings
+        return self._postings[code]
+
+    def __getitem__(self, row: int) -> str:
+        return self._values[self._column[row]]
+
+    def __len__(self) -> int:
+        return len(self._column)
+
+
+class TransactionLedger:
+    """Append-only, column-oriented store of transactions.
+
+    Each transaction is kept as one slot in a set of typed arrays; a
+    Transaction object is only rebuilt when a row is read back.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._timestamps = array("q")
+        # Volumes and amounts are integer millilitres and kobo.
+        self._milliliters = array("q")
+        self._kobo = array("q")
+        self._fuel_names = EncodedColumn()
+        self._attendants = EncodedColumn()
+        self._types = EncodedColumn()
+        # Permutation of rows in timestamp order, only kept once a row
+        # arrives out of order; until then row order is time order.
+        self._time_order: Optional[array] = None
+        # Supplied string IDs are rare and kept apart from the integer
+        # column, where their row holds 0.
+        self._custom_ids: Dict[int, str] = {}
+
+    def append(self, transaction: Transaction) -> int:
+        row = len(self._timestamps)
+        if transaction._transaction_id is not None:
+            self._custom_ids[row] = transaction._transaction_id
+        self._ids.append(transaction._id_value)
+        micros = transaction._micros
+        out_of_order = self._time_order is None and row and micros < self._timestamps[-1]
+        self._timestamps.append(micros)
+        if out_of_order:
+            self._time_order = array(
+                "I", sorted(range(row + 1), key=self._timestamps.__getitem__)
+            )
+        elif self._time_order is not None:
+            insort(self._time_order, row, key=self._timestamps.__getitem__)
+        self._milliliters.append(transaction._milliliters)
+        self._kobo.append(transaction._kobo)
+        self._fuel_names.append(transaction.fuel_name)
+        self._attendants.append(transaction.attendant_name)
+        self._types.append(transaction.transaction_type)
+        return row
+
+    def extend(self, transactions: List[Transaction]):
+        """Append many transactions, filling each column in one pass."""
+        if not transactions:
+            return
+        micros = [transaction._micros for transaction in transactions]
+        previous = self._timestamps[-1] if self._timestamps else micros[0]
+        if (
+            self._time_order is not None
+            or micros[0] < previous
+            or any(later < earlier for earlier, later in zip(micros, micros[1:]))
+        ):
+            for transaction in transactions:
+                self.append(transaction)
+            return
+
+        for row, transaction in enumerate(transactions, len(self._timestamps)):
+            if transaction._transaction_id is not None:
+                self._custom_ids[row] = transaction._transaction_id
+        self._ids.extend([transaction._id_value for transaction in transactions])
+        self._timestamps.extend(micros)
+        self._milliliters.extend([transaction._milliliters for transaction in transactions])
+        self._kobo.extend([transaction._kobo for transaction in transactions])
+        self._fuel_names.extend([transaction.fuel_name for transaction in transactions])
+        self._attendants.extend([transaction.attendant_name for transaction in transactions])
+        self._types.extend([transaction.transaction_type for transaction in transactions])
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> dict:
+        """Copies of every column for rows [start, stop), as from_columns() takes them.
+
+        String columns come back as (distinct values, codes).
+        """
+        stop = len(self) if stop is None else stop
+        return {
+            "ids": self._ids[start:stop],
+            "timestamps": self._timestamps[start:stop],
+            "milliliters": self._milliliters[start:stop],
+            "kobo": self._kobo[start:stop],
+            "fuel_names": (self._fuel_names.values, self._fuel_names.codes(start, stop)),
+            "attendants": (self._attendants.values, self._attendants.codes(start, stop)),
+            "types": (self._types.values, self._types.codes(start, stop)),
+            "custom_ids": {
+                row - start: custom_id
+                for row, custom_id in self._custom_ids.items()
+                if start <= row < stop
+            },
+        }
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "TransactionLedger":
+        ledger = cls()
+        ledger._ids = array("q", columns["ids"])
+        ledger._timestamps = array("q", columns["timestamps"])
+        ledger._milliliters = array("q", columns["milliliters"])
+        ledger._kobo = array("q", columns["kobo"])
+        ledger._fuel_names = EncodedColumn.from_codes(*columns["fuel_names"])
+        ledger._attendants = EncodedColumn.from_codes(*columns["attendants"])
+        ledger._types = EncodedColumn.from_codes(*columns["types"])
+        ledger._custom_ids = dict(columns["custom_ids"])
+        timestamps = ledger._timestamps
+        if any(later < earlier for earlier, later in zip(timestamps, timestamps[1:])):
+            ledger._time_order = array(
+                "I", sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            )
+        return ledger
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the ledger's columns and indexes."""
+        size = sum(
+            len(column) * column.itemsize
+            for column in (self._ids, self._timestamps, self._milliliters, self._kobo)
+        )
+        size += sum(
+            column.nbytes() for column in (self._fuel_names, self._attendants, self._types)
+        )
+        if self._time_order is not None:
+            size += len(self._time_order) * self._time_order.itemsize
+        size += sum(sys.getsizeof(custom_id) + 16 for custom_id in self._custom_ids.values())
+        return size
+
+    def __getitem__(self, row: int) -> Transaction:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("ledger row out of range")
+        return Transaction.from_fixed_point(
+            fuel_name=self._fuel_names[row],
+            milliliters=self._milliliters[row],
+            kobo=self._kobo[row],
+            transaction_type=self._types[row],
+            attendant_name=self._attendants[row],
+            transaction_id=self._custom_ids.get(row, self._ids[row]),
+            timestamp=from_micros(self._timestamps[row]),
+        )
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def sales_columns(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Tuple[array, array, array, List[str]]:
+        """Copies of the timestamp, millilitre and fuel-code columns.
+
+        Rows cover at least [start, end); once rows have arrived out of
+        order every row is returned and callers must filter by time.
+        Returns the fuel names the codes stand for as the last item.
+        """
+        if self._time_order is None:
+            lo, hi = self._time_positions(start, end, len(self))
+        else:
+            lo, hi = 0, len(self)
+        return (
+            self._timestamps[lo:hi],
+            self._milliliters[lo:hi],
+            self._fuel_names.codes(lo, hi),
+            self._fuel_names.values,
+        )
+
+    def row_at_position(self, position: int) -> int:
+        """Row of the position-th transaction in timestamp order."""
+        if self._time_order is None:
+            return position
+        return self._time_order[position]
+
+    def time_position(self, timestamp: datetime) -> int:
+        """Position in timestamp order of the first transaction at or after timestamp."""
+        return self._time_positions(timestamp, None, len(self))[0]
+
+    def _time_positions(self, start: Optional[datetime], end: Optional[datetime], count: int):
+        """Bisect the time order for the positions covering [start, end)."""
+        if self._time_order is None:
+            keys, key = self._timestamps, None
+        else:
+            keys, key = self._time_order, self._timestamps.__getitem__
+            count = len(keys)
+        lo = 0 if start is None else bisect_left(keys, to_micros(start), 0, count, key=key)
+        hi = count if end is None else bisect_left(keys, to_micros(end), lo, count, key=key)
+        return lo, hi
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        fuel_name: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        min_liters: Optional[float] = None,
+        max_liters: Optional[float] = None,
+    ) -> Iterator[Transaction]:
+        """Lazily yield transactions matching every given filter.
+
+        The time window is [start, end). Rows come from a bisect over the
+        timestamps narrowed by the fuel or type postings, so the cost is
+        O(log n + k) for k candidate rows rather than a full scan.
+        """
+        count = len(self)
+        fuel_codes = None if fuel_name is None else set(self._fuel_names.codes_for(fuel_name))
+        type_codes = (
+            None if transaction_type is None
+            else set(self._types.codes_for(transaction_type))
+        )
+        if fuel_codes is not None and not fuel_codes or type_codes is not None and not type_codes:
+            return iter(())
+        rows = self._candidate_rows(start, end, count, fuel_codes, type_codes)
+        return self._filter_rows(
+            rows,
+            fuel_codes,
+            type_codes,
+            None if min_amount is None else to_kobo(min_amount),
+            None if max_amount is None else to_kobo(max_amount),
+            None if min_liters is None else to_milliliters(min_liters),
+            None if max_liters is None else to_milliliters(max_liters),
+        )
+
+    def _candidate_rows(self, start, end, count, fuel_codes, type_codes) -> Iterable[int]:
+        lo, hi = self._time_positions(start, end, count)
+        if self._time_order is not None:
+            order = self._time_order
+            return (order[position] for position in range(lo, hi) if order[position] < count)
+
+        # Rows are in time order, so [lo, hi) is a row range; a single
+        # posting list narrows it further with two more bisects.
+        best = None
+        for column, codes in ((self._fuel_names, fuel_codes), (self._types, type_codes)):
+            if codes is None or len(codes) != 1:
+                continue
+            postings = column.postings(next(iter(codes)))
+            first = bisect_left(postings, lo)
+            last = bisect_left(postings, hi, first)
+            if best is None or last - first < best[2] - best[1]:
+                best = (postings, first, last)
+        if best is None:
+            return range(lo, hi)
+        postings, first, last = best
+        return (postings[index] for index in range(first, last))
+
+    def _filter_rows(
+        self, rows, fuel_codes, type_codes, min_kobo, max_kobo, min_ml, max_ml
+    ) -> Iterator[Transaction]:
+        for row in rows:
+            if fuel_codes is not None and self._fuel_names.code_at(row) not in fuel_codes:
+                continue
+            if type_codes is not None and self._types.code_at(row) not in type_codes:
+                continue
+            kobo = self._kobo[row]
+            if min_kobo is not None and kobo < min_kobo:
+                continue
+            if max_kobo is not None and kobo > max_kobo:
+                continue
+            milliliters = self._milliliters[row]
+            if min_ml is not None and milliliters < min_ml:
+                continue
+            if max_ml is not None and milliliters > max_ml:
+                continue
+            yield self[row]
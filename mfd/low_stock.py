@@ -0,0 +1,168 @@
+import heapq
+import threading
+from contextlib import nullcontext
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from mfd.fuel import Fuel
+from mfd.units import from_milliliters, to_milliliters
+
+if TYPE_CHECKING:
+    from mfd.dispenser import Dispenser
+
+
+class StockThreshold(NamedTuple):
+    """A fuel is low at or below threshold_ml and is refilled to restock_to_ml."""
+
+    threshold_ml: int
+    restock_to_ml: int
+
+
+class RestockOrder(NamedTuple):
+    station_id: str
+    fuel_name: str
+    liters: float
+    # Quantity as a fraction of the threshold; lower is more urgent.
+    level: float
+
+
+class LowStockIndex:
+    """Priority index of watched fuels, most depleted first.
+
+    Fuels are ranked by quantity divided by their threshold. Every change
+    to a watched fuel pushes a fresh heap entry and bumps the fuel's
+    version; older entries are skipped lazily. Stale entries are popped
+    from the top as soon as they surface, so most_urgent() is a peek.
+    Low-stock listeners are called with (fuel, is_low) when a fuel
+    crosses its threshold, on the thread that changed the quantity and
+    with that fuel's lock held, so they must not dispense.
+    """
+
+    def __init__(self, thread_safe: bool = False):
+        self._lock = threading.Lock() if thread_safe else nullcontext()
+        self._thresholds: Dict[str, StockThreshold] = {}
+        self._fuels: Dict[str, Fuel] = {}
+        self._versions: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._low: Mapping[str, Fuel] = MappingProxyType({})
+        self._listeners: List[Callable[[Fuel, bool], None]] = []
+
+    def add_listener(self, listener: Callable[[Fuel, bool], None]):
+        self._listeners.append(listener)
+
+    def watch(self, fuel: Fuel, threshold: StockThreshold):
+        key = fuel.fuel_name.lower()
+        with self._lock:
+            self._thresholds[key] = threshold
+            self._fuels[key] = fuel
+        self.update(fuel)
+
+    def unwatch(self, fuel_name: str):
+        key = fuel_name.lower()
+        with self._lock:
+            if self._thresholds.pop(key, None) is None:
+                return
+            self._fuels.pop(key)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._set_low(key, None)
+            self._clean_top()
+
+    def update(self, fuel: Fuel):
+        """Re-rank fuel after its quantity changed."""
+        key = fuel.fuel_name.lower()
+        with self._lock:
+            threshold = self._thresholds.get(key)
+            if threshold is None:
+                return
+            version = self._versions[key] = self._versions.get(key, 0) + 1
+            quantity_ml = fuel.quantity_ml
+            heapq.heappush(self._heap, (quantity_ml / threshold.threshold_ml, version, key))
+            self._clean_top()
+            if len(self._heap) > 2 * len(self._thresholds) + 64:
+                self._compact()
+            is_low = quantity_ml <= threshold.threshold_ml
+            crossed = is_low != (key in self._low)
+            if crossed:
+                self._set_low(key, fuel if is_low else None)
+        if crossed:
+            for listener in self._listeners:
+                listener(fuel, is_low)
+
+    def _set_low(self, key: str, fuel: Optional[Fuel]):
+        # Replaced rather than mutated, like Dispenser's available view.
+        low = dict(self._low)
+        if fuel is None:
+            low.pop(key, None)
+        else:
+            low[key] = fuel
+        self._low = MappingProxyType(low)
+
+    def _clean_top(self):
+        heap = self._heap
+        while heap and heap[0][1] != self._versions.get(heap[0][2]):
+            heapq.heappop(heap)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[1] == self._versions.get(entry[2])]
+        heapq.heapify(self._heap)
+
+    def most_urgent(self) -> Optional[Fuel]:
+        """The watched fuel with the lowest level, in O(1)."""
+        heap = self._heap
+        return self._fuels.get(heap[0][2]) if heap else None
+
+    def level(self, fuel_name: str) -> Optional[float]:
+        key = fuel_name.lower()
+        threshold = self._thresholds.get(key)
+        if threshold is None:
+            return None
+        return self._fuels[key].quantity_ml / threshold.threshold_ml
+
+    def low_fuels(self) -> Mapping[str, Fuel]:
+        """Read-only view of fuels at or below their threshold."""
+        return self._low
+
+    def restock_needs(self) -> List[Tuple[float, str, int]]:
+        """(level, fuel name, millilitres to restock) for each low fuel."""
+        needs = []
+        for key, fuel in self._low.items():
+            threshold = self._thresholds.get(key)
+            if threshold is None:
+                continue
+            quantity_ml = fuel.quantity_ml
+            needs.append((
+                quantity_ml / threshold.threshold_ml,
+                fuel.fuel_name,
+                max(threshold.restock_to_ml - quantity_ml, 0),
+            ))
+        return needs
+
+    def __len__(self) -> int:
+        return len(self._thresholds)
+
+
+def plan_restock(
+    stations: Mapping[str, "Dispenser"], truck_liters: Optional[float] = None
+) -> List[RestockOrder]:
+    """Restock orders for every low fuel across stations, most urgent first.
+
+    Only fuels already flagged low by each station's index are looked at.
+    With truck_liters, orders are filled in urgency order until the load
+    runs out, and the last one may be partial.
+    """
+    needs = sorted(
+        (level, station_id, fuel_name, milliliters)
+        for station_id, dispenser in stations.items()
+        for level, fuel_name, milliliters in dispenser.low_stock.restock_needs()
+    )
+    remaining = None if truck_liters is None else to_milliliters(truck_liters)
+    orders = []
+    for level, station_id, fuel_name, milliliters in needs:
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            milliliters = min(milliliters, remaining)
+            remaining -= milliliters
+        if milliliters:
+            orders.append(RestockOrder(station_id, fuel_name, from_milliliters(milliliters), level))
+    return orders
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mfd.errors import DispenseError
+from mfd.transaction import Transaction
+from mfd.units import from_kobo, from_milliliters
+
+# Latency buckets are powers of two from 1 µs to about 1 s, in ns.
+BUCKET_BOUNDS_NS = tuple(1000 << power for power in range(21))
+_OVERFLOW = len(BUCKET_BOUNDS_NS)
+
+
+def outcome_of(error: Exception) -> str:
+    """Label for why an operation failed: "out_of_stock", "insufficient_fuel", ..."""
+    if isinstance(error, DispenseError):
+        return error.outcome
+    return "rejected" if isinstance(error, ValueError) else "error"
+
+
+class Histogram:
+    """Latency histogram with log2 buckets; counts are per bucket, not cumulative."""
+
+    __slots__ = ("buckets", "count", "sum_ns")
+
+    def __init__(self):
+        # One extra bucket for anything slower than the last bound.
+        self.buckets = [0] * (_OVERFLOW + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, elapsed_ns: int):
+        self.buckets[_bucket(elapsed_ns)] += 1
+        self.count += 1
+        self.sum_ns += elapsed_ns
+
+
+def _bucket(elapsed_ns: int) -> int:
+    # Bucket k holds (1000 * 2**(k-1), 1000 * 2**k] ns.
+    if elapsed_ns <= 0:
+        return 0
+    index = ((elapsed_ns - 1) // 1000).bit_length()
+    return index if index < _OVERFLOW else _OVERFLOW
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """Operation counters, latency histograms and sales throughput of a station.
+
+    Pass one to Dispenser or FuelAttendant to meter them; without it they
+    skip metering entirely. Counters are labelled by operation, fuel and
+    outcome ("ok", or why it failed, see outcome_of()); histograms by
+    operation and fuel. Once tracking a dispenser, any fuel that is not
+    in it is counted under an empty fuel label, whatever the outcome, so
+    bad input cannot grow the label set.
+    Always thread-safe: an uncontended lock costs less than a
+    nullcontext, so there is nothing to save by going without.
+    """
+
+    def __init__(self, namespace: str = "mfd"):
+        self._lock = threading.Lock()
+        self._namespace = namespace
+        self._counts: Dict[Tuple[str, str, str], int] = {}
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        # Per fuel, [millilitres, kobo] sold.
+        self._sold: Dict[str, List[int]] = {}
+        # has_fuel() of each dispenser metered; labels are kept to their fuels.
+        self._known: List[Callable[[str], bool]] = []
+
+    def track(self, has_fuel: Callable[[str], bool]):
+        """Label only fuels has_fuel(name) knows; Dispenser passes its own."""
+        with self._lock:
+            if has_fuel not in self._known:
+                self._known.append(has_fuel)
+
+    def _label(self, fuel_name: str) -> str:
+        if not isinstance(fuel_name, str):
+            return ""
+        if not self._known:
+            return fuel_name.lower()
+        for has_fuel in self._known:
+            if has_fuel(fuel_name):
+                return fuel_name.lower()
+        return ""
+
+    def measure(self, operation: str, fuel_name: str, function: Callable, *args):
+        """Call function(*args), recording its latency and outcome under operation."""
+        # Known before or after the call, so add_fuel and remove_fuel keep theirs.
+        fuel = self._label(fuel_name)
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args)
+        except Exception as error:
+            elapsed_ns = time.perf_counter_ns() - start
+            self._record(operation, fuel or self._label(fuel_name), outcome_of(error), elapsed_ns)
+            raise
+        self._record(
+            operation,
+            fuel or self._label(fuel_name),
+            "ok",
+            time.perf_counter_ns() - start,
+            result if isinstance(result, Transaction) else None,
+        )
+        return result
+
+    def record(
+        self,
+        operation: str,
+        fuel_name: str,
+        outcome: str,
+        elapsed_ns: Optional[int] = None,
+        sale: Optional[Transaction] = None,
+    ):
+        """Count one operation, with its latency and the sale it made when given."""
+        self._record(operation, self._label(fuel_name), outcome, elapsed_ns, sale)
+
+    def _record(
+        self,
+        operation: str,
+        fuel: str,
+        outcome: str,
+        elapsed_ns: Optional[int] = None,
+        sale: Optional[Transaction] = None,
+    ):
+        key = (operation, fuel, outcome)
+        # Everything is updated under one hold of the lock, the dearest
+        # step; acquire() and release() cost well under half of "with".
+        lock = self._lock
+        lock.acquire()
+        try:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if elapsed_ns is not None:
+                histogram = self._histograms.get((operation, fuel))
+                if histogram is None:
+                    histogram = self._histograms[(operation, fuel)] = Histogram()
+                # _bucket(), inlined.
+                index = ((elapsed_ns - 1) // 1000).bit_length() if elapsed_ns > 0 else 0
+                histogram.buckets[index if index < _OVERFLOW else _OVERFLOW] += 1
+                histogram.count += 1
+                histogram.sum_ns += elapsed_ns
+            if sale is not None:
+                sold = self._sold.get(fuel)
+                if sold is None:
+                    sold = self._sold[fuel] = [0, 0]
+                sold[0] += sale._milliliters
+                sold[1] += sale._kobo
+        finally:
+            lock.release()
+
+    def count(self, operation: str, fuel_name: str = "", outcome: str = "ok") -> int:
+        return self._counts.get((operation, fuel_name.lower(), outcome), 0)
+
+    def histogram(self, operation: str, fuel_name: str = "") -> Optional[Histogram]:
+        return self._histograms.get((operation, fuel_name.lower()))
+
+    def sold(self, fuel_name: str) -> Tuple[float, float]:
+        """(liters, amount) sold of fuel_name."""
+        milliliters, kobo = self._sold.get(fuel_name.lower(), (0, 0))
+        return from_milliliters(milliliters), from_kobo(kobo)
+
+    def render(self) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        with self._lock:
+            counts = sorted(self._counts.items())
+            histograms = sorted(
+                (key, list(histogram.buckets), histogram.count, histogram.sum_ns)
+                for key, histogram in self._histograms.items()
+            )
+            sold = sorted((fuel, tuple(amounts)) for fuel, amounts in self._sold.items())
+
+        name = self._namespace
+        lines = [
+            f"# HELP {name}_operations_total Operations by fuel and outcome.",
+            f"# TYPE {name}_operations_total counter",
+        ]
+        for (operation, fuel, outcome), count in counts:
+            labels = _labels(operation=operation, fuel=fuel, outcome=outcome)
+            lines.append(f"{name}_operations_total{{{labels}}} {count}")
+
+        lines.append(f"# HELP {name}_operation_duration_seconds Operation latency.")
+        lines.append(f"# TYPE {name}_operation_duration_seconds histogram")
+        for (operation, fuel), buckets, count, sum_ns in histograms:
+            labels = _labels(operation=operation, fuel=fuel)
+            cumulative = 0
+            for bound_ns, bucket in zip(BUCKET_BOUNDS_NS, buckets):
+                cumulative += bucket
+                lines.append(
+                    f'{name}_operation_duration_seconds_bucket{{{labels},le="{bound_ns / 1e9:g}"}}'
+                    f" {cumulative}"
+                )
+            lines.append(
+                f'{name}_operation_duration_seconds_bucket{{{labels},le="+Inf"}} {count}'
+            )
+            lines.append(f"{name}_operation_duration_seconds_sum{{{labels}}} {sum_ns / 1e9:.9f}")
+            lines.append(f"{name}_operation_duration_seconds_count{{{labels}}} {count}")
+
+        lines.append(f"# HELP {name}_dispensed_liters_total Fuel sold, in liters.")
+        lines.append(f"# TYPE {name}_dispensed_liters_total counter")
+        lines.extend(
+            f"{name}_dispensed_liters_total{{{_labels(fuel=fuel)}}} "
+            f"{from_milliliters(milliliters)}"
+            for fuel, (milliliters, _) in sold
+        )
+        lines.append(f"# HELP {name}_sales_naira_total Sales, in naira.")
+        lines.append(f"# TYPE {name}_sales_naira_total counter")
+        lines.extend(
+            f"{name}_sales_naira_total{{{_labels(fuel=fuel)}}} {from_kobo(kobo)}"
+            for fuel, (_, kobo) in sold
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write a snapshot to path, atomically, e.g. for a textfile collector."""
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+        """Serve snapshots at http://host:port/metrics from a background thread.
+
+        Call shutdown() on the returned server to stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
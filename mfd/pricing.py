@@ -0,0 +1,168 @@
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from mfd.ledger import from_micros, to_micros
+from mfd.units import from_kobo
+
+
+class PriceVersion(NamedTuple):
+    """One immutable set of prices, in kobo, keyed by lowercased fuel name."""
+
+    version: int
+    effective_at: datetime
+    prices: Mapping[str, int]
+
+    def price_kobo(self, fuel_name: str) -> Optional[int]:
+        return self.prices.get(fuel_name.lower())
+
+
+class PriceTable:
+    """Copy-on-write history of fuel prices.
+
+    current() is an immutable PriceVersion swapped in with a single
+    reference assignment, so readers take it without a lock and always
+    see a whole version, never half of a multi-fuel update. It is built
+    on the first read after a change, so a run of update() calls, such
+    as loading a large catalog, copies the prices once rather than once
+    per fuel. History is kept per fuel as the versions that changed it,
+    for price_at() lookups by bisection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Effective time of each version, in microseconds; version n is at n - 1.
+        self._times: List[int] = []
+        # Per lowercased fuel name, the versions that changed its price and
+        # the price each set, None once it was removed.
+        self._history: Dict[str, Tuple[List[int], List[Optional[int]]]] = {}
+        self._latest: Dict[str, int] = {}
+        self._current: Optional[PriceVersion] = PriceVersion(
+            0, datetime.min, MappingProxyType({})
+        )
+
+    def current(self) -> PriceVersion:
+        version = self._current
+        if version is None:
+            with self._lock:
+                version = self._build()
+        return version
+
+    def _build(self) -> PriceVersion:
+        # Called with the lock held.
+        version = self._current
+        if version is None:
+            version = self._current = PriceVersion(
+                len(self._times),
+                from_micros(self._times[-1]),
+                MappingProxyType(dict(self._latest)),
+            )
+        return version
+
+    def update(
+        self,
+        prices: Optional[Dict[str, int]] = None,
+        removed: Iterable[str] = (),
+        timestamp: Optional[datetime] = None,
+    ) -> int:
+        """Record a version with prices (kobo, keyed by fuel name) changed.
+
+        Fuels in removed are dropped from the new version. Returns its
+        version number; current() builds the version itself when next read.
+        """
+        with self._lock:
+            return self._update(prices, removed, timestamp)
+
+    def _update(
+        self,
+        prices: Optional[Dict[str, int]],
+        removed: Iterable[str],
+        timestamp: Optional[datetime],
+    ) -> int:
+        micros = to_micros(timestamp or datetime.now())
+        if self._times and micros < self._times[-1]:
+            # Versions must stay in time order for bisecting; a clock
+            # step backwards publishes at the previous version's time.
+            micros = self._times[-1]
+        self._times.append(micros)
+        number = len(self._times)
+        for fuel_name in removed:
+            fuel_name = fuel_name.lower()
+            if self._latest.pop(fuel_name, None) is not None:
+                self._change(fuel_name, number, None)
+        for fuel_name, price_kobo in (prices or {}).items():
+            fuel_name = fuel_name.lower()
+            self._latest[fuel_name] = price_kobo
+            self._change(fuel_name, number, price_kobo)
+        self._current = None
+        return number
+
+    def _change(self, fuel_name: str, number: int, price_kobo: Optional[int]):
+        versions, prices = self._history.setdefault(fuel_name, ([], []))
+        if versions and versions[-1] == number:
+            prices[-1] = price_kobo
+        else:
+            # Price first: price_at() reads without the lock, and must never
+            # find a version without its price.
+            prices.append(price_kobo)
+            versions.append(number)
+
+    def publish(
+        self,
+        prices: Optional[Dict[str, int]] = None,
+        removed: Iterable[str] = (),
+        timestamp: Optional[datetime] = None,
+    ) -> PriceVersion:
+        """update() and return the new version, for callers that price from it."""
+        with self._lock:
+            self._update(prices, removed, timestamp)
+            return self._build()
+
+    def version_at(self, timestamp: datetime) -> Optional[PriceVersion]:
+        """The version in force at timestamp, or None before the first."""
+        number = bisect_right(self._times, to_micros(timestamp))
+        if not number:
+            return None
+        if number == len(self._times):
+            return self.current()
+        prices = {}
+        with self._lock:
+            for fuel_name in self._history:
+                price_kobo = self._price_in(fuel_name, number)
+                if price_kobo is not None:
+                    prices[fuel_name] = price_kobo
+        return PriceVersion(
+            number, from_micros(self._times[number - 1]), MappingProxyType(prices)
+        )
+
+    def _price_in(self, fuel_name: str, number: int) -> Optional[int]:
+        history = self._history.get(fuel_name)
+        if history is None:
+            return None
+        versions, prices = history
+        index = bisect_right(versions, number)
+        return prices[index - 1] if index else None
+
+    def price_at(self, fuel_name: str, timestamp: datetime) -> Optional[float]:
+        """Price per liter of fuel_name at timestamp, or None if it was not sold."""
+        price_kobo = self._price_in(
+            fuel_name.lower(), bisect_right(self._times, to_micros(timestamp))
+        )
+        return None if price_kobo is None else from_kobo(price_kobo)
+
+    def history(self, fuel_name: str) -> List[tuple]:
+        """(effective_at, price per liter) for every change to fuel_name's price."""
+        versions, prices = self._history.get(fuel_name.lower(), ((), ()))
+        changes = []
+        previous = None
+        for number, price_kobo in zip(versions, prices):
+            if price_kobo != previous:
+                price = None if price_kobo is None else from_kobo(price_kobo)
+                changes.append((from_micros(self._times[number - 1]), price))
+                previous = price_kobo
+        return changes
+
+    def __len__(self) -> int:
+        return len(self._times)
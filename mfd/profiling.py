@@ -0,0 +1,124 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO
+
+PROFILE_MODES = ("cpu", "mem", "actions")
+REPORT_LINES = 25
+
+
+class ActionTimings:
+    """Wall-clock time spent in each named action, e.g. each menu choice."""
+
+    def __init__(self):
+        # Per action, [count, total ns, max ns].
+        self._stats: Dict[str, List[int]] = {}
+
+    def record(self, action: str, elapsed_ns: int):
+        stats = self._stats.get(action)
+        if stats is None:
+            stats = self._stats[action] = [0, 0, 0]
+        stats[0] += 1
+        stats[1] += elapsed_ns
+        if elapsed_ns > stats[2]:
+            stats[2] = elapsed_ns
+
+    @contextmanager
+    def timed(self, action: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(action, time.perf_counter_ns() - start)
+
+    def count(self, action: str) -> int:
+        return self._stats.get(action, (0,))[0]
+
+    def report(self) -> str:
+        lines = [f"{'action':<28} {'count':>8} {'total ms':>10} {'mean ms':>10} {'max ms':>10}"]
+        for action, (count, total_ns, max_ns) in sorted(
+            self._stats.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                f"{action:<28} {count:>8} {total_ns / 1e6:>10.3f} "
+                f"{total_ns / count / 1e6:>10.3f} {max_ns / 1e6:>10.3f}"
+            )
+        return "\n".join(lines)
+
+
+def _cpu_report(profiler: cProfile.Profile) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LINES)
+    return stream.getvalue()
+
+
+def _memory_report(snapshot: tracemalloc.Snapshot, peak: int) -> str:
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    statistics = snapshot.statistics("lineno")
+    lines = [
+        f"Peak traced memory: {peak / 1024:.1f} KiB; "
+        f"still allocated: {sum(stat.size for stat in statistics) / 1024:.1f} KiB",
+        f"Top {min(REPORT_LINES, len(statistics))} allocation sites:",
+    ]
+    lines.extend(f"  {stat}" for stat in statistics[:REPORT_LINES])
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiled(
+    mode: Optional[str], output: Optional[str] = None, report: TextIO = sys.stderr
+) -> Iterator[Optional[ActionTimings]]:
+    """Profile the body and write a report to report when it exits.
+
+    mode "cpu" runs it under cProfile and "mem" under tracemalloc; with
+    output, the raw pstats file or tracemalloc snapshot is saved there
+    too. Every mode yields an ActionTimings for the body to time its
+    actions with; "actions" only times them, which costs next to
+    nothing, and saves the timings report to output. mode None profiles
+    nothing and yields None.
+    """
+    if mode is None:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'; use one of {', '.join(PROFILE_MODES)}")
+
+    timings = ActionTimings()
+    profiler = None
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif mode == "mem":
+        tracemalloc.start()
+    try:
+        yield timings
+    finally:
+        sections = []
+        if profiler is not None:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            sections.append(_cpu_report(profiler))
+        elif mode == "mem":
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if output:
+                snapshot.dump(output)
+            sections.append(_memory_report(snapshot, peak))
+        sections.append(timings.report())
+        if output and mode == "actions":
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(timings.report() + "\n")
+        if output:
+            sections.append(f"Profile written to {output}")
+        print("\n\n".join(["=" * 60 + f"\nPROFILE ({mode})\n" + "=" * 60] + sections), file=report)
@@ -0,0 +1,274 @@
+import csv
+import json
+import math
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple, Union
+
+from mfd.dispenser import Dispenser
+from mfd.fuel import Fuel
+from mfd.fuel_attendant import FuelAttendant
+from mfd.ledger import TransactionLedger
+from mfd.profiling import ActionTimings
+from mfd.tiered_ledger import TieredLedger
+from mfd.transaction import Transaction
+from mfd.units import from_kobo, from_milliliters, to_kobo, to_milliliters
+
+# Operation names and fields are those StationServer accepts.
+REPLAY_FIELDS = ("op", "fuel_name", "liters", "amount", "price", "quantity", "attendant")
+_NUMBER_FIELDS = ("liters", "amount", "price", "quantity")
+_TEXT_FIELDS = ("op", "fuel_name", "attendant")
+DEFAULT_ATTENDANT = "Replay Attendant"
+
+
+class ReplayLine(NamedTuple):
+    """One operation read from a replay file, or why it could not be read."""
+
+    line: int
+    fields: Optional[dict]
+    error: Optional[str] = None
+
+
+class ReplayResult(NamedTuple):
+    line: int
+    op: str
+    transaction: Optional[Transaction]
+    error: Optional[str]
+
+
+def _field_error(fields: dict) -> Optional[str]:
+    """Why fields cannot be replayed as typed, or None if they can."""
+    for name in _TEXT_FIELDS:
+        if name in fields and not isinstance(fields[name], str):
+            return f"Field '{name}' is not a string"
+    for name in _NUMBER_FIELDS:
+        if name in fields:
+            value = fields[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return f"Field '{name}' is not a number"
+            if not math.isfinite(value):
+                return f"Field '{name}' is not a finite number"
+    return None
+
+
+def read_jsonl(stream: Iterable[str]) -> Iterator[ReplayLine]:
+    """One JSON object per line; blank lines are skipped."""
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            fields = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield ReplayLine(line, None, f"Bad JSON: {e}")
+            continue
+        if not isinstance(fields, dict):
+            yield ReplayLine(line, None, "Expected a JSON object")
+            continue
+        error = _field_error(fields)
+        yield ReplayLine(line, fields) if error is None else ReplayLine(line, None, error)
+
+
+def read_csv(stream: Iterable[str]) -> Iterator[ReplayLine]:
+    """CSV with a header naming some of REPLAY_FIELDS; empty cells are left out."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        fields = {name: value for name, value in row.items() if name and value}
+        try:
+            for name in _NUMBER_FIELDS:
+                if name in fields:
+                    fields[name] = float(fields[name])
+        except ValueError:
+            yield ReplayLine(reader.line_num, None, f"Field '{name}' is not a number")
+            continue
+        error = _field_error(fields)
+        if error is not None:
+            yield ReplayLine(reader.line_num, None, error)
+            continue
+        yield ReplayLine(reader.line_num, fields)
+
+
+def read_operations(path: str, format: Optional[str] = None) -> Iterator[ReplayLine]:
+    """Stream the operations in path, as JSON lines or CSV.
+
+    format defaults to "csv" for a .csv file and "jsonl" otherwise.
+    """
+    if format is None:
+        format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if format not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown replay format '{format}'; use jsonl or csv")
+    with open(path, encoding="utf-8", newline="" if format == "csv" else None) as stream:
+        yield from read_csv(stream) if format == "csv" else read_jsonl(stream)
+
+
+class ReplaySummary:
+    """Counts of a replay; kept to counts so it stays small however long the file."""
+
+    def __init__(self):
+        self.applied = 0
+        self.failed = 0
+        # Per op, [applied, failed].
+        self.by_op: Dict[str, list] = {}
+        self.elapsed = 0.0
+
+    @property
+    def operations(self) -> int:
+        return self.applied + self.failed
+
+    def add(self, result: ReplayResult):
+        counts = self.by_op.get(result.op)
+        if counts is None:
+            counts = self.by_op[result.op] = [0, 0]
+        if result.error is None:
+            self.applied += 1
+            counts[0] += 1
+        else:
+            self.failed += 1
+            counts[1] += 1
+
+
+class Replayer:
+    """Applies recorded operations to a dispenser through its attendants.
+
+    Sales go through FuelAttendant.dispense_by_liters/by_amount, named by
+    each operation's "attendant" field or default_attendant. Attendants
+    are created on first use with a ledger from ledger_factory(name);
+    pass one returning a TieredLedger to keep memory bounded over
+    millions of sales.
+    """
+
+    def __init__(
+        self,
+        dispenser: Dispenser,
+        default_attendant: str = DEFAULT_ATTENDANT,
+        ledger_factory: Optional[Callable[[str], Union[TransactionLedger, TieredLedger]]] = None,
+        timings: Optional[ActionTimings] = None,
+    ):
+        self._dispenser = dispenser
+        self._default_attendant = default_attendant
+        self._ledger_factory = ledger_factory
+        self._timings = timings
+        self._attendants: Dict[str, FuelAttendant] = {}
+        self._operations: Dict[str, Callable[[dict], Optional[Transaction]]] = {
+            "add_fuel": self._add_fuel,
+            "update_price": self._update_price,
+            "restock": self._restock,
+            "remove_fuel": self._remove_fuel,
+            "dispense_by_liters": self._dispense_by_liters,
+            "dispense_by_amount": self._dispense_by_amount,
+        }
+
+    @property
+    def attendants(self) -> Dict[str, FuelAttendant]:
+        return dict(self._attendants)
+
+    def attendant(self, name: Optional[str]) -> FuelAttendant:
+        name = name or self._default_attendant
+        attendant = self._attendants.get(name)
+        if attendant is None:
+            ledger = None if self._ledger_factory is None else self._ledger_factory(name)
+            attendant = self._attendants[name] = FuelAttendant(name, self._dispenser, ledger)
+        return attendant
+
+    def apply(self, fields: dict) -> Optional[Transaction]:
+        """Apply one operation; returns the sale it made, if any."""
+        operation = self._operations.get(fields.get("op"))
+        if operation is None:
+            raise ValueError(f"Unknown operation '{fields.get('op')}'")
+        return operation(fields)
+
+    def results(self, lines: Iterable[ReplayLine]) -> Iterator[ReplayResult]:
+        """Apply each line in turn, yielding what became of it."""
+        timings = self._timings
+        for line, fields, error in lines:
+            if error is not None:
+                yield ReplayResult(line, "", None, error)
+                continue
+            # Unknown ops share one name, so bad input cannot grow the summary.
+            op = fields.get("op")
+            op = op if op in self._operations else "unknown"
+            start = time.perf_counter_ns() if timings is not None else 0
+            try:
+                result = ReplayResult(line, op, self.apply(fields), None)
+            except KeyError as e:
+                result = ReplayResult(line, op, None, f"Missing field {e}")
+            except Exception as e:
+                # Whatever goes wrong is that line's error; the replay goes on.
+                result = ReplayResult(line, op, None, str(e) or type(e).__name__)
+            if timings is not None:
+                timings.record(op, time.perf_counter_ns() - start)
+            yield result
+
+    def run(
+        self,
+        lines: Iterable[ReplayLine],
+        receipts: Optional[TextIO] = None,
+        errors: Optional[TextIO] = None,
+        max_errors: Optional[int] = None,
+    ) -> ReplaySummary:
+        """Replay lines to the end and summarize.
+
+        Receipts of sales are written to receipts and rejected lines to
+        errors as they happen; at most max_errors of them are written,
+        though all are counted.
+        """
+        summary = ReplaySummary()
+        start = time.perf_counter()
+        for result in self.results(lines):
+            summary.add(result)
+            if result.error is not None:
+                if errors is not None and (max_errors is None or summary.failed <= max_errors):
+                    op = f"{result.op}: " if result.op else ""
+                    print(f"line {result.line}: {op}{result.error}", file=errors)
+            elif receipts is not None and result.transaction is not None:
+                print(result.transaction.generate_receipt(), file=receipts)
+        summary.elapsed = time.perf_counter() - start
+        return summary
+
+    def _add_fuel(self, fields: dict) -> None:
+        self._dispenser.add_fuel(Fuel(fields["fuel_name"], fields["price"], fields["quantity"]))
+
+    def _update_price(self, fields: dict) -> None:
+        self._dispenser.update_fuel_price(fields["fuel_name"], fields["price"])
+
+    def _restock(self, fields: dict) -> None:
+        self._dispenser.restock_fuel(fields["fuel_name"], fields["liters"])
+
+    def _remove_fuel(self, fields: dict) -> None:
+        if not self._dispenser.remove_fuel(fields["fuel_name"]):
+            raise ValueError(f"Fuel '{fields['fuel_name']}' not found in the dispenser")
+
+    def _dispense_by_liters(self, fields: dict) -> Transaction:
+        attendant = self.attendant(fields.get("attendant"))
+        return attendant.dispense_by_liters(fields["fuel_name"], fields["liters"])
+
+    def _dispense_by_amount(self, fields: dict) -> Transaction:
+        attendant = self.attendant(fields.get("attendant"))
+        return attendant.dispense_by_amount(fields["fuel_name"], fields["amount"])
+
+
+def tiered_ledgers(
+    directory: str, memory_budget: int = 4 * 1024 * 1024
+) -> Callable[[str], TieredLedger]:
+    """ledger_factory giving each attendant a TieredLedger under directory."""
+    count = 0
+
+    def factory(name: str) -> TieredLedger:
+        nonlocal count
+        count += 1
+        return TieredLedger(os.path.join(directory, f"attendant-{count:04d}"), memory_budget)
+
+    return factory
+
+
+def totals(attendants: Iterable[FuelAttendant]) -> Tuple[int, float, float]:
+    """(sales, liters, amount) across attendants.
+
+    Summed in millilitres and kobo, so long replays never drift.
+    """
+    count = milliliters = kobo = 0
+    for attendant in attendants:
+        summary = attendant.get_transaction_summary()
+        count += summary["total_transactions"]
+        milliliters += to_milliliters(summary["total_liters"])
+        kobo += to_kobo(summary["total_amount"])
+    return count, from_milliliters(milliliters), from_kobo(kobo)
@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from mfd.fuel import Fuel
+from mfd.timer_wheel import TimerWheel
+from mfd.units import from_kobo, from_milliliters
+
+DEFAULT_RESERVATION_TIMEOUT = 120.0
+
+
+class Reservation(NamedTuple):
+    """Stock held for one pump session, priced when it was authorized."""
+
+    reservation_id: int
+    fuel: Fuel
+    milliliters: int
+    price_kobo: int
+    # The most the customer can be charged.
+    kobo: int
+    transaction_type: str
+    # On the book's clock (time.monotonic by default).
+    expires_at: float
+
+    @property
+    def fuel_name(self) -> str:
+        return self.fuel.fuel_name
+
+    @property
+    def liters(self) -> float:
+        return from_milliliters(self.milliliters)
+
+    @property
+    def amount(self) -> float:
+        return from_kobo(self.kobo)
+
+
+class ReservationBook:
+    """Open reservations of one dispenser, expired through a timer wheel.
+
+    The stock itself is held on each Fuel (see Fuel.reserve_milliliters)
+    and must be held and released under that fuel's lock; the book only
+    tracks which reservations are open. Its lock is a leaf: it is never
+    held while a fuel lock is taken.
+    """
+
+    def __init__(self, thread_safe: bool = False, clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock() if thread_safe else nullcontext()
+        self._clock = clock
+        self._open: Dict[int, Reservation] = {}
+        # Per fuel, its open reservations and a heap of (deadline, id) in
+        # which closed ones are only dropped when they reach the top.
+        self._of_fuel: Dict[Fuel, Dict[int, Reservation]] = {}
+        self._deadlines: Dict[Fuel, List[Tuple[float, int]]] = {}
+        self._wheel = TimerWheel(tick=0.1, slots=1024, start=clock())
+        self._ids = itertools.count(1)
+
+    def clock(self) -> float:
+        return self._clock()
+
+    def hold(
+        self,
+        fuel: Fuel,
+        milliliters: int,
+        price_kobo: int,
+        kobo: int,
+        transaction_type: str,
+        timeout: float,
+    ) -> Reservation:
+        """Hold milliliters of fuel; call with the fuel's lock held."""
+        if timeout <= 0:
+            raise ValueError("Reservation timeout must be positive")
+        fuel.reserve_milliliters(milliliters)
+        with self._lock:
+            reservation = Reservation(
+                next(self._ids),
+                fuel,
+                milliliters,
+                price_kobo,
+                kobo,
+                transaction_type,
+                self._clock() + timeout,
+            )
+            self._add(reservation)
+            self._wheel.schedule(reservation.reservation_id, reservation.expires_at)
+        return reservation
+
+    def _add(self, reservation: Reservation):
+        self._open[reservation.reservation_id] = reservation
+        of_fuel = self._of_fuel.setdefault(reservation.fuel, {})
+        of_fuel[reservation.reservation_id] = reservation
+        deadlines = self._deadlines.setdefault(reservation.fuel, [])
+        heapq.heappush(deadlines, (reservation.expires_at, reservation.reservation_id))
+        if len(deadlines) > 2 * len(of_fuel) + 64:
+            # Mostly settled reservations; keep the heap in proportion.
+            deadlines[:] = [(held.expires_at, held.reservation_id) for held in of_fuel.values()]
+            heapq.heapify(deadlines)
+
+    def _close(self, reservation: Reservation):
+        del self._open[reservation.reservation_id]
+        of_fuel = self._of_fuel[reservation.fuel]
+        del of_fuel[reservation.reservation_id]
+        if not of_fuel:
+            del self._of_fuel[reservation.fuel]
+            del self._deadlines[reservation.fuel]
+
+    def get(self, reservation_id: int) -> Optional[Reservation]:
+        return self._open.get(reservation_id)
+
+    def take(self, reservation_id: int) -> Optional[Reservation]:
+        """Close a reservation; only one caller ever gets it back.
+
+        The caller releases its stock, under the fuel's lock.
+        """
+        with self._lock:
+            reservation = self._open.get(reservation_id)
+            if reservation is not None:
+                self._close(reservation)
+                self._wheel.cancel(reservation_id)
+            return reservation
+
+    def take_expired(self, now: Optional[float] = None) -> List[Reservation]:
+        """Close every reservation past its deadline and return them."""
+        with self._lock:
+            expired = [
+                self._open[reservation_id]
+                for reservation_id in self._wheel.advance(self._clock() if now is None else now)
+            ]
+            for reservation in expired:
+                self._close(reservation)
+            return expired
+
+    def take_expired_of(self, fuel: Fuel, now: Optional[float] = None) -> List[Reservation]:
+        """Close the reservations of fuel past their deadline and return them.
+
+        Unlike take_expired(), safe to call with fuel's lock held: the
+        caller can release their stock without taking any other fuel lock.
+        Only fuel's deadline heap is touched, so the cost does not grow
+        with other fuels' reservations.
+        """
+        with self._lock:
+            now = self._clock() if now is None else now
+            deadlines = self._deadlines.get(fuel, [])
+            expired = []
+            while deadlines and deadlines[0][0] <= now:
+                _, reservation_id = heapq.heappop(deadlines)
+                reservation = self._open.get(reservation_id)
+                if reservation is None:
+                    continue
+                self._close(reservation)
+                self._wheel.cancel(reservation_id)
+                expired.append(reservation)
+            return expired
+
+    def take_fuel(self, fuel: Fuel) -> List[Reservation]:
+        """Close every reservation of fuel, for when it leaves the dispenser."""
+        with self._lock:
+            taken = list(self._of_fuel.get(fuel, {}).values())
+            for reservation in taken:
+                self._close(reservation)
+                self._wheel.cancel(reservation.reservation_id)
+            return taken
+
+    def __len__(self) -> int:
+        return len(self._open)
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import math
+import struct
+from typing import Callable, Dict, Optional, Tuple
+
+from mfd.dispenser import Dispenser
+from mfd.fuel_attendant import FuelAttendant
+
+# Frames are a 4-byte big-endian length followed by a UTF-8 JSON object.
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1 << 20
+# Attendants are created on a client's first request under a new name;
+# past this many, new names are refused so clients cannot grow memory.
+DEFAULT_MAX_ATTENDANTS = 1024
+
+# Types a request's fields must have when present; JSON null is allowed
+# only where the operation treats it as "not given".
+_FIELD_TYPES: Dict[str, Tuple[type, ...]] = {
+    "op": (str,),
+    "attendant": (str,),
+    "fuel_name": (str,),
+    "liters": (int, float),
+    "amount": (int, float),
+    "price": (int, float),
+    "page_size": (int,),
+    "cursor": (str, type(None)),
+}
+
+# Fields each operation cannot do without.
+_REQUIRED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "dispense_by_liters": ("attendant", "fuel_name", "liters"),
+    "dispense_by_amount": ("attendant", "fuel_name", "amount"),
+    "update_price": ("fuel_name", "price"),
+    "restock": ("fuel_name", "liters"),
+    "summary": ("attendant",),
+    "list": ("attendant",),
+    "fuels": (),
+}
+
+
+def _field_error(request: dict) -> Optional[str]:
+    """Why request's fields have the wrong types, or None if they are fine."""
+    for name, types in _FIELD_TYPES.items():
+        if name not in request:
+            continue
+        value = request[name]
+        # bool is an int, but true is never a quantity.
+        if isinstance(value, bool) or not isinstance(value, types):
+            kind = "a string" if types[0] is str else "a number"
+            return f"Field '{name}' must be {kind}"
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"Field '{name}' must be a finite number"
+    return None
+
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[dict]:
+    """Read one frame, or return None when the peer closed the connection."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {length} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return json.loads(await reader.readexactly(length))
+
+
+class StationServer:
+    """Serves one station's Dispenser and attendants over TCP.
+
+    Every connection is a coroutine on a single event loop; operations
+    run inline because each one is a few microseconds of in-memory work.
+    Requests are {"id", "op", ...arguments} and every response echoes the
+    id with either "result" or "error". An attendant named in a request
+    is created on first use, up to max_attendants in all.
+    """
+
+    def __init__(
+        self,
+        dispenser: Dispenser,
+        attendants: Optional[Dict[str, FuelAttendant]] = None,
+        max_attendants: int = DEFAULT_MAX_ATTENDANTS,
+    ):
+        self._dispenser = dispenser
+        self._attendants = attendants if attendants is not None else {}
+        self._max_attendants = max_attendants
+        self._operations: Dict[str, Callable[[dict], object]] = {
+            "dispense_by_liters": self._dispense_by_liters,
+            "dispense_by_amount": self._dispense_by_amount,
+            "update_price": self._update_price,
+            "restock": self._restock,
+            "summary": self._summary,
+            "list": self._list,
+            "fuels": self._fuels,
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def attendant(self, name: str) -> FuelAttendant:
+        attendant = self._attendants.get(name)
+        if attendant is None:
+            if len(self._attendants) >= self._max_attendants:
+                raise ValueError(
+                    f"Unknown attendant '{name}'; the station already has "
+                    f"{self._max_attendants} attendants"
+                )
+            attendant = self._attendants[name] = FuelAttendant(name, self._dispenser)
+        return attendant
+
+    def handle(self, request: object) -> dict:
+        """Run one request; whatever is wrong with it comes back as an error response."""
+        if not isinstance(request, dict):
+            return {"id": None, "error": "Request must be a JSON object"}
+        response = {"id": request.get("id")}
+        error = _field_error(request)
+        if error is not None:
+            response["error"] = error
+            return response
+        operation = self._operations.get(request.get("op"))
+        if operation is None:
+            response["error"] = f"Unknown operation '{request.get('op')}'"
+            return response
+        for name in _REQUIRED_FIELDS[request["op"]]:
+            if name not in request:
+                response["error"] = f"Missing field '{name}'"
+                return response
+        try:
+            response["result"] = operation(request)
+        except Exception as e:
+            # One bad request must not drop the connection it came on.
+            response["error"] = str(e) or type(e).__name__
+        return response
+
+    def _dispense_by_liters(self, request: dict) -> dict:
+        attendant = self.attendant(request["attendant"])
+        return attendant.dispense_by_liters(request["fuel_name"], request["liters"]).to_dict()
+
+    def _dispense_by_amount(self, request: dict) -> dict:
+        attendant = self.attendant(request["attendant"])
+        return attendant.dispense_by_amount(request["fuel_name"], request["amount"]).to_dict()
+
+    def _update_price(self, request: dict) -> None:
+        self._dispenser.update_fuel_price(request["fuel_name"], request["price"])
+
+    def _restock(self, request: dict) -> None:
+        self._dispenser.restock_fuel(request["fuel_name"], request["liters"])
+
+    def _summary(self, request: dict) -> dict:
+        return self.attendant(request["attendant"]).get_transaction_summary()
+
+    def _list(self, request: dict) -> dict:
+        page = self.attendant(request["attendant"]).list_transactions(
+            request.get("page_size", 20), request.get("cursor")
+        )
+        return {
+            "transactions": [transaction.to_dict() for transaction in page.transactions],
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+
+    def _fuels(self, request: dict) -> list:
+        return [
+            {"fuel_name": fuel.fuel_name, "price": fuel.price_per_liter, "quantity": fuel.quantity}
+            for fuel in self._dispenser.get_all_fuels().values()
+        ]
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (ValueError, json.JSONDecodeError) as e:
+                    writer.write(encode_frame({"id": None, "error": f"Bad frame: {e}"}))
+                    break
+                if request is None:
+                    break
+                writer.write(encode_frame(self.handle(request)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> int:
+        """Start listening and return the bound port (useful with port 0)."""
+        self._server = await asyncio.start_server(self._serve_connection, host, port, backlog=1024)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def _main(host: str, port: int, max_attendants: int = DEFAULT_MAX_ATTENDANTS):
+    dispenser = Dispenser()
+    attendant = FuelAttendant("Default Attendant", dispenser)
+    attendant.add_fuel("Petrol", 650.0, 1_000_000.0)
+    attendant.add_fuel("Diesel", 700.0, 1_000_000.0)
+    server = StationServer(dispenser, {attendant.full_name: attendant}, max_attendants)
+    bound = await server.start(host, port)
+    print(f"MFDS station server listening on {host}:{bound}")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fuel station over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--max-attendants",
+        type=int,
+        default=DEFAULT_MAX_ATTENDANTS,
+        help="most attendants clients can create by name",
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.host, args.port, args.max_attendants))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
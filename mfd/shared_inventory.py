@@ -0,0 +1,237 @@
+import multiprocessing
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+from mfd import ids
+from mfd.errors import UnknownFuelError
+from mfd.fuel import Fuel
+
+# Each slot is (price in kobo, quantity in millilitres, generation, in use,
+# UTF-8 fuel name). The generation goes up whenever the slot is filled or
+# freed, so a view of a fuel that has since been removed can tell.
+_SLOT = struct.Struct("<qqq?63s")
+_INTEGERS_PER_SLOT = _SLOT.size // 8
+_GENERATION = 2
+_IN_USE_OFFSET = 24
+MAX_NAME_BYTES = 63
+
+
+class SharedInventory:
+    """Fuel prices and quantities in a shared memory block, one slot per fuel.
+
+    Every slot has its own multiprocessing lock, so any process attached
+    to the inventory can check and reduce a tank atomically without a
+    round trip to a server. Pass the inventory to child processes as a
+    Process argument and give each one its own Dispenser(inventory=...).
+    The locks come from context, which must match the context the pump
+    processes are started with.
+
+    It also hands out node IDs: every process attached through a
+    Dispenser mints transaction IDs under one no other attached process
+    has (see claim_node_id()).
+    """
+
+    def __init__(self, capacity: int = 64, context=None):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self._capacity = capacity
+        self._memory = shared_memory.SharedMemory(create=True, size=capacity * _SLOT.size)
+        # Only the creating process frees the block, even in forked children.
+        self._owner_pid = os.getpid()
+        context = context or multiprocessing.get_context()
+        self._catalog_lock = context.Lock()
+        self._locks = [context.Lock() for _ in range(capacity)]
+        # One flag per node ID, set once a process attached has taken it.
+        self._nodes = context.Array("B", ids.MAX_NODE_ID + 1)
+        self._node: Optional[Tuple[int, int]] = None
+        self._attach()
+
+    def _attach(self):
+        self._values = self._memory.buf.cast("q")
+
+    def __getstate__(self) -> dict:
+        return {
+            "capacity": self._capacity,
+            "name": self._memory.name,
+            "catalog_lock": self._catalog_lock,
+            "locks": self._locks,
+            "nodes": self._nodes,
+        }
+
+    def __setstate__(self, state: dict):
+        self._capacity = state["capacity"]
+        self._memory = shared_memory.SharedMemory(name=state["name"])
+        self._owner_pid = None
+        self._catalog_lock = state["catalog_lock"]
+        self._locks = state["locks"]
+        self._nodes = state["nodes"]
+        self._node = None
+        self._attach()
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def slot_lock(self, slot: int):
+        return self._locks[slot]
+
+    def _in_use(self, slot: int) -> bool:
+        return bool(self._memory.buf[slot * _SLOT.size + _IN_USE_OFFSET])
+
+    def _slot_name(self, slot: int) -> str:
+        _, _, _, _, encoded = _SLOT.unpack_from(self._memory.buf, slot * _SLOT.size)
+        return encoded.rstrip(b"\0").decode("utf-8")
+
+    def _generation(self, slot: int) -> int:
+        return self._values[slot * _INTEGERS_PER_SLOT + _GENERATION]
+
+    def _used_slots(self) -> Iterator[int]:
+        return (slot for slot in range(self._capacity) if self._in_use(slot))
+
+    def add(self, fuel: Fuel) -> "SharedFuel":
+        """Copy a fuel into a free slot and return its shared view."""
+        encoded = fuel.fuel_name.encode("utf-8")
+        if len(encoded) > MAX_NAME_BYTES:
+            raise ValueError(f"Fuel name cannot be longer than {MAX_NAME_BYTES} bytes")
+        name_lower = fuel.fuel_name.lower()
+        with self._catalog_lock:
+            free = None
+            for slot in range(self._capacity):
+                if not self._in_use(slot):
+                    if free is None:
+                        free = slot
+                elif self._slot_name(slot).lower() == name_lower:
+                    raise ValueError(f"Fuel '{fuel.fuel_name}' already exists in the inventory")
+            if free is None:
+                raise ValueError(f"Inventory is full ({self._capacity} fuels)")
+            with self._locks[free]:
+                generation = self._generation(free) + 1
+                _SLOT.pack_into(
+                    self._memory.buf, free * _SLOT.size,
+                    fuel.price_kobo, fuel.quantity_ml, generation, True, encoded,
+                )
+        return SharedFuel(self, free, fuel.fuel_name, generation)
+
+    def remove(self, fuel_name: str) -> bool:
+        name_lower = fuel_name.lower()
+        with self._catalog_lock:
+            for slot in self._used_slots():
+                if self._slot_name(slot).lower() == name_lower:
+                    with self._locks[slot]:
+                        _SLOT.pack_into(
+                            self._memory.buf, slot * _SLOT.size,
+                            0, 0, self._generation(slot) + 1, False, b"",
+                        )
+                    return True
+        return False
+
+    def fuels(self) -> List["SharedFuel"]:
+        with self._catalog_lock:
+            return [
+                SharedFuel(self, slot, self._slot_name(slot), self._generation(slot))
+                for slot in self._used_slots()
+            ]
+
+    def claim_node_id(self) -> int:
+        """Register the node ID this process mints under, so no other attached process gets it.
+
+        A process without one (see ids.assigned_node_id()) is handed the
+        lowest free node ID. Raises ValueError if this process's own node
+        ID is already held by another attached process. Node IDs are held
+        for the life of the inventory, even after their process closes
+        it: a successor under the same ID could mint in the millisecond
+        its predecessor last minted in.
+        """
+        pid = os.getpid()
+        if self._node is not None and self._node[0] == pid:
+            return self._node[1]
+        with self._nodes.get_lock():
+            node_id = ids.assigned_node_id()
+            if node_id is None:
+                node_id = next(
+                    (node for node in range(len(self._nodes)) if not self._nodes[node]), None
+                )
+                if node_id is None:
+                    raise ValueError("Every node ID is held by a process on this inventory")
+                ids.use_node_id(node_id)
+            elif self._nodes[node_id]:
+                raise ValueError(
+                    f"Node ID {node_id} is already held by another process on this inventory"
+                )
+            self._nodes[node_id] = 1
+        self._node = (pid, node_id)
+        return node_id
+
+    def close(self):
+        """Detach this process; the owner also frees the block."""
+        self._values.release()
+        self._memory.close()
+        if self._owner_pid == os.getpid():
+            self._memory.unlink()
+
+    def __enter__(self) -> "SharedInventory":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedFuel(Fuel):
+    """A Fuel whose price and quantity live in a SharedInventory slot.
+
+    All Fuel methods work unchanged; mutations must happen under the slot
+    lock, which Dispenser.fuel_lock hands out for shared fuels. Once any
+    process removes the fuel, every access to its price or quantity
+    raises ValueError, even after the slot is reused for another fuel.
+    """
+
+    def __init__(self, inventory: SharedInventory, slot: int, fuel_name: str, generation: int):
+        self._inventory = inventory
+        self._slot = slot
+        self._index = slot * _INTEGERS_PER_SLOT
+        self._generation = generation
+        self._fuel_name = fuel_name
+        # Other processes change the quantity too, so crossings seen here
+        # are incomplete; Dispenser scans shared fuels instead.
+        self._availability_listener = None
+        self._quantity_listener = None
+        self._price_listener = None
+        # Reservations are held by the process that made them.
+        self._reserved_ml = 0
+
+    @property
+    def lock(self):
+        return self._inventory.slot_lock(self._slot)
+
+    @property
+    def removed(self) -> bool:
+        return self._inventory._values[self._index + _GENERATION] != self._generation
+
+    def _slot_values(self):
+        values = self._inventory._values
+        if values[self._index + _GENERATION] != self._generation:
+            raise UnknownFuelError(f"Fuel '{self._fuel_name}' has been removed")
+        return values
+
+    @property
+    def _price_kobo(self) -> int:
+        return self._slot_values()[self._index]
+
+    @_price_kobo.setter
+    def _price_kobo(self, value: int):
+        self._slot_values()[self._index] = value
+
+    @property
+    def _quantity_ml(self) -> int:
+        return self._slot_values()[self._index + 1]
+
+    @_quantity_ml.setter
+    def _quantity_ml(self, value: int):
+        self._slot_values()[self._index + 1] = value
+
@@ -0,0 +1,228 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Optional, Tuple
+
+from mfd.dispenser import Dispenser
+from mfd.fuel import Fuel
+from mfd.fuel_attendant import FuelAttendant
+from mfd.journal import DISPENSE, Journal, apply_record, read_journal
+from mfd.journal import MAGIC as JOURNAL_MAGIC
+
+MAGIC = b"MFDSNAP1"
+# (journal offset covered, CRC-32 of the compressed body)
+_HEADER = struct.Struct("<QI")
+_PREFIX = "snapshot-"
+_SUFFIX = ".snap"
+
+
+def capture(
+    dispenser: Dispenser,
+    attendants: Dict[str, FuelAttendant],
+    journal: Journal,
+) -> dict:
+    """Copy the fuel table and attendant totals along with the journal offset.
+
+    Every lock is held only while the small tables are copied, which is the
+    only moment dispensing waits on a snapshot. The dispenser must be
+    thread-safe: without fuel locks a capture could land between a sale's
+    stock change and its journal record, and recovery would apply the sale
+    twice.
+    """
+    _require_thread_safe(dispenser)
+    with dispenser.locked():
+        return {
+            "journal_offset": journal.offset,
+            "fuels": [
+                [fuel.fuel_name, fuel.price_per_liter, fuel.quantity]
+                for fuel in dispenser.get_all_fuels().values()
+            ],
+            "attendants": {
+                name: attendant.get_transaction_summary()
+                for name, attendant in list(attendants.items())
+            },
+        }
+
+
+def _require_thread_safe(dispenser: Dispenser):
+    if not dispenser.thread_safe:
+        raise ValueError("Snapshots need a thread-safe dispenser")
+
+
+def write_snapshot(directory: str, state: dict) -> str:
+    """Write state atomically and return the snapshot path."""
+    body = zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+    offset = state["journal_offset"]
+    path = os.path.join(directory, f"{_PREFIX}{offset:016d}{_SUFFIX}")
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC)
+        snapshot_file.write(_HEADER.pack(offset, zlib.crc32(body)))
+        snapshot_file.write(body)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temporary, path)
+    return path
+
+
+def read_snapshot(path: str) -> dict:
+    with open(path, "rb") as snapshot_file:
+        data = snapshot_file.read()
+    if not data.startswith(MAGIC) or len(data) < len(MAGIC) + _HEADER.size:
+        raise ValueError(f"'{path}' is not an MFD snapshot")
+    offset, checksum = _HEADER.unpack_from(data, len(MAGIC))
+    body = data[len(MAGIC) + _HEADER.size:]
+    if zlib.crc32(body) != checksum:
+        raise ValueError(f"Snapshot '{path}' is corrupt")
+    state = json.loads(zlib.decompress(body))
+    if state["journal_offset"] != offset:
+        raise ValueError(f"Snapshot '{path}' is corrupt")
+    return state
+
+
+def list_snapshots(directory: str) -> list:
+    """Snapshot paths in the directory, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = [
+        name for name in os.listdir(directory)
+        if name.startswith(_PREFIX) and name.endswith(_SUFFIX)
+    ]
+    return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+
+
+def take_snapshot(
+    directory: str,
+    dispenser: Dispenser,
+    attendants: Dict[str, FuelAttendant],
+    journal: Journal,
+    keep: int = 2,
+) -> str:
+    state = capture(dispenser, attendants, journal)
+    # The journal must be durable up to the offset the snapshot covers,
+    # or a crash could leave a snapshot that points past the journal end.
+    journal.sync()
+    path = write_snapshot(directory, state)
+    for old in list_snapshots(directory)[keep:]:
+        os.remove(old)
+    return path
+
+
+def load_latest_snapshot(directory: str) -> Optional[dict]:
+    for path in list_snapshots(directory):
+        try:
+            return read_snapshot(path)
+        except (ValueError, OSError, zlib.error):
+            continue
+    return None
+
+
+def recover(
+    journal_path: str,
+    snapshot_directory: str,
+    thread_safe: bool = True,
+    history: bool = False,
+    **journal_options,
+) -> Tuple[Dispenser, Dict[str, FuelAttendant], Journal]:
+    """Load the newest snapshot, then replay only the journal after it.
+
+    Attendants restored from a snapshot carry its totals, but by default
+    their ledgers hold only the sales replayed from the journal tail:
+    show_all_transactions(), query_transactions() and forecasts see
+    nothing from before the snapshot. That keeps startup time flat as
+    history grows. With history=True the older sales are read back from
+    the journal into the ledgers too, without replaying their stock
+    changes; this costs a read of the whole journal.
+
+    The dispenser is thread-safe by default so it can be snapshotted;
+    with thread_safe=False it can be used, but not snapshotted.
+    """
+    dispenser = Dispenser(thread_safe=thread_safe)
+    attendants: Dict[str, FuelAttendant] = {}
+    start = len(JOURNAL_MAGIC)
+
+    state = load_latest_snapshot(snapshot_directory)
+    if state is not None:
+        start = state["journal_offset"]
+        for fuel_name, price, quantity in state["fuels"]:
+            dispenser.add_fuel(Fuel(fuel_name, price, quantity))
+        if history and os.path.exists(journal_path):
+            _load_history(journal_path, start, dispenser, attendants)
+        for name, summary in state["attendants"].items():
+            attendant = attendants.get(name)
+            if attendant is None:
+                attendant = attendants[name] = FuelAttendant(name, dispenser)
+            # The snapshot's totals win over whatever the history added up to.
+            attendant._restore_summary(summary)
+
+    end = None
+    if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+        end = start
+        for end, record_type, fields in read_journal(journal_path, start):
+            apply_record(record_type, fields, dispenser, attendants)
+    journal = Journal(journal_path, truncate_at=end, **journal_options)
+    dispenser.attach_journal(journal)
+    return dispenser, attendants, journal
+
+
+def _load_history(
+    journal_path: str, end: int, dispenser: Dispenser, attendants: Dict[str, FuelAttendant]
+):
+    """Record the sales journaled before offset end, leaving stock alone."""
+    for offset, record_type, transaction in read_journal(journal_path):
+        if offset > end:
+            break
+        if record_type != DISPENSE:
+            continue
+        attendant = attendants.get(transaction.attendant_name)
+        if attendant is None:
+            attendant = attendants[transaction.attendant_name] = FuelAttendant(
+                transaction.attendant_name, dispenser
+            )
+        attendant._record_transaction(transaction)
+
+
+class Snapshotter:
+    """Takes a snapshot every interval seconds on a background thread."""
+
+    def __init__(
+        self,
+        directory: str,
+        dispenser: Dispenser,
+        attendants: Dict[str, FuelAttendant],
+        journal: Journal,
+        interval: float = 300.0,
+        keep: int = 2,
+    ):
+        _require_thread_safe(dispenser)
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._dispenser = dispenser
+        self._attendants = attendants
+        self._journal = journal
+        self._interval = interval
+        self._keep = keep
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> str:
+        return take_snapshot(
+            self._directory, self._dispenser, self._attendants, self._journal, self._keep
+        )
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.snapshot()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,336 @@
+import json
+import lzma
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from mfd.ledger import TransactionLedger, to_micros
+from mfd.transaction import Transaction
+
+MAGIC = b"MFDSEG01"
+# compression, in time order, rows, min and max timestamp (micros)
+_HEADER = struct.Struct("<B?qqq")
+_LENGTH = struct.Struct("<I")
+_COMPRESSORS = {"zlib": (1, zlib), "lzma": (2, lzma)}
+_DECOMPRESSORS = {code: module for code, module in _COMPRESSORS.values()}
+_NUMERIC = ("ids", "timestamps", "milliliters", "kobo")
+_STRINGS = ("fuel_names", "attendants", "types")
+# Resident cost of one Segment index entry, path included.
+_INDEX_BYTES = 400
+
+
+class Segment(NamedTuple):
+    """Index entry of one sealed, immutable segment file."""
+
+    path: str
+    first_row: int
+    rows: int
+    min_micros: int
+    max_micros: int
+    in_time_order: bool
+
+    def overlaps(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        return (start is None or self.max_micros >= to_micros(start)) and (
+            end is None or self.min_micros < to_micros(end)
+        )
+
+
+def _to_little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def write_segment(path: str, columns: dict, compression: str = "zlib") -> Segment:
+    """Seal rows, as returned by TransactionLedger.columns(), into a file at path.
+
+    The file is written next to path and renamed into place, so a
+    segment is either whole or absent.
+    """
+    code, module = _COMPRESSORS[compression]
+    header = {
+        name: {"values": columns[name][0], "typecode": columns[name][1].typecode}
+        for name in _STRINGS
+    }
+    header["custom_ids"] = {str(row): custom_id for row, custom_id in columns["custom_ids"].items()}
+    header_bytes = json.dumps(header).encode("utf-8")
+    parts = [_LENGTH.pack(len(header_bytes)), header_bytes]
+    parts.extend(_to_little_endian(columns[name]) for name in _NUMERIC)
+    parts.extend(_to_little_endian(columns[name][1]) for name in _STRINGS)
+
+    timestamps = columns["timestamps"]
+    rows = len(timestamps)
+    in_time_order = all(earlier <= later for earlier, later in zip(timestamps, timestamps[1:]))
+    min_micros, max_micros = min(timestamps), max(timestamps)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(code, in_time_order, rows, min_micros, max_micros))
+        f.write(module.compress(b"".join(parts)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return Segment(path, 0, rows, min_micros, max_micros, in_time_order)
+
+
+def read_segment_header(path: str, first_row: int = 0) -> Segment:
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + _HEADER.size)
+    if len(head) < len(MAGIC) + _HEADER.size or head[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{path}' is not a ledger segment")
+    _, in_time_order, rows, min_micros, max_micros = _HEADER.unpack_from(head, len(MAGIC))
+    return Segment(path, first_row, rows, min_micros, max_micros, in_time_order)
+
+
+def read_segment(path: str) -> TransactionLedger:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{path}' is not a ledger segment")
+    code, _, rows, _, _ = _HEADER.unpack_from(data, len(MAGIC))
+    payload = _DECOMPRESSORS[code].decompress(data[len(MAGIC) + _HEADER.size:])
+
+    (header_length,) = _LENGTH.unpack_from(payload)
+    offset = _LENGTH.size + header_length
+    header = json.loads(payload[_LENGTH.size:offset])
+    columns = {}
+    for name in _NUMERIC:
+        columns[name] = _from_little_endian("q", payload[offset:offset + rows * 8])
+        offset += rows * 8
+    for name in _STRINGS:
+        typecode = header[name]["typecode"]
+        size = rows * array(typecode).itemsize
+        columns[name] = (
+            header[name]["values"],
+            _from_little_endian(typecode, payload[offset:offset + size]),
+        )
+        offset += size
+    columns["custom_ids"] = {int(row): custom_id for row, custom_id in header["custom_ids"].items()}
+    return TransactionLedger.from_columns(columns)
+
+
+class TieredLedger:
+    """TransactionLedger whose older rows are sealed into compressed files.
+
+    Recent rows live in an in-memory TransactionLedger, the hot tier.
+    Whenever it outgrows its share of memory_budget, its oldest rows are
+    written to an immutable segment file in directory and dropped from
+    memory. What stays resident is the hot tier, a byte-bounded cache of
+    recently read segments and an index entry (row range and min/max
+    timestamp) of a few hundred bytes per segment; the budget should
+    hold several segments' worth of rows.
+    Reads work across both tiers with the same methods as
+    TransactionLedger, and time-bounded queries skip segments whose
+    timestamps fall outside the window.
+
+    Row numbers never change when rows are sealed. Positions follow time
+    order within each tier and tiers follow one another, which is global
+    time order as long as sales arrive in time order. Segments already
+    in directory are reopened as sealed history.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        memory_budget: int = 16 * 1024 * 1024,
+        segment_rows: int = 10_000,
+        compression: str = "zlib",
+    ):
+        if compression not in _COMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}'; use zlib or lzma")
+        if segment_rows < 1:
+            raise ValueError("Segments need at least one row")
+        if memory_budget <= 0:
+            raise ValueError("Memory budget must be positive")
+        self._directory = directory
+        self._compression = compression
+        self._segment_rows = segment_rows
+        # A quarter of the budget caches segments read back from disk. The
+        # hot tier gets half of what the index leaves of the rest, as
+        # sealing briefly copies it.
+        self._memory_budget = memory_budget
+        self._cache_budget = memory_budget // 4
+        self._check_every = min(segment_rows, 1024)
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[Segment] = []
+        self._segment_starts: List[int] = []
+        first_row = 0
+        for name in sorted(os.listdir(directory)):
+            if name.startswith("segment-") and name.endswith(".mfdseg"):
+                segment = read_segment_header(os.path.join(directory, name), first_row)
+                self._segments.append(segment)
+                self._segment_starts.append(first_row)
+                first_row += segment.rows
+        # (first row, ledger), swapped as one reference so that readers
+        # outside the owner's lock never pair a base with the wrong tier.
+        self._hot: Tuple[int, TransactionLedger] = (first_row, TransactionLedger())
+        self._next_check = self._check_every
+        self._cache: "OrderedDict[str, TransactionLedger]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+
+    @property
+    def segments(self) -> List[Segment]:
+        return list(self._segments)
+
+    @property
+    def sealed_rows(self) -> int:
+        return self._hot[0]
+
+    def nbytes(self) -> int:
+        """Approximate resident memory: hot tier, segment cache and index."""
+        return self._hot[1].nbytes() + self._cache_bytes + len(self._segments) * _INDEX_BYTES
+
+    def _hot_budget(self) -> int:
+        index_bytes = len(self._segments) * _INDEX_BYTES
+        return (self._memory_budget - self._cache_budget - index_bytes) // 2
+
+    def append(self, transaction: Transaction) -> int:
+        base, hot = self._hot
+        row = base + hot.append(transaction)
+        if len(hot) >= self._next_check:
+            self._enforce_budget()
+        return row
+
+    def extend(self, transactions: List[Transaction]):
+        hot = self._hot[1]
+        hot.extend(transactions)
+        if len(hot) >= self._next_check:
+            self._enforce_budget()
+
+    def _enforce_budget(self):
+        base, hot = self._hot
+        while len(hot) and hot.nbytes() > self._hot_budget():
+            count = min(self._segment_rows, len(hot))
+            path = os.path.join(self._directory, f"segment-{base:012d}.mfdseg")
+            segment = write_segment(path, hot.columns(0, count), self._compression)
+            self._segments.append(segment._replace(first_row=base))
+            self._segment_starts.append(base)
+            base, hot = base + count, TransactionLedger.from_columns(hot.columns(count))
+            self._hot = (base, hot)
+        self._next_check = len(hot) + self._check_every
+
+    def _load(self, segment: Segment) -> TransactionLedger:
+        with self._cache_lock:
+            ledger = self._cache.get(segment.path)
+            if ledger is not None:
+                self._cache.move_to_end(segment.path)
+                return ledger
+            ledger = read_segment(segment.path)
+            self._cache[segment.path] = ledger
+            self._cache_bytes += ledger.nbytes()
+            # The segment just read is always kept, even over budget.
+            while self._cache_bytes > self._cache_budget and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes()
+            return ledger
+
+    def _segment_of(self, row: int) -> Segment:
+        return self._segments[bisect_right(self._segment_starts, row) - 1]
+
+    def __len__(self) -> int:
+        base, hot = self._hot
+        return base + len(hot)
+
+    def __getitem__(self, row: int) -> Transaction:
+        base, hot = self._hot
+        if row < 0:
+            row += base + len(hot)
+        if row >= base:
+            return hot[row - base]
+        if row < 0:
+            raise IndexError("ledger row out of range")
+        segment = self._segment_of(row)
+        return self._load(segment)[row - segment.first_row]
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def row_at_position(self, position: int) -> int:
+        base, hot = self._hot
+        if position >= base:
+            return base + hot.row_at_position(position - base)
+        segment = self._segment_of(position)
+        if segment.in_time_order:
+            return position
+        return segment.first_row + self._load(segment).row_at_position(
+            position - segment.first_row
+        )
+
+    def time_position(self, timestamp: datetime) -> int:
+        micros = to_micros(timestamp)
+        for segment in self._segments:
+            if segment.max_micros >= micros:
+                if segment.min_micros >= micros:
+                    return segment.first_row
+                return segment.first_row + self._load(segment).time_position(timestamp)
+        base, hot = self._hot
+        return base + hot.time_position(timestamp)
+
+    def sales_columns(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Tuple[array, array, array, List[str]]:
+        """As TransactionLedger.sales_columns, across every tier in the window."""
+        hot = self._hot[1]
+        tiers = [
+            self._load(segment) for segment in self._segments if segment.overlaps(start, end)
+        ]
+        if not tiers:
+            return hot.sales_columns(start, end)
+        tiers.append(hot)
+
+        timestamps, milliliters, codes = array("q"), array("q"), array("I")
+        values: List[str] = []
+        known: Dict[str, int] = {}
+        for tier in tiers:
+            tier_timestamps, tier_milliliters, tier_codes, tier_values = tier.sales_columns(
+                start, end
+            )
+            remap = []
+            for value in tier_values:
+                code = known.get(value)
+                if code is None:
+                    code = known[value] = len(values)
+                    values.append(value)
+                remap.append(code)
+            timestamps.extend(tier_timestamps)
+            milliliters.extend(tier_milliliters)
+            codes.extend([remap[code] for code in tier_codes])
+        return timestamps, milliliters, codes, values
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        **filters,
+    ) -> Iterator[Transaction]:
+        """As TransactionLedger.query, reading sealed segments only as reached.
+
+        Segments outside [start, end) are never read from disk.
+        """
+        hot_rows = self._hot[1].query(start=start, end=end, **filters)
+        segments = [segment for segment in self._segments if segment.overlaps(start, end)]
+        return self._query_tiers(segments, hot_rows, start, end, filters)
+
+    def _query_tiers(self, segments, hot_rows, start, end, filters) -> Iterator[Transaction]:
+        for segment in segments:
+            yield from self._load(segment).query(start=start, end=end, **filters)
+        yield from hot_rows
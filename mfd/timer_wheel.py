@@ -0,0 +1,68 @@
+import math
+from typing import Dict, Hashable, List
+
+
+class TimerWheel:
+    """Hashed timer wheel for many timeouts that are mostly cancelled.
+
+    Time is cut into ticks and each deadline is filed in the slot of the
+    tick it falls in, modulo the number of slots. Scheduling and
+    cancelling are O(1); advance() visits one slot per elapsed tick and
+    only touches the timers filed there. A deadline more than one turn
+    of the wheel away waits in its slot until its turn comes round.
+    Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512, start: float = 0.0):
+        if tick <= 0:
+            raise ValueError("Tick must be positive")
+        if slots < 1:
+            raise ValueError("A timer wheel needs at least one slot")
+        self._tick = tick
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        # Slot of each pending key, for O(1) cancel.
+        self._where: Dict[Hashable, int] = {}
+        self._current = math.floor(start / tick)
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Fire key at the first advance() at or after deadline.
+
+        Rescheduling a pending key moves it to the new deadline.
+        """
+        self.cancel(key)
+        # Never file into a tick that has already been swept.
+        tick = max(math.ceil(deadline / self._tick), self._current + 1)
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = tick
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to now and return the keys whose deadline passed."""
+        target = math.floor(now / self._tick)
+        if target <= self._current:
+            return []
+        count = len(self._slots)
+        expired = []
+        # After a gap longer than a turn every slot is due once.
+        for tick in range(self._current + 1, min(target, self._current + count) + 1):
+            timers = self._slots[tick % count]
+            due = [key for key, deadline in timers.items() if deadline <= target]
+            for key in due:
+                del timers[key]
+                del self._where[key]
+            expired.extend(due)
+        self._current = target
+        return expired
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
@@ -1,9 +1,54 @@
 
-from datetime import datetime
-from typing import Optional
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Union
+
+from mfd.ids import format_transaction_id, get_id_generator
+from mfd.units import from_kobo, from_milliliters, to_kobo, to_milliliters
+
+
+_LOCAL_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# (epoch second, local time minus UTC in microseconds) for the last
+# second seen; sales mostly land in the same second, so this spares
+# building a datetime for each one. Swapped as one tuple.
+_offset_cache: Tuple[int, int] = (-1, 0)
+
+
+def _local_micros(time_ns: int) -> int:
+    """Microseconds since 1970-01-01 in naive local time, as datetime.now() counts."""
+    global _offset_cache
+    seconds, nanoseconds = divmod(time_ns, 1_000_000_000)
+    cached_second, offset = _offset_cache
+    if seconds != cached_second:
+        local = datetime.fromtimestamp(seconds)
+        offset = (local - _LOCAL_EPOCH) // _MICROSECOND - seconds * 1_000_000
+        _offset_cache = (seconds, offset)
+    return seconds * 1_000_000 + offset + nanoseconds // 1000
 
 
 class Transaction:
+    """One sale, immutable once built.
+
+    The creation time is kept as a time.time_ns() reading; the datetime
+    behind timestamp is only built the first time it is read. Attributes
+    cannot be assigned; the class writes its slots through their
+    descriptors (see _set_slot below).
+    """
+
+    __slots__ = (
+        "_id_value",
+        "_transaction_id",
+        "_fuel_name",
+        "_milliliters",
+        "_kobo",
+        "_transaction_type",
+        "_attendant_name",
+        "_time_ns",
+        "_timestamp",
+    )
+
     def __init__(
         self,
         fuel_name: str,
@@ -11,22 +56,82 @@ class Transaction:
         amount: float,
         transaction_type: str,
         attendant_name: str,
-        transaction_id: Optional[str] = None,
+        transaction_id: Optional[Union[str, int]] = None,
+        timestamp: Optional[datetime] = None,
     ):
-        self._transaction_id = transaction_id or self._generate_transaction_id()
-        self._fuel_name = fuel_name
-        self._liters = liters
-        self._amount = amount
-        self._transaction_type = transaction_type
-        self._attendant_name = attendant_name
-        self._timestamp = datetime.now()
-
-    @staticmethod
-    def _generate_transaction_id() -> str:
-        return f"TXN{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        self._init(
+            fuel_name,
+            to_milliliters(liters),
+            to_kobo(amount),
+            transaction_type,
+            attendant_name,
+            transaction_id,
+            timestamp,
+        )
+
+    @classmethod
+    def from_fixed_point(
+        cls,
+        fuel_name: str,
+        milliliters: int,
+        kobo: int,
+        transaction_type: str,
+        attendant_name: str,
+        transaction_id: Optional[Union[str, int]] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> "Transaction":
+        """Build a transaction from integer millilitres and kobo."""
+        transaction = cls.__new__(cls)
+        transaction._init(
+            fuel_name, milliliters, kobo, transaction_type, attendant_name, transaction_id, timestamp
+        )
+        return transaction
+
+    def _init(
+        self,
+        fuel_name: str,
+        milliliters: int,
+        kobo: int,
+        transaction_type: str,
+        attendant_name: str,
+        transaction_id: Optional[Union[str, int]],
+        timestamp: Optional[datetime],
+    ):
+        # Generated IDs are kept as integers and only rendered to their
+        # "TXN..." form when read; supplied string IDs are kept as given.
+        if isinstance(transaction_id, int):
+            _set_id_value(self, transaction_id)
+            _set_transaction_id(self, None)
+        elif transaction_id:
+            _set_id_value(self, 0)
+            _set_transaction_id(self, transaction_id)
+        else:
+            _set_id_value(self, get_id_generator().next_id())
+            _set_transaction_id(self, None)
+        # Interned, so the few distinct names are shared by every sale.
+        _set_fuel_name(self, sys.intern(fuel_name))
+        # Volume and money are fixed-point; liters and amount convert.
+        _set_milliliters(self, milliliters)
+        _set_kobo(self, kobo)
+        _set_transaction_type(self, sys.intern(transaction_type))
+        _set_attendant_name(self, sys.intern(attendant_name))
+        if timestamp is None:
+            _set_time_ns(self, time.time_ns())
+            _set_timestamp(self, None)
+        else:
+            _set_time_ns(self, None)
+            _set_timestamp(self, timestamp)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"Transaction is immutable; cannot set '{name}'")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Transaction is immutable; cannot delete '{name}'")
 
     @property
     def transaction_id(self) -> str:
+        if self._transaction_id is None:
+            return format_transaction_id(self._id_value)
         return self._transaction_id
 
     @property
@@ -35,11 +140,19 @@ class Transaction:
 
     @property
     def liters(self) -> float:
-        return self._liters
+        return from_milliliters(self._milliliters)
 
     @property
     def amount(self) -> float:
-        return self._amount
+        return from_kobo(self._kobo)
+
+    @property
+    def milliliters(self) -> int:
+        return self._milliliters
+
+    @property
+    def kobo(self) -> int:
+        return self._kobo
 
     @property
     def transaction_type(self) -> str:
@@ -51,46 +164,101 @@ class Transaction:
 
     @property
     def timestamp(self) -> datetime:
-        return self._timestamp
+        # _time_ns is read first: it is only cleared once _timestamp is set.
+        time_ns = self._time_ns
+        timestamp = self._timestamp
+        if timestamp is None:
+            seconds, nanoseconds = divmod(time_ns, 1_000_000_000)
+            timestamp = datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000)
+            _set_timestamp(self, timestamp)
+            _set_time_ns(self, None)
+        return timestamp
+
+    @property
+    def _micros(self) -> int:
+        # What ledger.to_micros(self.timestamp) gives, without the datetime.
+        time_ns = self._time_ns
+        timestamp = self._timestamp
+        if timestamp is None:
+            return _local_micros(time_ns)
+        return (timestamp - _LOCAL_EPOCH) // _MICROSECOND
 
     def to_dict(self) -> dict:
         return {
-            "transaction_id": self._transaction_id,
+            "transaction_id": self.transaction_id,
             "fuel_name": self._fuel_name,
-            "liters": self._liters,
-            "amount": self._amount,
+            "liters": self.liters,
+            "amount": self.amount,
             "transaction_type": self._transaction_type,
             "attendant_name": self._attendant_name,
-            "timestamp": self._timestamp.isoformat(),
+            "timestamp": self.timestamp.isoformat(),
         }
 
     def generate_receipt(self) -> str:
         receipt = "\n" + "=" * 50 + "\n"
         receipt += "         FUEL DISPENSER RECEIPT\n"
         receipt += "=" * 50 + "\n"
-        receipt += f"Transaction ID: {self._transaction_id}\n"
-        receipt += f"Date/Time: {self._timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        receipt += f"Transaction ID: {self.transaction_id}\n"
+        receipt += f"Date/Time: {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
         receipt += f"Attendant: {self._attendant_name}\n"
         receipt += "-" * 50 + "\n"
         receipt += f"Fuel Type: {self._fuel_name}\n"
-        receipt += f"Liters: {self._liters:.2f} L\n"
-        receipt += f"Amount: ₦{self._amount:.2f}\n"
+        receipt += f"Liters: {self.liters:.2f} L\n"
+        receipt += f"Amount: ₦{self.amount:.2f}\n"
         receipt += f"Transaction Type: {self._transaction_type.replace('_', ' ').title()}\n"
         receipt += "-" * 50 + "\n"
         receipt += "         Thank you for your purchase!\n"
         receipt += "=" * 50 + "\n"
         return receipt
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        return hash(self.transaction_id)
+
     def __str__(self) -> str:
         """String representation of the Transaction object."""
         return (
-            f"Transaction({self._transaction_id}, {self._fuel_name}, "
-            f"{self._liters}L, ₦{self._amount:.2f})"
+            f"Transaction({self.transaction_id}, {self._fuel_name}, "
+            f"{self.liters}L, ₦{self.amount:.2f})"
         )
 
     def __repr__(self) -> str:
         """Developer representation of the Transaction object."""
         return (
-            f"Transaction(id='{self._transaction_id}', fuel='{self._fuel_name}', "
-            f"liters={self._liters}, amount={self._amount})"
+            f"Transaction(id='{self.transaction_id}', fuel='{self._fuel_name}', "
+            f"liters={self.liters}, amount={self.amount})"
         )
+
+    def __reduce__(self):
+        values = tuple(getattr(self, name) for name in Transaction.__slots__)
+        return _restore, (type(self), values)
+
+
+def _set_slot(name: str):
+    # The slot's own setter skips __setattr__, at a third of the cost of
+    # object.__setattr__.
+    return Transaction.__dict__[name].__set__
+
+
+_set_id_value = _set_slot("_id_value")
+_set_transaction_id = _set_slot("_transaction_id")
+_set_fuel_name = _set_slot("_fuel_name")
+_set_milliliters = _set_slot("_milliliters")
+_set_kobo = _set_slot("_kobo")
+_set_transaction_type = _set_slot("_transaction_type")
+_set_attendant_name = _set_slot("_attendant_name")
+_set_time_ns = _set_slot("_time_ns")
+_set_timestamp = _set_slot("_timestamp")
+_SETTERS = tuple(_set_slot(name) for name in Transaction.__slots__)
+
+
+def _restore(cls, values: tuple) -> Transaction:
+    """Rebuild a pickled Transaction without going through __init__."""
+    transaction = cls.__new__(cls)
+    for set_slot, value in zip(_SETTERS, values):
+        set_slot(transaction, value)
+    return transaction
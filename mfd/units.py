@@ -0,0 +1,42 @@
+"""Fixed-point money and volume.
+
+Inside the engine money is held in integer kobo and volume in integer
+millilitres, so sums never drift; the float naira/litre API converts at
+the edges.
+"""
+
+KOBO_PER_NAIRA = 100
+MILLILITERS_PER_LITER = 1000
+
+
+def to_kobo(naira: float) -> int:
+    try:
+        return round(naira * KOBO_PER_NAIRA)
+    except (OverflowError, ValueError):
+        # round() of inf or nan; rejected like any other bad amount.
+        raise ValueError(f"Amount must be a finite number, not {naira}") from None
+
+
+def from_kobo(kobo: int) -> float:
+    return kobo / KOBO_PER_NAIRA
+
+
+def to_milliliters(liters: float) -> int:
+    try:
+        return round(liters * MILLILITERS_PER_LITER)
+    except (OverflowError, ValueError):
+        raise ValueError(f"Volume must be a finite number, not {liters}") from None
+
+
+def from_milliliters(milliliters: int) -> float:
+    return milliliters / MILLILITERS_PER_LITER
+
+
+def cost_in_kobo(milliliters: int, price_kobo: int) -> int:
+    """Price of a volume at a per-litre price, rounded half up to the kobo."""
+    return (milliliters * price_kobo + MILLILITERS_PER_LITER // 2) // MILLILITERS_PER_LITER
+
+
+def milliliters_for(kobo: int, price_kobo: int) -> int:
+    """Whole millilitres an amount buys, rounded down so it is never exceeded."""
+    return kobo * MILLILITERS_PER_LITER // price_kobo
@@ -0,0 +1,120 @@
+import pytest
+
+from mfd import DispenseRequest, ids
+from mfd.cluster import StationCluster, merge_summaries
+
+STATIONS = ["Ikeja", "Lekki", "Yaba", "Surulere", "Ajah"]
+
+
+@pytest.fixture
+def cluster():
+    with StationCluster(workers=2) as cluster:
+        for station_id in STATIONS:
+            cluster.add_station(station_id, [("Petrol", 650.0, 1000.0), ("Diesel", 700.0, 500.0)])
+        yield cluster
+
+
+class TestStationCluster:
+    def test_routing_is_stable(self, cluster):
+        for station_id in STATIONS:
+            assert cluster.worker_for(station_id) == cluster.worker_for(station_id)
+            assert 0 <= cluster.worker_for(station_id) < cluster.workers
+
+    def test_invalid_worker_count(self):
+        for workers in (0, -1):
+            with pytest.raises(ValueError, match="at least one worker"):
+                StationCluster(workers=workers)
+
+    def test_worker_survives_any_failure(self, cluster):
+        worker = cluster.worker_for("Ikeja")
+        with pytest.raises(ValueError, match="Unknown operation '__init__'"):
+            cluster._call(worker, "__init__")
+        with pytest.raises(ValueError, match="Unknown operation 'explode'"):
+            cluster._call(worker, "explode")
+        # A fuel name that is not a string fails with AttributeError inside the worker.
+        with pytest.raises(ValueError):
+            cluster._call(worker, "add_station", "Oshodi", [(7, 650.0, 10.0)])
+        assert cluster.dispense_by_liters("Ikeja", "Petrol", 1.0)["liters"] == 1.0
+
+    def test_workers_mint_under_their_own_node_ids(self, cluster):
+        own = ids.get_id_generator().node_id
+        assert len(set(cluster.node_ids)) == cluster.workers
+        assert own not in cluster.node_ids
+        nodes = set()
+        for station_id in STATIONS:
+            transaction = cluster.dispense_by_liters(station_id, "Petrol", 1.0)
+            value = int(transaction["transaction_id"][3:])
+            nodes.add(ids.SnowflakeIdGenerator.split_id(value)[1])
+        assert nodes == set(cluster.node_ids)
+
+    def test_clashing_node_ids_are_refused(self, cluster):
+        with pytest.raises(ValueError, match="already in use"):
+            StationCluster(workers=1, node_ids=[cluster.node_ids[0]])
+        with pytest.raises(ValueError, match="distinct"):
+            StationCluster(workers=2, node_ids=[900, 900])
+        with pytest.raises(ValueError, match="Expected 2 node IDs"):
+            StationCluster(workers=2, node_ids=[900])
+        with StationCluster(workers=1) as other:
+            assert not set(other.node_ids) & set(cluster.node_ids)
+
+    def test_stations_are_independent(self, cluster):
+        transaction = cluster.dispense_by_liters("Ikeja", "Petrol", 10.0)
+        assert transaction["liters"] == 10.0
+        assert transaction["amount"] == 6500.0
+        fuels = dict((name, quantity) for name, _, quantity in cluster.fuels("Ikeja"))
+        assert fuels["Petrol"] == 990.0
+        fuels = dict((name, quantity) for name, _, quantity in cluster.fuels("Lekki"))
+        assert fuels["Petrol"] == 1000.0
+
+    def test_dispense_by_amount(self, cluster):
+        transaction = cluster.dispense_by_amount("Yaba", "Diesel", 7000.0)
+        assert transaction["liters"] == 10.0
+
+    def test_errors_are_raised_in_the_coordinator(self, cluster):
+        with pytest.raises(ValueError, match="between 1 and 50"):
+            cluster.dispense_by_liters("Ikeja", "Diesel", 100.0)
+        with pytest.raises(ValueError, match="not found"):
+            cluster.dispense_by_liters("Nowhere", "Petrol", 1.0)
+        with pytest.raises(ValueError, match="already exists"):
+            cluster.add_station("Ikeja", [])
+        # The worker survives a failed call.
+        assert cluster.dispense_by_liters("Ikeja", "Petrol", 1.0)["liters"] == 1.0
+
+    def test_update_price_everywhere(self, cluster):
+        assert cluster.update_price_everywhere("Petrol", 700.0) == len(STATIONS)
+        for station_id in STATIONS:
+            assert cluster.dispense_by_liters(station_id, "Petrol", 1.0)["amount"] == 700.0
+
+    def test_restock_everywhere(self, cluster):
+        assert cluster.restock_everywhere("Diesel", 100.0) == len(STATIONS)
+        for station_id in STATIONS:
+            fuels = {name: quantity for name, _, quantity in cluster.fuels(station_id)}
+            assert fuels["Diesel"] == 600.0
+
+    def test_dispense_batches_and_global_summary(self, cluster):
+        batches = {
+            station_id: [DispenseRequest("Petrol", liters=5.0), DispenseRequest("Diesel", amount=1400.0)]
+            for station_id in STATIONS
+        }
+        batches["Ajah"].append(DispenseRequest("Kerosene", liters=1.0))
+        results = cluster.dispense_batches(batches)
+        assert set(results) == set(STATIONS)
+        transaction, error = results["Ikeja"][0]
+        assert error is None and transaction["liters"] == 5.0
+        transaction, error = results["Ajah"][2]
+        assert transaction is None and "not found" in error
+
+        summary = cluster.global_summary()
+        assert summary["total_transactions"] == 2 * len(STATIONS)
+        assert summary["total_liters"] == pytest.approx(7.0 * len(STATIONS))
+        assert summary["by_fuel_type"]["Diesel"]["count"] == len(STATIONS)
+        assert summary["by_station"]["Lekki"]["total_transactions"] == 2
+        assert cluster.station_summary("Yaba")["total_amount"] == pytest.approx(5 * 650.0 + 1400.0)
+
+
+def test_merge_summaries():
+    first = {"total_transactions": 1, "total_liters": 2.0, "total_amount": 3.0,
+             "by_fuel_type": {"Petrol": {"liters": 2.0, "amount": 3.0, "count": 1}}}
+    merged = merge_summaries([first, first])
+    assert merged["total_transactions"] == 2
+    assert merged["by_fuel_type"]["Petrol"] == {"liters": 4.0, "amount": 6.0, "count": 2}
@@ -118,3 +118,86 @@ class TestDispenser:
         dispenser = Dispenser()
         str_repr = str(dispenser)
         assert "empty" in str_repr.lower()
+
+
+class TestThreadSafeDispenser:
+
+    def test_default_dispenser_has_no_locks(self):
+        dispenser = Dispenser()
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        assert dispenser.thread_safe is False
+        with dispenser.fuel_lock("Petrol"):
+            pass
+
+    def test_each_fuel_has_its_own_lock(self):
+        dispenser = Dispenser(thread_safe=True)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        dispenser.add_fuel(Fuel("Diesel", 700.0, 800.0))
+        assert dispenser.fuel_lock("petrol") is dispenser.fuel_lock("PETROL")
+        assert dispenser.fuel_lock("Petrol") is not dispenser.fuel_lock("Diesel")
+        with dispenser.fuel_lock("Petrol"):
+            assert dispenser.fuel_lock("Diesel").acquire(blocking=False)
+            dispenser.fuel_lock("Diesel").release()
+
+    def test_fuel_lock_not_found(self):
+        dispenser = Dispenser(thread_safe=True)
+        with pytest.raises(ValueError, match="not found"):
+            dispenser.fuel_lock("Petrol")
+
+    def test_remove_fuel_drops_lock(self):
+        dispenser = Dispenser(thread_safe=True)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        dispenser.remove_fuel("Petrol")
+        with pytest.raises(ValueError, match="not found"):
+            dispenser.fuel_lock("Petrol")
+
+
+class TestAvailableFuels:
+    def make_dispenser(self) -> Dispenser:
+        dispenser = Dispenser()
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 10.0))
+        dispenser.add_fuel(Fuel("Diesel", 700.0, 0.0))
+        return dispenser
+
+    def test_view_is_read_only(self):
+        available = self.make_dispenser().get_available_fuels()
+        with pytest.raises(TypeError):
+            available["diesel"] = Fuel("Diesel", 700.0, 1.0)
+
+    def test_selling_out_and_restocking(self):
+        dispenser = self.make_dispenser()
+        dispenser.get_fuel("Petrol").reduce_quantity(4.0)
+        assert set(dispenser.get_available_fuels()) == {"petrol"}
+        dispenser.get_fuel("Petrol").reduce_quantity(6.0)
+        assert dict(dispenser.get_available_fuels()) == {}
+        dispenser.restock_fuel("Diesel", 100.0)
+        assert set(dispenser.get_available_fuels()) == {"diesel"}
+
+    def test_views_are_stable_snapshots(self):
+        dispenser = self.make_dispenser()
+        before = dispenser.get_available_fuels()
+        dispenser.restock_fuel("Diesel", 1.0)
+        assert set(before) == {"petrol"}
+        assert set(dispenser.get_available_fuels()) == {"petrol", "diesel"}
+
+    def test_removed_fuel_is_not_available(self):
+        dispenser = self.make_dispenser()
+        fuel = dispenser.get_fuel("Petrol")
+        dispenser.remove_fuel("Petrol")
+        assert "petrol" not in dispenser.get_available_fuels()
+        # The removed fuel no longer reports to the dispenser.
+        fuel.reduce_quantity(10.0)
+        fuel.add_quantity(5.0)
+        assert "petrol" not in dispenser.get_available_fuels()
+
+    def test_matches_a_full_scan(self):
+        dispenser = Dispenser(thread_safe=True)
+        for index in range(50):
+            dispenser.add_fuel(Fuel(f"Grade {index}", 500.0, float(index % 3)))
+        for index in range(0, 50, 4):
+            fuel = dispenser.get_fuel(f"Grade {index}")
+            fuel.reduce_quantity(fuel.quantity)
+        expected = {
+            name for name, fuel in dispenser.get_all_fuels().items() if fuel.is_available()
+        }
+        assert set(dispenser.get_available_fuels()) == expected
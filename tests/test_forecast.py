@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant, Transaction
+from mfd.forecast import consumption_rates, forecast_stockouts
+
+np = pytest.importorskip("numpy")
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def make_station(petrol: float = 1000.0, diesel: float = 1000.0):
+    dispenser = Dispenser()
+    dispenser.add_fuel(Fuel("Petrol", 650.0, petrol))
+    dispenser.add_fuel(Fuel("Diesel", 700.0, diesel))
+    dispenser.add_fuel(Fuel("Kerosene", 900.0, 1000.0))
+    return dispenser, FuelAttendant("John Doe", dispenser)
+
+
+def record(attendant: FuelAttendant, fuel_name: str, liters: float, hours_ago: float):
+    attendant._record_transaction(Transaction(
+        fuel_name, liters, liters * 650.0, "liters", "John Doe",
+        timestamp=NOW - timedelta(hours=hours_ago),
+    ))
+
+
+class TestForecastStockouts:
+    def test_rate_and_stockout_time(self):
+        dispenser, attendant = make_station()
+        for hour in range(24):
+            record(attendant, "Petrol", 10.0, hour + 0.5)
+        forecast = forecast_stockouts({"s1": (dispenser, [attendant])}, now=NOW)
+        first = forecast[0]
+        assert (first.station_id, first.fuel_name) == ("s1", "Petrol")
+        assert first.liters_per_hour == pytest.approx(10.0)
+        assert first.quantity == 1000.0
+        assert first.stockout_at == NOW + timedelta(hours=100)
+
+    def test_idle_fuels_never_run_out(self):
+        dispenser, attendant = make_station()
+        record(attendant, "Diesel", 24.0, 1)
+        forecast = forecast_stockouts({"s1": (dispenser, [attendant])}, now=NOW)
+        assert [item.fuel_name for item in forecast] == ["Diesel", "Petrol", "Kerosene"]
+        assert forecast[1].liters_per_hour == 0.0
+        assert forecast[1].stockout_at is None
+
+    def test_sales_outside_window_are_ignored(self):
+        dispenser, attendant = make_station()
+        record(attendant, "Petrol", 500.0, 30)
+        record(attendant, "Petrol", 48.0, 2)
+        record(attendant, "Petrol", 48.0, -1)
+        forecast = forecast_stockouts({"s1": (dispenser, [attendant])}, now=NOW)
+        assert forecast[0].liters_per_hour == pytest.approx(2.0)
+
+    def test_out_of_order_history(self):
+        dispenser, attendant = make_station()
+        record(attendant, "Petrol", 24.0, 1)
+        record(attendant, "Petrol", 500.0, 48)
+        forecast = forecast_stockouts({"s1": (dispenser, [attendant])}, now=NOW)
+        assert forecast[0].liters_per_hour == pytest.approx(1.0)
+
+    def test_stations_are_ranked_together(self):
+        slow, slow_attendant = make_station(petrol=500.0)
+        fast, fast_attendant = make_station(diesel=100.0)
+        other = FuelAttendant("Jane Doe", fast)
+        record(slow_attendant, "Petrol", 24.0, 3)
+        record(fast_attendant, "Diesel", 12.0, 3)
+        record(other, "diesel", 12.0, 5)
+        forecast = forecast_stockouts(
+            {"slow": (slow, [slow_attendant]), "fast": (fast, [fast_attendant, other])}, now=NOW
+        )
+        assert [(item.station_id, item.fuel_name) for item in forecast[:2]] == [
+            ("fast", "Diesel"),
+            ("slow", "Petrol"),
+        ]
+        assert forecast[0].stockout_at == NOW + timedelta(hours=100)
+        assert len(forecast) == 6
+
+    def test_removed_fuels_are_skipped(self):
+        dispenser, attendant = make_station()
+        record(attendant, "Kerosene", 10.0, 1)
+        dispenser.remove_fuel("Kerosene")
+        forecast = forecast_stockouts({"s1": (dispenser, [attendant])}, now=NOW)
+        assert {item.fuel_name for item in forecast} == {"Petrol", "Diesel"}
+        assert all(item.stockout_at is None for item in forecast)
+
+    def test_no_stations(self):
+        assert forecast_stockouts({}, now=NOW) == []
+
+
+class TestConsumptionRates:
+    def test_rolling_window(self):
+        _, attendant = make_station()
+        start = NOW - timedelta(hours=4)
+        for hour in range(4):
+            record(attendant, "Petrol", 6.0 * (hour + 1), 3.5 - hour)
+        record(attendant, "Diesel", 4.0, 0.5)
+        series = consumption_rates(
+            [attendant], step=timedelta(hours=1), window=timedelta(hours=2), start=start, end=NOW
+        )
+        assert series.fuel_names == ["Petrol", "Diesel"]
+        assert series.ends == [start + timedelta(hours=hour) for hour in range(1, 5)]
+        np.testing.assert_allclose(series.liters_per_hour[0], [3.0, 9.0, 15.0, 21.0])
+        np.testing.assert_allclose(series.liters_per_hour[1], [0.0, 0.0, 0.0, 2.0])
+
+    def test_defaults_to_span_of_history(self):
+        _, attendant = make_station()
+        record(attendant, "Petrol", 24.0, 10)
+        record(attendant, "Petrol", 24.0, 1)
+        series = consumption_rates([attendant])
+        assert series.liters_per_hour.shape == (1, 10)
+        assert series.liters_per_hour[0, -1] == pytest.approx(2.0)
+
+    def test_empty_history(self):
+        _, attendant = make_station()
+        series = consumption_rates([attendant])
+        assert series.fuel_names == []
+        assert series.liters_per_hour.shape == (0, 1)
+
+    @pytest.mark.parametrize("step, window", [(timedelta(0), timedelta(hours=1)),
+                                              (timedelta(hours=2), timedelta(hours=1))])
+    def test_invalid_step(self, step, window):
+        _, attendant = make_station()
+        with pytest.raises(ValueError, match="Step must be positive"):
+            consumption_rates([attendant], step=step, window=window)
@@ -129,3 +129,23 @@ class TestFuel:
         assert "Petrol" in repr_str
         assert "650" in repr_str
         assert "1000" in repr_str
+
+    def test_availability_listener(self):
+        fuel = Fuel("Petrol", 650.0, 10.0)
+        events = []
+        fuel.set_availability_listener(lambda f, available: events.append(available))
+        fuel.reduce_quantity(4.0)
+        fuel.reduce_quantity(6.0)
+        fuel.add_quantity(0.0)
+        fuel.add_quantity(1.0)
+        fuel.add_quantity(1.0)
+        assert events == [False, True]
+
+    def test_reserved_stock(self):
+        fuel = Fuel("Petrol", 650.0, 10.0)
+        fuel.reserve_milliliters(6_000)
+        assert (fuel.quantity_ml, fuel.reserved_ml, fuel.unreserved_ml) == (10_000, 6_000, 4_000)
+        with pytest.raises(ValueError, match="Insufficient fuel"):
+            fuel.reserve_milliliters(4_001)
+        fuel.release_milliliters(6_000)
+        assert fuel.unreserved_ml == 10_000
@@ -1,7 +1,9 @@
+import sys
+import threading
 
 import pytest
 
-from mfd import Dispenser, FuelAttendant
+from mfd import DispenseRequest, Dispenser, Fuel, FuelAttendant, Nozzle
 
 
 class TestFuelAttendant:
@@ -198,6 +200,57 @@ class TestFuelAttendant:
         assert summary["by_fuel_type"]["Petrol"]["count"] == 2
         assert summary["by_fuel_type"]["Diesel"]["count"] == 1
 
+    def test_get_transaction_summary_matches_history(self):
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        attendant.add_fuel("Diesel", 700.0, 1000.0)
+        attendant.dispense_by_liters("Petrol", 10.0)
+        attendant.dispense_by_amount("Diesel", 3500.0)
+        attendant.dispense_by_amount("Petrol", 1300.0)
+        transactions = attendant.show_all_transactions()
+        summary = attendant.get_transaction_summary()
+        assert summary["total_liters"] == sum(txn.liters for txn in transactions)
+        assert summary["total_amount"] == sum(txn.amount for txn in transactions)
+        assert summary["by_fuel_type"]["Petrol"] == {
+            "liters": 12.0,
+            "amount": 7800.0,
+            "count": 2,
+        }
+        assert summary["by_fuel_type"]["Diesel"]["liters"] == 5.0
+
+    def test_get_transaction_summary_is_exact(self):
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 617.37, 100000.0)
+        for _ in range(1000):
+            attendant.dispense_by_liters("Petrol", 1.1)
+        summary = attendant.get_transaction_summary()
+        # 1.1 L at 617.37 is 679.107, charged as 679.11.
+        assert summary["total_amount"] == 679110.0
+        assert summary["total_liters"] == 1100.0
+        assert dispenser.get_fuel("Petrol").quantity == 98900.0
+
+    def test_dispense_by_amount_never_overcharges(self):
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        transaction = attendant.dispense_by_amount("Petrol", 1000.0)
+        assert transaction.liters == 1.538
+        assert transaction.amount == 999.7
+
+    def test_get_transaction_summary_returns_copy(self):
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        attendant.dispense_by_liters("Petrol", 10.0)
+        summary = attendant.get_transaction_summary()
+        summary["by_fuel_type"]["Petrol"]["count"] = 99
+        summary["by_fuel_type"]["Diesel"] = {}
+        fresh = attendant.get_transaction_summary()
+        assert fresh["by_fuel_type"]["Petrol"]["count"] == 1
+        assert "Diesel" not in fresh["by_fuel_type"]
+
     def test_string_representation(self):
         dispenser = Dispenser()
         attendant = FuelAttendant("John Doe", dispenser)
@@ -211,3 +264,324 @@ class TestFuelAttendant:
         repr_str = repr(attendant)
         assert "FuelAttendant" in repr_str
         assert "John Doe" in repr_str
+
+
+class TestConcurrentDispensing:
+    def test_shared_dispenser_never_oversells(self):
+        dispenser = Dispenser(thread_safe=True)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        attendants = [FuelAttendant(f"Pump {i}", dispenser) for i in range(8)]
+        previous_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=self._drain, args=(attendant, "Petrol"))
+                for attendant in attendants
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(previous_interval)
+
+        sold = sum(a.get_transaction_summary()["total_liters"] for a in attendants)
+        assert sold == 1000.0
+        assert dispenser.get_fuel("Petrol").quantity == 0.0
+
+    def test_shared_attendant_records_every_sale(self):
+        dispenser = Dispenser(thread_safe=True)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 500.0))
+        dispenser.add_fuel(Fuel("Diesel", 700.0, 500.0))
+        attendant = FuelAttendant("John Doe", dispenser)
+        threads = [
+            threading.Thread(target=self._drain, args=(attendant, fuel_name))
+            for fuel_name in ("Petrol", "Diesel", "Petrol", "Diesel")
+        ]
+        previous_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(previous_interval)
+
+        summary = attendant.get_transaction_summary()
+        assert summary["total_transactions"] == 100
+        assert len(attendant.show_all_transactions()) == 100
+        assert summary["by_fuel_type"]["Petrol"]["liters"] == 500.0
+        assert summary["by_fuel_type"]["Diesel"]["liters"] == 500.0
+        # Sales are stamped as they are recorded, so the ledger stays in
+        # time order and never falls back to a sorted index.
+        timestamps = [t.timestamp for t in attendant.show_all_transactions()]
+        assert timestamps == sorted(timestamps)
+        assert attendant._transactions._time_order is None
+
+    @staticmethod
+    def _drain(attendant: FuelAttendant, fuel_name: str):
+        for _ in range(200):
+            try:
+                attendant.dispense_by_liters(fuel_name, 10.0)
+            except ValueError:
+                pass
+
+
+class TestTransactionQueries:
+    def test_query_transactions(self):
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        attendant.add_fuel("Diesel", 700.0, 1000.0)
+        attendant.dispense_by_liters("Petrol", 10.0)
+        attendant.dispense_by_liters("Diesel", 20.0)
+        attendant.dispense_by_amount("Diesel", 3500.0)
+        diesel = list(attendant.query_transactions(fuel_name="Diesel"))
+        assert [txn.liters for txn in diesel] == [20.0, 5.0]
+        by_amount = list(attendant.query_transactions(transaction_type="by_amount"))
+        assert [txn.fuel_name for txn in by_amount] == ["Diesel"]
+        later = list(attendant.query_transactions(start=diesel[0].timestamp))
+        assert len(later) == 2
+
+
+class TestTransactionPages:
+    @staticmethod
+    def make_attendant(sales: int) -> FuelAttendant:
+        dispenser = Dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 10000.0)
+        for i in range(sales):
+            attendant.dispense_by_liters("Petrol", 1.0 + i)
+        return attendant
+
+    def test_empty_history(self):
+        attendant = self.make_attendant(0)
+        page = attendant.list_transactions(page_size=5)
+        assert page.transactions == []
+        assert page.next_cursor is None
+        assert page.previous_cursor is None
+
+    def test_walk_pages_forward_and_back(self):
+        attendant = self.make_attendant(12)
+        first = attendant.list_transactions(page_size=5)
+        assert [txn.liters for txn in first.transactions] == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert first.previous_cursor is None
+
+        second = attendant.list_transactions(page_size=5, cursor=first.next_cursor)
+        assert second.position == 5
+        assert [txn.liters for txn in second.transactions] == [6.0, 7.0, 8.0, 9.0, 10.0]
+
+        last = attendant.list_transactions(page_size=5, cursor=second.next_cursor)
+        assert [txn.liters for txn in last.transactions] == [11.0, 12.0]
+        assert last.next_cursor is None
+
+        back = attendant.list_transactions(page_size=5, cursor=last.previous_cursor)
+        assert back.transactions == second.transactions
+
+    def test_iter_transactions_resumes_from_cursor(self):
+        attendant = self.make_attendant(6)
+        page = attendant.list_transactions(page_size=4)
+        rest = attendant.iter_transactions(page.next_cursor)
+        assert [txn.liters for txn in rest] == [5.0, 6.0]
+        assert len(list(attendant.iter_transactions())) == 6
+
+    def test_cursor_at_date(self):
+        attendant = self.make_attendant(6)
+        third = attendant.show_all_transactions()[2]
+        page = attendant.list_transactions(page_size=2, cursor=attendant.cursor_at(third.timestamp))
+        assert page.transactions[0] == third
+
+    def test_invalid_arguments(self):
+        attendant = self.make_attendant(1)
+        with pytest.raises(ValueError, match="Page size"):
+            attendant.list_transactions(page_size=0)
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            attendant.list_transactions(cursor="abc")
+
+
+class TestDispenseBatch:
+    @staticmethod
+    def make_attendant() -> FuelAttendant:
+        dispenser = Dispenser(thread_safe=True)
+        attendant = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 30.0)
+        attendant.add_fuel("Diesel", 700.0, 1000.0)
+        return attendant
+
+    def test_batch_matches_single_sales(self):
+        attendant = self.make_attendant()
+        results = attendant.dispense_batch([
+            DispenseRequest("Petrol", liters=10.0),
+            DispenseRequest("diesel", amount=3500.0),
+            DispenseRequest("PETROL", liters=5.0),
+        ])
+        assert [result.error for result in results] == [None, None, None]
+        assert [result.transaction.liters for result in results] == [10.0, 5.0, 5.0]
+        assert results[1].transaction.amount == 3500.0
+        assert results[1].transaction.transaction_type == "by_amount"
+        assert attendant.dispenser.get_fuel("Petrol").quantity == 15.0
+        assert attendant.get_transaction_summary()["total_transactions"] == 3
+
+    def test_batch_reports_a_bad_fuel_name_per_request(self):
+        attendant = self.make_attendant()
+        results = attendant.dispense_batch([
+            DispenseRequest(7, liters=10.0),
+            DispenseRequest("Petrol", liters=10.0),
+        ])
+        assert isinstance(results[0].error, TypeError)
+        assert "must be a string" in str(results[0].error)
+        assert results[1].error is None
+        assert attendant.get_transaction_summary()["total_transactions"] == 1
+
+    def test_batch_reports_errors_per_request(self):
+        attendant = self.make_attendant()
+        results = attendant.dispense_batch([
+            DispenseRequest("Petrol", liters=20.0),
+            DispenseRequest("Petrol", liters=20.0),
+            DispenseRequest("Petrol", liters=10.0),
+            DispenseRequest("Petrol", liters=60.0),
+            DispenseRequest("Kerosene", liters=5.0),
+            DispenseRequest("Diesel", amount=100.0),
+            DispenseRequest("Diesel"),
+            DispenseRequest("Petrol", liters=1.0),
+        ])
+        errors = [None if r.error is None else str(r.error) for r in results]
+        assert errors[0] is None
+        assert "Insufficient fuel" in errors[1]
+        assert errors[2] is None
+        assert "between 1 and 50" in errors[3]
+        assert "not found" in errors[4]
+        assert "Amount must be at least" in errors[5]
+        assert "exactly one" in errors[6]
+        assert "out of stock" in errors[7]
+        assert results[2].request == DispenseRequest("Petrol", liters=10.0)
+        assert attendant.dispenser.get_fuel("Petrol").quantity == 0.0
+        assert len(attendant.show_all_transactions()) == 2
+
+    def test_batch_rejects_non_numeric_requests_alone(self):
+        attendant = self.make_attendant()
+        results = attendant.dispense_batch([
+            DispenseRequest("Diesel", liters=10.0),
+            DispenseRequest("Diesel", liters="5"),
+            DispenseRequest("Diesel", amount="700"),
+            DispenseRequest("Diesel", liters=5.0),
+        ])
+        assert [type(result.error) for result in results] == [
+            type(None), TypeError, TypeError, type(None)
+        ]
+        assert attendant.dispenser.get_fuel("Diesel").quantity == 985.0
+        assert len(attendant.show_all_transactions()) == 2
+
+    def test_batch_records_sales_made_before_a_failure(self, monkeypatch):
+        attendant = self.make_attendant()
+        diesel = attendant.dispenser.get_fuel("Diesel")
+        reduce_milliliters = diesel.reduce_milliliters
+        calls = []
+
+        def failing_reduce(milliliters):
+            calls.append(milliliters)
+            if len(calls) == 2:
+                raise RuntimeError("meter fault")
+            reduce_milliliters(milliliters)
+
+        monkeypatch.setattr(diesel, "reduce_milliliters", failing_reduce)
+        with pytest.raises(RuntimeError, match="meter fault"):
+            attendant.dispense_batch([
+                DispenseRequest("Diesel", liters=10.0),
+                DispenseRequest("Diesel", liters=5.0),
+            ])
+        assert diesel.quantity == 990.0
+        assert len(attendant.show_all_transactions()) == 1
+
+    def test_empty_batch(self):
+        assert self.make_attendant().dispense_batch([]) == []
+
+
+class TestNozzle:
+    @staticmethod
+    def make_attendant(thread_safe: bool = False) -> FuelAttendant:
+        attendant = FuelAttendant("John Doe", Dispenser(thread_safe=thread_safe))
+        attendant.add_fuel("Petrol", 650.0, 100.0)
+        attendant.add_fuel("Diesel", 700.0, 1000.0)
+        return attendant
+
+    @pytest.mark.parametrize("thread_safe", [False, True])
+    def test_sales_match_attendant_sales(self, thread_safe):
+        attendant = self.make_attendant(thread_safe)
+        nozzle = attendant.nozzle("petrol")
+        assert isinstance(nozzle, Nozzle)
+        assert nozzle.fuel_name == "Petrol"
+        by_liters = nozzle.dispense_by_liters(10.0)
+        by_amount = nozzle.dispense_by_amount(1000.0)
+        assert (by_liters.fuel_name, by_liters.liters, by_liters.amount) == ("Petrol", 10.0, 6500.0)
+        assert by_liters.transaction_type == "by_liters"
+        assert by_amount.transaction_type == "by_amount"
+        assert by_amount.kobo <= 100_000
+        remaining = 100_000 - 10_000 - by_amount.milliliters
+        assert attendant.dispenser.get_fuel("Petrol").quantity_ml == remaining
+        summary = attendant.get_transaction_summary()
+        assert summary["total_transactions"] == 2
+        assert attendant.show_all_transactions() == [by_liters, by_amount]
+
+    def test_validation_matches_attendant(self):
+        attendant = self.make_attendant()
+        nozzle = attendant.nozzle("Petrol")
+        with pytest.raises(ValueError, match="between 1 and 50"):
+            nozzle.dispense_by_liters(60.0)
+        with pytest.raises(ValueError, match="Amount must be at least"):
+            nozzle.dispense_by_amount(100.0)
+        for _ in range(2):
+            nozzle.dispense_by_liters(50.0)
+        with pytest.raises(ValueError, match="out of stock"):
+            nozzle.dispense_by_liters(1.0)
+
+    def test_uses_current_price(self):
+        attendant = self.make_attendant()
+        nozzle = attendant.nozzle("Diesel")
+        attendant.update_fuel_price("Diesel", 800.0)
+        assert nozzle.dispense_by_liters(10.0).amount == 8000.0
+
+    def test_unknown_fuel(self):
+        with pytest.raises(ValueError, match="not found"):
+            self.make_attendant().nozzle("Kerosene")
+
+    @pytest.mark.parametrize("thread_safe", [False, True])
+    def test_removed_fuel_invalidates_nozzle(self, thread_safe):
+        attendant = self.make_attendant(thread_safe)
+        nozzle = attendant.nozzle("Petrol")
+        other = FuelAttendant("Jane Doe", attendant.dispenser).nozzle("PETROL")
+        attendant.dispenser.remove_fuel("Petrol")
+        assert not nozzle.active and not other.active
+        with pytest.raises(ValueError, match="has been removed"):
+            nozzle.dispense_by_liters(10.0)
+        with pytest.raises(ValueError, match="has been removed"):
+            other.dispense_by_amount(1000.0)
+
+        # A fuel added back under the same name needs a new nozzle.
+        attendant.add_fuel("Petrol", 600.0, 100.0)
+        with pytest.raises(ValueError, match="has been removed"):
+            nozzle.dispense_by_liters(10.0)
+        fresh = attendant.nozzle("Petrol")
+        assert fresh.active
+        assert fresh.dispense_by_liters(10.0).amount == 6000.0
+
+    def test_concurrent_nozzles_never_oversell(self):
+        attendant = self.make_attendant(thread_safe=True)
+        nozzles = [attendant.nozzle("Petrol") for _ in range(4)]
+        sold = []
+
+        def pump(nozzle):
+            for _ in range(10):
+                try:
+                    sold.append(nozzle.dispense_by_liters(5.0))
+                except ValueError:
+                    pass
+
+        threads = [threading.Thread(target=pump, args=(nozzle,)) for nozzle in nozzles]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(sold) == 20
+        assert attendant.dispenser.get_fuel("Petrol").quantity == 0.0
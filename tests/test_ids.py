@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from mfd import Transaction
+from mfd import ids
+from mfd.ids import SnowflakeIdGenerator, format_transaction_id
+
+
+class FakeClock:
+    def __init__(self, ms: int):
+        self.ms = ms
+
+    def time_ns(self) -> int:
+        return (ids.EPOCH_MS + self.ms) * 1_000_000
+
+
+class TestSnowflakeIdGenerator:
+    def test_node_id_out_of_range(self):
+        with pytest.raises(ValueError, match="Node ID must be between"):
+            SnowflakeIdGenerator(node_id=ids.MAX_NODE_ID + 1)
+        with pytest.raises(ValueError, match="Node ID must be between"):
+            SnowflakeIdGenerator(node_id=-1)
+
+    def test_ids_are_increasing(self):
+        generator = SnowflakeIdGenerator(node_id=1)
+        values = [generator.next_id() for _ in range(10_000)]
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+
+    def test_split_id(self, monkeypatch):
+        clock = FakeClock(1234)
+        monkeypatch.setattr(ids.time, "time_ns", clock.time_ns)
+        generator = SnowflakeIdGenerator(node_id=7)
+        generator.next_id()
+        assert SnowflakeIdGenerator.split_id(generator.next_id()) == (1234, 7, 1)
+
+    def test_clock_stepping_backwards_does_not_repeat(self, monkeypatch):
+        clock = FakeClock(5000)
+        monkeypatch.setattr(ids.time, "time_ns", clock.time_ns)
+        generator = SnowflakeIdGenerator(node_id=3)
+        first = generator.next_id()
+        clock.ms = 4000
+        second = generator.next_id()
+        assert second > first
+        assert SnowflakeIdGenerator.split_id(second)[0] == 5000
+
+    def test_sequence_overflow_borrows_next_millisecond(self, monkeypatch):
+        clock = FakeClock(100)
+        monkeypatch.setattr(ids.time, "time_ns", clock.time_ns)
+        generator = SnowflakeIdGenerator(node_id=0)
+        values = [generator.next_id() for _ in range(ids.SEQUENCE_MASK + 2)]
+        assert len(set(values)) == len(values)
+        assert values == sorted(values)
+        assert SnowflakeIdGenerator.split_id(values[-1]) == (101, 0, 0)
+
+    def test_threads_never_share_an_id(self):
+        generator = SnowflakeIdGenerator(node_id=5)
+        per_thread = 50_000
+        results = []
+
+        def mint():
+            results.append([generator.next_id() for _ in range(per_thread)])
+
+        threads = [threading.Thread(target=mint) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        minted = [value for chunk in results for value in chunk]
+        assert len(minted) == 4 * per_thread
+        assert len(set(minted)) == len(minted)
+
+    def test_nodes_never_share_an_id(self, monkeypatch):
+        clock = FakeClock(42)
+        monkeypatch.setattr(ids.time, "time_ns", clock.time_ns)
+        first = SnowflakeIdGenerator(node_id=1)
+        second = SnowflakeIdGenerator(node_id=2)
+        a = {first.next_id() for _ in range(1000)}
+        b = {second.next_id() for _ in range(1000)}
+        assert not a & b
+
+
+def mint_in_child(queue):
+    try:
+        queue.put((os.getpid(), ids.get_id_generator().next_id()))
+    except RuntimeError as e:
+        queue.put(str(e))
+
+
+def mint_after_fork() -> object:
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=mint_in_child, args=(queue,))
+    child.start()
+    result = queue.get(timeout=30)
+    child.join()
+    return result
+
+
+@pytest.fixture
+def restore_generator(monkeypatch):
+    for name in ("_default_generator", "_generator"):
+        monkeypatch.setattr(ids, name, getattr(ids, name))
+
+
+@pytest.mark.usefixtures("restore_generator")
+class TestDefaultNodeId:
+    def test_env_is_read_on_first_use(self, monkeypatch):
+        ids._default_generator = ids._generator = None
+        monkeypatch.setenv("MFD_NODE_ID", "pump-3")
+        with pytest.raises(ValueError, match="MFD_NODE_ID must be a whole number.*'pump-3'"):
+            ids.get_id_generator()
+        monkeypatch.setenv("MFD_NODE_ID", "2048")
+        with pytest.raises(ValueError, match="between 0 and 1023"):
+            Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        monkeypatch.setenv("MFD_NODE_ID", "9")
+        assert ids.get_id_generator().node_id == 9
+
+    def test_lone_process_defaults_to_node_zero(self, monkeypatch):
+        ids._default_generator = ids._generator = None
+        monkeypatch.delenv("MFD_NODE_ID", raising=False)
+        assert ids.assigned_node_id() is None
+        ids.get_id_generator().next_id()
+        assert ids.assigned_node_id() == 0
+
+
+@pytest.mark.usefixtures("restore_generator")
+class TestNodeIdsAfterFork:
+    def test_default_node_id_is_never_inherited(self, monkeypatch):
+        monkeypatch.delenv("MFD_NODE_ID", raising=False)
+        ids._default_generator = ids._generator = None
+        ids.get_id_generator().next_id()
+        message = mint_after_fork()
+        assert "forked from node 0" in message
+
+    def test_given_node_id_is_never_inherited(self):
+        ids.use_node_id(17)
+        assert ids.get_id_generator().node_id == 17
+        message = mint_after_fork()
+        assert "forked from node 17" in message
+        assert "use_node_id" in message
+
+
+class TestTransactionIds:
+    def test_generated_id_is_rendered_from_integer(self):
+        txn = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe", transaction_id=42)
+        assert txn.transaction_id == "TXN0000000000000000042"
+        assert txn.transaction_id == format_transaction_id(42)
+
+    def test_pluggable_generator(self, monkeypatch):
+        class Counter:
+            def __init__(self):
+                self.value = 0
+
+            def next_id(self) -> int:
+                self.value += 1
+                return self.value
+
+        monkeypatch.setattr(ids, "_generator", Counter())
+        first = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        second = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        assert first.transaction_id == format_transaction_id(1)
+        assert second.transaction_id == format_transaction_id(2)
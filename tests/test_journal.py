@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.journal import DISPENSE, MAGIC, Journal, read_journal, recover
+
+
+def run_shift(path):
+    journal = Journal(str(path), sync_interval=None)
+    dispenser = Dispenser(journal=journal)
+    attendant = FuelAttendant("John Doe", dispenser)
+    attendant.add_fuel("Petrol", 650.0, 1000.0)
+    attendant.add_fuel("Diesel", 700.0, 500.0)
+    attendant.add_fuel("Kerosene", 500.0, 100.0)
+    attendant.dispense_by_liters("Petrol", 10.0)
+    attendant.update_fuel_price("Petrol", 700.0)
+    attendant.dispense_by_amount("Petrol", 3500.0)
+    attendant.restock_fuel("Diesel", 250.0)
+    FuelAttendant("Jane Doe", dispenser).dispense_by_liters("Diesel", 20.0)
+    dispenser.remove_fuel("Kerosene")
+    journal.close()
+    return dispenser, attendant
+
+
+class TestJournal:
+    def test_new_journal_starts_with_magic(self, tmp_path):
+        path = tmp_path / "station.journal"
+        Journal(str(path), sync_interval=None).close()
+        assert path.read_bytes() == MAGIC
+
+    def test_batch_size_must_be_positive(self, tmp_path):
+        with pytest.raises(ValueError, match="Batch size"):
+            Journal(str(tmp_path / "station.journal"), batch_size=0)
+
+    def test_not_a_journal(self, tmp_path):
+        path = tmp_path / "station.journal"
+        path.write_bytes(b"garbage!")
+        with pytest.raises(ValueError, match="not an MFD journal"):
+            list(read_journal(str(path)))
+
+    def test_closed_journal_rejects_records(self, tmp_path):
+        journal = Journal(str(tmp_path / "station.journal"), sync_interval=None)
+        journal.close()
+        with pytest.raises(ValueError, match="closed"):
+            journal.log_restock("Petrol", 10.0)
+
+    def test_sync_makes_records_readable(self, tmp_path):
+        path = str(tmp_path / "station.journal")
+        journal = Journal(path, batch_size=1000, sync_interval=None)
+        journal.log_add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        journal.sync()
+        records = list(read_journal(path))
+        assert [fields for _, _, fields in records] == [("Petrol", 650.0, 1000.0)]
+        journal.close()
+
+    def test_recover_rebuilds_station(self, tmp_path):
+        path = tmp_path / "station.journal"
+        original, attendant = run_shift(path)
+
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        try:
+            assert sorted(dispenser.get_all_fuels()) == ["diesel", "petrol"]
+            for name in ("Petrol", "Diesel"):
+                assert dispenser.get_fuel(name).quantity == original.get_fuel(name).quantity
+                assert (
+                    dispenser.get_fuel(name).price_per_liter
+                    == original.get_fuel(name).price_per_liter
+                )
+            assert sorted(attendants) == ["Jane Doe", "John Doe"]
+            recovered = attendants["John Doe"]
+            assert recovered.show_all_transactions() == attendant.show_all_transactions()
+            assert recovered.get_transaction_summary() == attendant.get_transaction_summary()
+            assert attendants["Jane Doe"].get_transaction_summary()["total_liters"] == 20.0
+        finally:
+            journal.close()
+
+    def test_recovered_journal_keeps_logging(self, tmp_path):
+        path = tmp_path / "station.journal"
+        run_shift(path)
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        attendants["John Doe"].dispense_by_liters("Diesel", 5.0)
+        journal.close()
+
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        journal.close()
+        assert dispenser.get_fuel("Diesel").quantity == 725.0
+        assert attendants["John Doe"].get_transaction_summary()["total_transactions"] == 3
+
+    def test_torn_tail_is_ignored_and_truncated(self, tmp_path):
+        path = tmp_path / "station.journal"
+        run_shift(path)
+        intact_size = os.path.getsize(path)
+        with open(path, "ab") as journal_file:
+            journal_file.write(b"\x20\x00\x00\x00partial")
+
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        journal.close()
+        assert os.path.getsize(path) == intact_size
+        assert dispenser.get_fuel("Petrol").quantity == 985.0
+
+    def test_corrupt_final_record_is_a_torn_tail(self, tmp_path):
+        path = tmp_path / "station.journal"
+        run_shift(path)
+        data = path.read_bytes()
+        last_end = [end for end, _, _ in read_journal(str(path))][-2]
+        path.write_bytes(data[:-1] + bytes([data[-1] ^ 0xFF]))
+
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        journal.close()
+        assert os.path.getsize(path) == last_end
+        assert "kerosene" in dispenser.get_all_fuels()
+
+    def test_corrupt_record_in_the_middle_raises_and_keeps_the_file(self, tmp_path):
+        path = tmp_path / "station.journal"
+        run_shift(path)
+        data = bytearray(path.read_bytes())
+        first_end = next(read_journal(str(path)))[0]
+        data[first_end - 1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(ValueError, match="corrupt at offset"):
+            recover(str(path), sync_interval=None)
+        assert path.read_bytes() == bytes(data)
+
+    def test_recover_missing_journal_starts_empty(self, tmp_path):
+        path = tmp_path / "station.journal"
+        dispenser, attendants, journal = recover(str(path), sync_interval=None)
+        journal.close()
+        assert dispenser.get_all_fuels() == {}
+        assert attendants == {}
+        assert path.read_bytes() == MAGIC
+
+    def test_background_flusher_syncs(self, tmp_path):
+        path = str(tmp_path / "station.journal")
+        with Journal(path, batch_size=1000, sync_interval=0.001) as journal:
+            dispenser = Dispenser(journal=journal)
+            attendant = FuelAttendant("John Doe", dispenser)
+            attendant.add_fuel("Petrol", 650.0, 1000.0)
+            for _ in range(10):
+                attendant.dispense_by_liters("Petrol", 10.0)
+        types = [record_type for _, record_type, _ in read_journal(path)]
+        assert types.count(DISPENSE) == 10
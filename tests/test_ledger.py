@@ -0,0 +1,169 @@
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from mfd import Transaction
+from mfd.ledger import EncodedColumn, TransactionLedger, from_micros, to_micros
+
+
+def make_transaction(i: int, **kwargs) -> Transaction:
+    fields = dict(
+        fuel_name="Petrol" if i % 2 else "Diesel",
+        liters=10.0 + i,
+        amount=6500.0 + i,
+        transaction_type="by_liters",
+        attendant_name="John Doe",
+    )
+    fields.update(kwargs)
+    return Transaction(**fields)
+
+
+class TestTransactionLedger:
+    def test_micros_round_trip(self):
+        timestamp = datetime(2026, 3, 1, 14, 30, 5, 123456)
+        assert from_micros(to_micros(timestamp)) == timestamp
+
+    def test_append_and_read_back(self):
+        ledger = TransactionLedger()
+        transaction = make_transaction(1)
+        row = ledger.append(transaction)
+        assert row == 0
+        assert len(ledger) == 1
+        restored = ledger[0]
+        assert restored is not transaction
+        assert restored == transaction
+        assert restored.to_dict() == transaction.to_dict()
+
+    def test_custom_transaction_id_is_preserved(self):
+        ledger = TransactionLedger()
+        ledger.append(make_transaction(1, transaction_id="CUSTOM123"))
+        ledger.append(make_transaction(2))
+        assert ledger[0].transaction_id == "CUSTOM123"
+        assert ledger[1].transaction_id.startswith("TXN")
+
+    def test_negative_index_and_out_of_range(self):
+        ledger = TransactionLedger()
+        ledger.append(make_transaction(1))
+        ledger.append(make_transaction(2))
+        assert ledger[-1].liters == 12.0
+        with pytest.raises(IndexError):
+            ledger[2]
+
+    def test_iteration_preserves_order(self):
+        ledger = TransactionLedger()
+        for i in range(5):
+            ledger.append(make_transaction(i))
+        assert [txn.liters for txn in ledger] == [10.0, 11.0, 12.0, 13.0, 14.0]
+
+    def test_encoded_column_widens(self):
+        column = EncodedColumn()
+        for i in range(300):
+            column.append(f"Fuel {i}")
+        column.append("Fuel 0")
+        assert len(column) == 301
+        assert column[0] == "Fuel 0"
+        assert column[299] == "Fuel 299"
+        assert column[300] == "Fuel 0"
+
+    def test_bytes_per_record(self):
+        count = 20_000
+        transactions = [make_transaction(i) for i in range(count)]
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            as_objects = [make_transaction(i) for i in range(count)]
+            object_bytes = (tracemalloc.get_traced_memory()[0] - before) / count
+
+            ledger = TransactionLedger()
+            before = tracemalloc.get_traced_memory()[0]
+            for transaction in transactions:
+                ledger.append(transaction)
+            ledger_bytes = (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            tracemalloc.stop()
+
+        print(f"\nbytes/record: objects={object_bytes:.1f} ledger={ledger_bytes:.1f}")
+        assert len(as_objects) == len(ledger)
+        assert ledger_bytes < 40
+        assert object_bytes / ledger_bytes > 5
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 3, 1, hour, minute)
+
+
+def build_day() -> TransactionLedger:
+    ledger = TransactionLedger()
+    sales = [
+        (at(13, 30), "Petrol", "by_liters", 10.0, 6500.0),
+        (at(14, 0), "Diesel", "by_liters", 20.0, 14000.0),
+        (at(14, 15), "Petrol", "by_amount", 5.0, 3250.0),
+        (at(14, 45), "Diesel", "by_amount", 2.0, 1400.0),
+        (at(15, 0), "Diesel", "by_liters", 30.0, 21000.0),
+        (at(16, 0), "Petrol", "by_liters", 40.0, 26000.0),
+    ]
+    for timestamp, fuel_name, transaction_type, liters, amount in sales:
+        ledger.append(
+            Transaction(fuel_name, liters, amount, transaction_type, "John Doe", timestamp=timestamp)
+        )
+    return ledger
+
+
+class TestLedgerQuery:
+    def test_query_without_filters_returns_everything(self):
+        ledger = build_day()
+        assert [txn.liters for txn in ledger.query()] == [10.0, 20.0, 5.0, 2.0, 30.0, 40.0]
+
+    def test_query_is_lazy(self):
+        ledger = build_day()
+        results = ledger.query(fuel_name="Diesel")
+        assert not isinstance(results, list)
+        assert next(results).liters == 20.0
+
+    def test_time_window_is_half_open(self):
+        ledger = build_day()
+        window = ledger.query(start=at(14), end=at(15))
+        assert [txn.liters for txn in window] == [20.0, 5.0, 2.0]
+
+    def test_fuel_in_time_window(self):
+        ledger = build_day()
+        diesel = ledger.query(start=at(14), end=at(15), fuel_name="diesel")
+        assert [txn.liters for txn in diesel] == [20.0, 2.0]
+
+    def test_fuel_and_type(self):
+        ledger = build_day()
+        results = ledger.query(fuel_name="Petrol", transaction_type="by_liters")
+        assert [txn.liters for txn in results] == [10.0, 40.0]
+
+    def test_amount_and_liters_ranges(self):
+        ledger = build_day()
+        assert [txn.liters for txn in ledger.query(min_amount=6500.0, max_amount=21000.0)] == [
+            10.0, 20.0, 30.0,
+        ]
+        assert [txn.liters for txn in ledger.query(min_liters=5.0, max_liters=20.0)] == [
+            10.0, 20.0, 5.0,
+        ]
+
+    def test_unknown_fuel_or_type_matches_nothing(self):
+        ledger = build_day()
+        assert list(ledger.query(fuel_name="Kerosene")) == []
+        assert list(ledger.query(transaction_type="by_magic")) == []
+
+    def test_postings_follow_new_rows(self):
+        ledger = build_day()
+        assert len(list(ledger.query(fuel_name="Petrol"))) == 3
+        ledger.append(Transaction("Petrol", 1.0, 650.0, "by_liters", "Jane", timestamp=at(17)))
+        ledger.append(Transaction("Gas", 1.0, 900.0, "by_liters", "Jane", timestamp=at(17)))
+        assert len(list(ledger.query(fuel_name="Petrol"))) == 4
+        assert [txn.fuel_name for txn in ledger.query(fuel_name="Gas")] == ["Gas"]
+
+    def test_out_of_order_rows_are_found(self):
+        ledger = build_day()
+        ledger.append(Transaction("Diesel", 7.0, 4900.0, "by_liters", "Jane", timestamp=at(14, 30)))
+        ledger.append(Transaction("Diesel", 8.0, 5600.0, "by_liters", "Jane", timestamp=at(18)))
+        ledger.append(Transaction("Diesel", 9.0, 6300.0, "by_liters", "Jane", timestamp=at(14, 5)))
+        window = ledger.query(start=at(14), end=at(15), fuel_name="Diesel")
+        assert [txn.liters for txn in window] == [20.0, 9.0, 7.0, 2.0]
+        assert [txn.liters for txn in ledger.query(start=at(17))] == [8.0]
@@ -0,0 +1,111 @@
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.low_stock import RestockOrder, plan_restock
+
+
+def make_dispenser(thread_safe: bool = False) -> Dispenser:
+    dispenser = Dispenser(thread_safe=thread_safe)
+    dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+    dispenser.add_fuel(Fuel("Diesel", 700.0, 1000.0))
+    dispenser.add_fuel(Fuel("Kerosene", 900.0, 1000.0))
+    return dispenser
+
+
+class TestLowStockIndex:
+    def test_most_urgent_follows_sales(self):
+        dispenser = make_dispenser()
+        dispenser.set_low_stock_threshold("Petrol", 100.0)
+        dispenser.set_low_stock_threshold("Diesel", 500.0)
+        assert dispenser.low_stock.most_urgent().fuel_name == "Diesel"
+        dispenser.get_fuel("Petrol").reduce_quantity(900.0)
+        assert dispenser.low_stock.most_urgent().fuel_name == "Petrol"
+        assert dispenser.low_stock.level("Petrol") == 1.0
+        dispenser.restock_fuel("Petrol", 2000.0)
+        assert dispenser.low_stock.most_urgent().fuel_name == "Diesel"
+
+    def test_unwatched_fuels_are_ignored(self):
+        dispenser = make_dispenser()
+        assert dispenser.low_stock.most_urgent() is None
+        dispenser.get_fuel("Kerosene").reduce_quantity(1000.0)
+        assert dict(dispenser.low_stock.low_fuels()) == {}
+
+    def test_threshold_events(self):
+        dispenser = make_dispenser()
+        events = []
+        dispenser.low_stock.add_listener(lambda fuel, is_low: events.append((fuel.fuel_name, is_low)))
+        dispenser.set_low_stock_threshold("Petrol", 100.0)
+        attendant = FuelAttendant("John Doe", dispenser)
+        for _ in range(17):
+            attendant.dispense_by_liters("Petrol", 50.0)
+        assert events == []
+        attendant.dispense_by_liters("Petrol", 50.0)
+        assert events == [("Petrol", True)]
+        attendant.dispense_by_liters("Petrol", 10.0)
+        assert events == [("Petrol", True)]
+        dispenser.restock_fuel("Petrol", 500.0)
+        assert events == [("Petrol", True), ("Petrol", False)]
+        assert "petrol" not in dispenser.low_stock.low_fuels()
+
+    def test_setting_a_threshold_under_the_level_fires(self):
+        dispenser = make_dispenser()
+        events = []
+        dispenser.low_stock.add_listener(lambda fuel, is_low: events.append(is_low))
+        dispenser.set_low_stock_threshold("Petrol", 1000.0)
+        assert events == [True]
+        assert set(dispenser.low_stock.low_fuels()) == {"petrol"}
+
+    def test_clear_and_remove(self):
+        dispenser = make_dispenser()
+        dispenser.set_low_stock_threshold("Petrol", 2000.0)
+        dispenser.set_low_stock_threshold("Diesel", 1500.0)
+        dispenser.clear_low_stock_threshold("Petrol")
+        assert dispenser.low_stock.most_urgent().fuel_name == "Diesel"
+        dispenser.remove_fuel("Diesel")
+        assert dispenser.low_stock.most_urgent() is None
+        assert len(dispenser.low_stock) == 0
+
+    def test_validation(self):
+        dispenser = make_dispenser()
+        with pytest.raises(ValueError, match="not found"):
+            dispenser.set_low_stock_threshold("Gas", 10.0)
+        with pytest.raises(ValueError, match="positive"):
+            dispenser.set_low_stock_threshold("Petrol", 0.0)
+        # Rounds to 0 mL, which would divide by zero when ranking fuels.
+        with pytest.raises(ValueError, match="positive"):
+            dispenser.set_low_stock_threshold("Petrol", 0.0004)
+        assert len(dispenser.low_stock) == 0
+        with pytest.raises(ValueError, match="below"):
+            dispenser.set_low_stock_threshold("Petrol", 100.0, restock_to=50.0)
+
+    def test_stale_entries_are_compacted(self):
+        dispenser = make_dispenser(thread_safe=True)
+        dispenser.set_low_stock_threshold("Petrol", 100.0)
+        attendant = FuelAttendant("John Doe", dispenser)
+        for _ in range(900):
+            attendant.dispense_by_liters("Petrol", 1.0)
+        assert len(dispenser.low_stock._heap) <= 2 * len(dispenser.low_stock) + 65
+        assert dispenser.low_stock.most_urgent().fuel_name == "Petrol"
+
+
+class TestPlanRestock:
+    def make_stations(self):
+        stations = {"Ikeja": make_dispenser(), "Lekki": make_dispenser()}
+        for dispenser in stations.values():
+            dispenser.set_low_stock_threshold("Petrol", 200.0, restock_to=1000.0)
+            dispenser.set_low_stock_threshold("Diesel", 200.0, restock_to=1000.0)
+        stations["Ikeja"].get_fuel("Petrol").reduce_quantity(900.0)
+        stations["Lekki"].get_fuel("Diesel").reduce_quantity(850.0)
+        return stations
+
+    def test_orders_most_urgent_first(self):
+        assert plan_restock(self.make_stations()) == [
+            RestockOrder("Ikeja", "Petrol", 900.0, 0.5),
+            RestockOrder("Lekki", "Diesel", 850.0, 0.75),
+        ]
+
+    def test_truck_capacity(self):
+        assert plan_restock(self.make_stations(), truck_liters=1000.0) == [
+            RestockOrder("Ikeja", "Petrol", 900.0, 0.5),
+            RestockOrder("Lekki", "Diesel", 100.0, 0.75),
+        ]
@@ -0,0 +1,222 @@
+import urllib.request
+
+import pytest
+
+from mfd import DispenseRequest, Dispenser, Fuel, FuelAttendant
+from mfd import errors
+from mfd.metrics import BUCKET_BOUNDS_NS, Histogram, Metrics, outcome_of
+
+
+def build(thread_safe: bool = False):
+    metrics = Metrics()
+    dispenser = Dispenser(thread_safe=thread_safe, metrics=metrics)
+    dispenser.add_fuel(Fuel("Petrol", 650.0, 40.0))
+    dispenser.add_fuel(Fuel("Diesel", 700.0, 0.0))
+    return metrics, FuelAttendant("Sniper Smith", dispenser)
+
+
+class TestHistogram:
+    def test_buckets_are_powers_of_two_microseconds(self):
+        histogram = Histogram()
+        for elapsed_ns in (1, 1000, 1001, 2000, 4001):
+            histogram.observe(elapsed_ns)
+        assert histogram.buckets[:4] == [2, 2, 0, 1]
+        assert histogram.count == 5
+        assert histogram.sum_ns == 1 + 1000 + 1001 + 2000 + 4001
+
+    def test_slow_observations_go_to_the_overflow_bucket(self):
+        histogram = Histogram()
+        histogram.observe(BUCKET_BOUNDS_NS[-1] + 1)
+        assert histogram.buckets[-1] == 1
+
+
+class TestOutcomes:
+    @pytest.mark.parametrize(
+        "error, outcome",
+        [
+            (errors.UnknownFuelError, "unknown_fuel"),
+            (errors.OutOfStockError, "out_of_stock"),
+            (errors.InsufficientFuelError, "insufficient_fuel"),
+            (errors.InvalidLitersError, "invalid_liters"),
+            (errors.AmountTooLowError, "amount_too_low"),
+            (errors.ReservationNotFoundError, "no_reservation"),
+            (errors.DispenseError, "rejected"),
+        ],
+    )
+    def test_outcome_of_dispense_error(self, error, outcome):
+        assert outcome_of(error("any message")) == outcome
+        assert isinstance(error("any message"), ValueError)
+
+    def test_outcome_does_not_depend_on_the_message(self):
+        assert outcome_of(ValueError("Fuel 'Kerosene' not found")) == "rejected"
+
+    def test_other_exceptions_are_errors(self):
+        assert outcome_of(RuntimeError("boom")) == "error"
+
+
+class TestMetrics:
+    def test_disabled_by_default(self):
+        dispenser = Dispenser()
+        assert dispenser.metrics is None
+        assert FuelAttendant("Sniper Smith", dispenser)._metrics is None
+
+    def test_attendant_can_use_its_own_metrics(self):
+        metrics = Metrics()
+        dispenser = Dispenser()
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 100.0))
+        attendant = FuelAttendant("Sniper Smith", dispenser, metrics=metrics)
+        attendant.dispense_by_liters("Petrol", 10.0)
+        assert metrics.count("dispense_by_liters", "petrol") == 1
+
+    def test_sales_are_counted_timed_and_totalled(self):
+        metrics, attendant = build()
+        attendant.dispense_by_liters("Petrol", 10.0)
+        attendant.dispense_by_amount("PETROL", 1300.0)
+        assert metrics.count("dispense_by_liters", "Petrol") == 1
+        assert metrics.count("dispense_by_amount", "Petrol") == 1
+        assert metrics.histogram("dispense_by_liters", "petrol").count == 1
+        assert metrics.sold("Petrol") == (12.0, 7800.0)
+
+    def test_failures_are_counted_by_outcome(self):
+        metrics, attendant = build()
+        for call in (
+            lambda: attendant.dispense_by_liters("Petrol", 0.5),
+            lambda: attendant.dispense_by_liters("Petrol", 50.0),
+            lambda: attendant.dispense_by_liters("Diesel", 10.0),
+            lambda: attendant.dispense_by_amount("Petrol", 100.0),
+            lambda: attendant.dispense_by_liters("Kerosene", 10.0),
+        ):
+            with pytest.raises(ValueError):
+                call()
+        assert metrics.count("dispense_by_liters", "petrol", "invalid_liters") == 1
+        assert metrics.count("dispense_by_liters", "petrol", "insufficient_fuel") == 1
+        assert metrics.count("dispense_by_liters", "diesel", "out_of_stock") == 1
+        assert metrics.count("dispense_by_amount", "petrol", "amount_too_low") == 1
+        # Unknown fuels share one label, so bad input cannot grow the label set.
+        assert metrics.count("dispense_by_liters", "", "unknown_fuel") == 1
+        assert metrics.sold("Petrol") == (0.0, 0.0)
+
+    def test_fuels_not_in_the_dispenser_share_one_label(self):
+        metrics, attendant = build()
+        for fuel_name in ("Kerosene", "Gas", "LPG"):
+            with pytest.raises(ValueError):
+                attendant.dispense_by_liters(fuel_name, 0.5)
+        with pytest.raises(AttributeError):
+            attendant.dispense_by_liters(7, 10.0)
+        attendant.dispense_batch([DispenseRequest("Avgas", liters="5")])
+        assert metrics.count("dispense_by_liters", "", "invalid_liters") == 3
+        assert metrics.count("dispense_by_liters", "", "error") == 1
+        assert metrics.count("dispense_batch_request", "", "unknown_fuel") == 1
+        assert {fuel for _, fuel, _ in metrics._counts} == {"", "petrol", "diesel"}
+
+    def test_nozzle_of_a_removed_fuel_is_unlabelled(self):
+        metrics, attendant = build()
+        nozzle = attendant.nozzle("Petrol")
+        attendant.dispenser.remove_fuel("Petrol")
+        with pytest.raises(errors.UnknownFuelError):
+            nozzle.dispense_by_liters(10.0)
+        assert metrics.count("dispense_by_liters", "", "unknown_fuel") == 1
+
+    def test_dispenser_operations_are_metered(self):
+        metrics, attendant = build()
+        attendant.restock_fuel("Diesel", 100.0)
+        attendant.update_fuel_price("Diesel", 720.0)
+        attendant.dispenser.remove_fuel("Diesel")
+        assert metrics.count("add_fuel", "petrol") == 1
+        assert metrics.count("restock_fuel", "diesel") == 1
+        assert metrics.count("update_fuel_price", "diesel") == 1
+        assert metrics.count("remove_fuel", "diesel") == 1
+
+    def test_nozzle_sales_are_metered(self):
+        metrics, attendant = build()
+        nozzle = attendant.nozzle("Petrol")
+        nozzle.dispense_by_liters(10.0)
+        with pytest.raises(ValueError):
+            nozzle.dispense_by_liters(95.0)
+        assert metrics.count("dispense_by_liters", "petrol") == 1
+        assert metrics.count("dispense_by_liters", "petrol", "invalid_liters") == 1
+
+    def test_reservations_are_metered(self):
+        metrics, attendant = build()
+        reservation = attendant.reserve_by_liters("Petrol", 20.0)
+        attendant.commit_reservation(reservation.reservation_id, 15.0)
+        with pytest.raises(ValueError):
+            attendant.commit_reservation(reservation.reservation_id, 15.0)
+        assert metrics.count("reserve_by_liters", "petrol") == 1
+        assert metrics.count("commit_reservation", "petrol") == 1
+        assert metrics.count("commit_reservation", "", "no_reservation") == 1
+        assert metrics.sold("Petrol") == (15.0, 9750.0)
+
+    def test_batch_requests_are_counted_one_by_one(self):
+        metrics, attendant = build()
+        attendant.dispense_batch(
+            [
+                DispenseRequest("Petrol", liters=10.0),
+                DispenseRequest("Diesel", liters=10.0),
+                DispenseRequest("Kerosene", amount=1000.0),
+            ]
+        )
+        assert metrics.count("dispense_batch") == 1
+        assert metrics.count("dispense_batch_request", "petrol") == 1
+        assert metrics.count("dispense_batch_request", "diesel", "out_of_stock") == 1
+        assert metrics.count("dispense_batch_request", "", "unknown_fuel") == 1
+        assert metrics.sold("Petrol") == (10.0, 6500.0)
+
+    def test_render_prometheus_text(self):
+        metrics, attendant = build()
+        attendant.dispense_by_liters("Petrol", 10.0)
+        text = metrics.render()
+        assert "# TYPE mfd_operations_total counter" in text
+        assert (
+            'mfd_operations_total{operation="dispense_by_liters",fuel="petrol",outcome="ok"} 1'
+            in text
+        )
+        assert (
+            'mfd_operation_duration_seconds_bucket{operation="dispense_by_liters",fuel="petrol",'
+            'le="+Inf"} 1' in text
+        )
+        assert (
+            'mfd_operation_duration_seconds_count{operation="dispense_by_liters",fuel="petrol"} 1'
+            in text
+        )
+        assert 'mfd_dispensed_liters_total{fuel="petrol"} 10.0' in text
+        assert 'mfd_sales_naira_total{fuel="petrol"} 6500.0' in text
+        assert text.endswith("\n")
+
+    def test_render_buckets_are_cumulative(self):
+        metrics = Metrics()
+        metrics.record("op", "petrol", "ok", 500)
+        metrics.record("op", "petrol", "ok", 3000)
+        lines = [
+            line for line in metrics.render().splitlines()
+            if line.startswith("mfd_operation_duration_seconds_bucket")
+        ]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+        assert counts == sorted(counts)
+        assert counts[0] == 1 and counts[-1] == 2
+        assert 'le="1e-06"' in lines[0]
+
+    def test_label_values_are_escaped(self):
+        metrics = Metrics()
+        metrics.record("op", 'say "hi"\\', "ok")
+        assert 'fuel="say \\"hi\\"\\\\"' in metrics.render()
+
+    def test_write_snapshot(self, tmp_path):
+        metrics, attendant = build()
+        attendant.dispense_by_liters("Petrol", 10.0)
+        path = tmp_path / "mfd.prom"
+        metrics.write(str(path))
+        assert path.read_text(encoding="utf-8") == metrics.render()
+
+    def test_serve_snapshot(self):
+        metrics, attendant = build(thread_safe=True)
+        attendant.dispense_by_liters("Petrol", 10.0)
+        server = metrics.serve(port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert "mfd_operations_total" in response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,152 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.pricing import PriceTable
+
+START = datetime(2026, 1, 1, 8)
+
+
+def at(minutes: int) -> datetime:
+    return START + timedelta(minutes=minutes)
+
+
+class TestPriceTable:
+    def test_versions_are_immutable(self):
+        table = PriceTable()
+        first = table.publish({"Petrol": 65000}, timestamp=at(0))
+        second = table.publish({"Diesel": 70000}, timestamp=at(1))
+        assert dict(first.prices) == {"petrol": 65000}
+        assert dict(second.prices) == {"petrol": 65000, "diesel": 70000}
+        assert table.current() is second
+        with pytest.raises(TypeError):
+            second.prices["petrol"] = 1
+
+    def test_price_at(self):
+        table = PriceTable()
+        table.publish({"Petrol": 65000}, timestamp=at(0))
+        table.publish({"Petrol": 70000}, timestamp=at(10))
+        table.publish(removed=["Petrol"], timestamp=at(20))
+        assert table.price_at("Petrol", at(-1)) is None
+        assert table.price_at("petrol", at(0)) == 650.0
+        assert table.price_at("Petrol", at(9)) == 650.0
+        assert table.price_at("Petrol", at(10)) == 700.0
+        assert table.price_at("Petrol", at(25)) is None
+        assert table.version_at(at(15)).version == 2
+
+    def test_history(self):
+        table = PriceTable()
+        table.publish({"Petrol": 65000}, timestamp=at(0))
+        table.publish({"Diesel": 70000}, timestamp=at(1))
+        table.publish({"Petrol": 66000}, timestamp=at(2))
+        assert table.history("Petrol") == [(at(0), 650.0), (at(2), 660.0)]
+
+    def test_updates_build_the_current_version_once(self):
+        table = PriceTable()
+        for index in range(100):
+            assert table.update({f"Grade {index}": 100 + index}, timestamp=at(index)) == index + 1
+        table.update(removed=["Grade 0"], timestamp=at(100))
+        current = table.current()
+        assert table.current() is current
+        assert (current.version, current.effective_at) == (101, at(100))
+        assert len(current.prices) == 99
+        assert len(table) == 101
+
+    def test_old_versions_are_rebuilt_from_history(self):
+        table = PriceTable()
+        table.publish({"Petrol": 65000, "Diesel": 70000}, timestamp=at(0))
+        table.update({"Petrol": 66000}, timestamp=at(5))
+        table.update(removed=["Diesel"], timestamp=at(10))
+        version = table.version_at(at(7))
+        assert (version.version, version.effective_at) == (2, at(5))
+        assert dict(version.prices) == {"petrol": 66000, "diesel": 70000}
+        assert dict(table.version_at(at(10)).prices) == {"petrol": 66000}
+        assert table.history("Diesel") == [(at(0), 700.0), (at(10), None)]
+
+    def test_clock_going_backwards_keeps_order(self):
+        table = PriceTable()
+        table.publish({"Petrol": 65000}, timestamp=at(10))
+        version = table.publish({"Petrol": 70000}, timestamp=at(5))
+        assert version.effective_at == at(10)
+        assert table.price_at("Petrol", at(10)) == 700.0
+
+
+class TestDispenserPricing:
+    def make_dispenser(self) -> Dispenser:
+        dispenser = Dispenser(thread_safe=True)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 10000.0))
+        dispenser.add_fuel(Fuel("Diesel", 700.0, 10000.0))
+        return dispenser
+
+    def test_price_changes_are_recorded(self):
+        dispenser = self.make_dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        before = attendant.dispense_by_liters("Petrol", 10.0)
+        dispenser.update_fuel_price("Petrol", 700.0)
+        after = attendant.dispense_by_liters("Petrol", 10.0)
+        prices = dispenser.prices
+        assert prices.price_at("Petrol", before.timestamp) * before.liters == before.amount
+        assert prices.price_at("Petrol", after.timestamp) * after.liters == after.amount
+        assert dispenser.get_fuel("Petrol").price_per_liter == 700.0
+
+    def test_update_fuel_prices_is_one_version(self):
+        dispenser = self.make_dispenser()
+        versions = len(dispenser.prices)
+        version = dispenser.update_fuel_prices({"Petrol": 680.0, "diesel": 720.0})
+        assert len(dispenser.prices) == versions + 1
+        assert dict(version.prices) == {"petrol": 68000, "diesel": 72000}
+        assert dispenser.get_fuel("Diesel").price_per_liter == 720.0
+
+    def test_update_fuel_prices_validates_everything_first(self):
+        dispenser = self.make_dispenser()
+        with pytest.raises(ValueError, match="not found"):
+            dispenser.update_fuel_prices({"Petrol": 680.0, "Kerosene": 900.0})
+        with pytest.raises(ValueError, match="negative"):
+            dispenser.update_fuel_prices({"Petrol": 680.0, "Diesel": -1.0})
+        assert dispenser.get_fuel("Petrol").price_per_liter == 650.0
+        assert dispenser.price_snapshot().price_kobo("Petrol") == 65000
+
+    def test_setting_a_fuels_price_reprices_sales(self):
+        dispenser = self.make_dispenser()
+        attendant = FuelAttendant("John Doe", dispenser)
+        fuel = dispenser.get_fuel("Petrol")
+        fuel.price_per_liter = 200.0
+        assert fuel.calculate_cost(10.0) == 2000.0
+        assert dispenser.price_snapshot().price_kobo("Petrol") == 20000
+        assert attendant.dispense_by_liters("Petrol", 10.0).amount == 2000.0
+        with pytest.raises(ValueError, match="at least ₦200.00"):
+            attendant.dispense_by_amount("Petrol", 100.0)
+
+    def test_removed_fuel_is_repriced_on_its_own(self):
+        dispenser = self.make_dispenser()
+        fuel = dispenser.get_fuel("Diesel")
+        dispenser.remove_fuel("Diesel")
+        fuel.price_per_liter = 800.0
+        assert fuel.price_per_liter == 800.0
+        assert dispenser.price_snapshot().price_kobo("Diesel") is None
+
+    def test_removed_fuel_has_no_price(self):
+        dispenser = self.make_dispenser()
+        dispenser.remove_fuel("Diesel")
+        assert dispenser.price_snapshot().price_kobo("Diesel") is None
+
+    def test_readers_never_see_half_an_update(self):
+        dispenser = self.make_dispenser()
+        stop = threading.Event()
+        mixed = []
+
+        def reader():
+            while not stop.is_set():
+                prices = dispenser.price_snapshot().prices
+                if prices["diesel"] - prices["petrol"] != 5000:
+                    mixed.append(dict(prices))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for step in range(2000):
+            dispenser.update_fuel_prices({"Petrol": 650.0 + step, "Diesel": 700.0 + step})
+        stop.set()
+        thread.join()
+        assert mixed == []
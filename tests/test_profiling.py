@@ -0,0 +1,82 @@
+import io
+import pstats
+import tracemalloc
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.profiling import ActionTimings, profiled
+
+
+def sell_some():
+    dispenser = Dispenser()
+    dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+    attendant = FuelAttendant("Sniper Smith", dispenser)
+    for _ in range(10):
+        attendant.dispense_by_liters("Petrol", 10.0)
+
+
+class TestActionTimings:
+    def test_record_and_report(self):
+        timings = ActionTimings()
+        timings.record("dispense_by_liters", 2_000_000)
+        timings.record("dispense_by_liters", 4_000_000)
+        timings.record("show_transaction_summary", 1_000_000)
+        assert timings.count("dispense_by_liters") == 2
+        assert timings.count("restock_fuel") == 0
+        lines = timings.report().splitlines()
+        # Slowest in total first.
+        assert lines[1].split() == ["dispense_by_liters", "2", "6.000", "3.000", "4.000"]
+        assert lines[2].split()[0] == "show_transaction_summary"
+
+    def test_timed_records_even_when_the_action_fails(self):
+        timings = ActionTimings()
+        with pytest.raises(ValueError):
+            with timings.timed("restock_fuel"):
+                raise ValueError("boom")
+        assert timings.count("restock_fuel") == 1
+
+
+class TestProfiled:
+    def test_no_mode_profiles_nothing(self):
+        report = io.StringIO()
+        with profiled(None, report=report) as timings:
+            sell_some()
+        assert timings is None
+        assert report.getvalue() == ""
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="Unknown profile mode"):
+            with profiled("gpu"):
+                pass
+
+    def test_cpu_profile_writes_report_and_pstats(self, tmp_path):
+        report = io.StringIO()
+        output = tmp_path / "session.pstats"
+        with profiled("cpu", str(output), report=report) as timings:
+            with timings.timed("sell_some"):
+                sell_some()
+        text = report.getvalue()
+        assert "PROFILE (cpu)" in text
+        assert "cumulative" in text
+        assert "sell_some" in text
+        stats = pstats.Stats(str(output))
+        assert any(name == "dispense_by_liters" for _, _, name in stats.stats)
+
+    def test_memory_profile_writes_report_and_snapshot(self, tmp_path):
+        report = io.StringIO()
+        output = tmp_path / "session.snapshot"
+        with profiled("mem", str(output), report=report):
+            sell_some()
+        assert not tracemalloc.is_tracing()
+        assert "Peak traced memory" in report.getvalue()
+        assert tracemalloc.Snapshot.load(str(output)).traces
+
+    def test_actions_profile_saves_timings(self, tmp_path):
+        report = io.StringIO()
+        output = tmp_path / "actions.txt"
+        with profiled("actions", str(output), report=report) as timings:
+            with timings.timed("sell_some"):
+                sell_some()
+        assert "sell_some" in output.read_text(encoding="utf-8")
+        assert "sell_some" in report.getvalue()
@@ -0,0 +1,188 @@
+import io
+import json
+
+import pytest
+
+from mfd import Dispenser
+from mfd.profiling import ActionTimings
+from mfd.replay import (
+    ReplayLine,
+    Replayer,
+    read_csv,
+    read_jsonl,
+    read_operations,
+    tiered_ledgers,
+    totals,
+)
+from mfd.tiered_ledger import TieredLedger
+
+OPERATIONS = [
+    {"op": "add_fuel", "fuel_name": "Petrol", "price": 650, "quantity": 100},
+    {"op": "dispense_by_liters", "fuel_name": "Petrol", "liters": 10},
+    {"op": "dispense_by_amount", "fuel_name": "petrol", "amount": 1300, "attendant": "Ann"},
+    {"op": "update_price", "fuel_name": "Petrol", "price": 700},
+    {"op": "restock", "fuel_name": "Petrol", "liters": 50},
+]
+
+
+def jsonl(*operations) -> io.StringIO:
+    return io.StringIO("".join(json.dumps(operation) + "\n" for operation in operations))
+
+
+class TestReaders:
+    def test_read_jsonl(self):
+        stream = io.StringIO('{"op": "restock", "liters": 5}\n\n[1, 2]\nnot json\n')
+        lines = list(read_jsonl(stream))
+        assert lines[0] == ReplayLine(1, {"op": "restock", "liters": 5})
+        assert lines[1] == ReplayLine(3, None, "Expected a JSON object")
+        assert lines[2].line == 4
+        assert lines[2].error.startswith("Bad JSON")
+
+    def test_read_csv(self):
+        stream = io.StringIO(
+            "op,fuel_name,liters,amount,attendant\n"
+            "dispense_by_liters,Petrol,10,,\n"
+            "dispense_by_amount,Diesel,,lots,Ann\n"
+        )
+        lines = list(read_csv(stream))
+        assert lines[0] == ReplayLine(
+            2, {"op": "dispense_by_liters", "fuel_name": "Petrol", "liters": 10.0}
+        )
+        assert lines[1] == ReplayLine(3, None, "Field 'amount' is not a number")
+
+    def test_readers_reject_mistyped_and_non_finite_fields(self):
+        stream = jsonl(
+            {"op": "dispense_by_liters", "fuel_name": 7, "liters": 5},
+            {"op": "restock", "fuel_name": "Petrol", "liters": True},
+            {"op": "restock", "fuel_name": "Petrol", "liters": "5"},
+        )
+        assert [line.error for line in read_jsonl(stream)] == [
+            "Field 'fuel_name' is not a string",
+            "Field 'liters' is not a number",
+            "Field 'liters' is not a number",
+        ]
+        stream = io.StringIO("op,fuel_name,liters\nrestock,Petrol,inf\nrestock,Petrol,nan\n")
+        assert [line.error for line in read_csv(stream)] == [
+            "Field 'liters' is not a finite number",
+            "Field 'liters' is not a finite number",
+        ]
+
+    def test_read_operations_picks_format_from_extension(self, tmp_path):
+        csv_path = tmp_path / "ops.csv"
+        csv_path.write_text("op,fuel_name,liters\nrestock,Petrol,5\n", encoding="utf-8")
+        jsonl_path = tmp_path / "ops.jsonl"
+        jsonl_path.write_text('{"op": "restock", "fuel_name": "Petrol", "liters": 5}\n')
+        assert [line.fields for line in read_operations(str(csv_path))] == [
+            {"op": "restock", "fuel_name": "Petrol", "liters": 5.0}
+        ]
+        assert [line.fields for line in read_operations(str(jsonl_path))] == [
+            {"op": "restock", "fuel_name": "Petrol", "liters": 5}
+        ]
+
+    def test_read_operations_unknown_format(self, tmp_path):
+        path = tmp_path / "ops.txt"
+        path.write_text("")
+        with pytest.raises(ValueError, match="Unknown replay format"):
+            list(read_operations(str(path), "xml"))
+
+
+class TestReplayer:
+    def test_replays_operations_through_attendants(self):
+        dispenser = Dispenser()
+        replayer = Replayer(dispenser)
+        summary = replayer.run(read_jsonl(jsonl(*OPERATIONS)))
+        assert (summary.operations, summary.applied, summary.failed) == (5, 5, 0)
+        assert summary.by_op["dispense_by_liters"] == [1, 0]
+        assert set(replayer.attendants) == {"Replay Attendant", "Ann"}
+        assert totals(replayer.attendants.values()) == (2, 12.0, 7800.0)
+        petrol = dispenser.get_fuel("Petrol")
+        assert petrol.quantity == pytest.approx(138.0)
+        assert petrol.price_per_liter == 700.0
+
+    def test_bad_lines_are_reported_and_replay_goes_on(self):
+        errors = io.StringIO()
+        stream = jsonl(
+            OPERATIONS[0],
+            {"op": "dispense_by_liters", "fuel_name": "Diesel", "liters": 10},
+            {"op": "dispense_by_liters", "fuel_name": "Petrol", "liters": 500},
+            {"op": "restock", "fuel_name": "Petrol"},
+            {"op": "fly"},
+            {"op": "remove_fuel", "fuel_name": "Kerosene"},
+            OPERATIONS[1],
+        )
+        summary = Replayer(Dispenser()).run(read_jsonl(stream), errors=errors)
+        assert (summary.applied, summary.failed) == (2, 5)
+        assert summary.by_op["unknown"] == [0, 1]
+        assert errors.getvalue().splitlines() == [
+            "line 2: dispense_by_liters: Fuel 'Diesel' not found",
+            "line 3: dispense_by_liters: Liters must be between 1 and 50",
+            "line 4: restock: Missing field 'liters'",
+            "line 5: unknown: Unknown operation 'fly'",
+            "line 6: remove_fuel: Fuel 'Kerosene' not found in the dispenser",
+        ]
+
+    def test_any_failure_is_that_lines_error(self):
+        def broken_ledger(name):
+            raise OSError("disk full")
+
+        errors = io.StringIO()
+        stream = jsonl(
+            OPERATIONS[0],
+            {"op": "dispense_by_liters", "fuel_name": "Petrol", "liters": 10, "attendant": "Ann"},
+            {"op": "restock", "fuel_name": "Petrol", "liters": 1e308},
+            {"op": "update_price", "fuel_name": "Petrol", "price": 700},
+        )
+        summary = Replayer(Dispenser(), ledger_factory=broken_ledger).run(
+            read_jsonl(stream), errors=errors
+        )
+        assert (summary.applied, summary.failed) == (2, 2)
+        lines = errors.getvalue().splitlines()
+        assert lines[0] == "line 2: dispense_by_liters: disk full"
+        assert lines[1].startswith("line 3: restock: ")
+
+    def test_max_errors_limits_reports_not_counts(self):
+        errors = io.StringIO()
+        stream = jsonl(*[{"op": "fly"}] * 5)
+        summary = Replayer(Dispenser()).run(read_jsonl(stream), errors=errors, max_errors=2)
+        assert summary.failed == 5
+        assert len(errors.getvalue().splitlines()) == 2
+
+    def test_receipts_only_when_asked(self):
+        receipts = io.StringIO()
+        Replayer(Dispenser()).run(read_jsonl(jsonl(*OPERATIONS[:2])), receipts=receipts)
+        assert "Petrol" in receipts.getvalue()
+        # Without a receipts stream nothing is rendered.
+        Replayer(Dispenser()).run(read_jsonl(jsonl(*OPERATIONS[:2])))
+
+    def test_results_are_lazy(self):
+        replayer = Replayer(Dispenser())
+        results = replayer.results(read_jsonl(jsonl(*OPERATIONS)))
+        first = next(results)
+        assert first.op == "add_fuel"
+        assert first.error is None
+        assert replayer.attendants == {}
+
+    def test_timings_per_operation(self):
+        timings = ActionTimings()
+        Replayer(Dispenser(), timings=timings).run(read_jsonl(jsonl(*OPERATIONS)))
+        assert timings.count("dispense_by_liters") == 1
+        assert timings.count("add_fuel") == 1
+
+    def test_totals_do_not_drift(self):
+        dispenser = Dispenser()
+        replayer = Replayer(dispenser)
+        operations = [{"op": "add_fuel", "fuel_name": "Petrol", "price": 1, "quantity": 10000}]
+        operations += [
+            {"op": "dispense_by_liters", "fuel_name": "Petrol", "liters": 1.1, "attendant": f"A{i}"}
+            for i in range(1000)
+        ]
+        replayer.run(read_jsonl(jsonl(*operations)))
+        assert totals(replayer.attendants.values()) == (1000, 1100.0, 1100.0)
+
+    def test_tiered_ledgers_per_attendant(self, tmp_path):
+        replayer = Replayer(Dispenser(), ledger_factory=tiered_ledgers(str(tmp_path)))
+        replayer.run(read_jsonl(jsonl(*OPERATIONS)))
+        attendant = replayer.attendant("Ann")
+        assert isinstance(attendant._transactions, TieredLedger)
+        assert len(attendant.show_all_transactions()) == 1
+        assert len(list(tmp_path.iterdir())) == 2
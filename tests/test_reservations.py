@@ -0,0 +1,174 @@
+import threading
+import time
+
+import pytest
+
+from mfd import DispenseRequest, Dispenser, FuelAttendant
+
+
+def make_attendant(thread_safe: bool = False) -> FuelAttendant:
+    attendant = FuelAttendant("John Doe", Dispenser(thread_safe=thread_safe))
+    attendant.add_fuel("Petrol", 650.0, 100.0)
+    attendant.add_fuel("Diesel", 700.0, 1000.0)
+    return attendant
+
+
+class TestReservations:
+    def test_reserve_holds_stock_without_deducting(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 40.0)
+        petrol = attendant.dispenser.get_fuel("Petrol")
+        assert reservation.fuel_name == "Petrol"
+        assert (reservation.liters, reservation.amount) == (40.0, 26000.0)
+        assert petrol.quantity == 100.0
+        assert petrol.unreserved_ml == 60_000
+        assert len(attendant.dispenser.reservations) == 1
+
+    def test_held_stock_cannot_be_sold(self):
+        attendant = make_attendant()
+        attendant.reserve_by_liters("Petrol", 50.0)
+        attendant.reserve_by_liters("Petrol", 40.0)
+        with pytest.raises(ValueError, match="Insufficient fuel. Available: 10.00L"):
+            attendant.dispense_by_liters("Petrol", 20.0)
+        with pytest.raises(ValueError, match="Insufficient fuel"):
+            attendant.reserve_by_liters("Petrol", 11.0)
+        assert attendant.dispense_by_liters("Petrol", 10.0).liters == 10.0
+
+    def test_commit_settles_metered_volume(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 40.0)
+        transaction = attendant.commit_reservation(reservation.reservation_id, 25.0)
+        petrol = attendant.dispenser.get_fuel("Petrol")
+        assert (transaction.liters, transaction.amount) == (25.0, 16250.0)
+        assert transaction.transaction_type == "by_liters"
+        assert petrol.quantity == 75.0
+        assert petrol.reserved_ml == 0
+        assert len(attendant.dispenser.reservations) == 0
+        assert attendant.get_transaction_summary()["total_liters"] == 25.0
+
+    def test_commit_at_authorized_price(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_amount("Diesel", 7000.0)
+        attendant.update_fuel_price("Diesel", 800.0)
+        transaction = attendant.commit_reservation(reservation.reservation_id, reservation.liters)
+        assert transaction.amount == 7000.0
+        assert transaction.transaction_type == "by_amount"
+
+    def test_commit_cannot_exceed_reservation(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 10.0)
+        with pytest.raises(ValueError, match="exceeds the 10.00L reserved"):
+            attendant.commit_reservation(reservation.reservation_id, 10.5)
+        with pytest.raises(ValueError, match="cannot be negative"):
+            attendant.commit_reservation(reservation.reservation_id, -1.0)
+        assert attendant.commit_reservation(reservation.reservation_id, 10.0).liters == 10.0
+        with pytest.raises(ValueError, match="not found or expired"):
+            attendant.commit_reservation(reservation.reservation_id, 1.0)
+
+    def test_commit_nothing_pumped(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 10.0)
+        assert attendant.commit_reservation(reservation.reservation_id, 0.0) is None
+        assert attendant.dispenser.get_fuel("Petrol").unreserved_ml == 100_000
+        assert attendant.show_all_transactions() == []
+
+    def test_cancel_releases_stock(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 50.0)
+        assert attendant.cancel_reservation(reservation.reservation_id)
+        assert not attendant.cancel_reservation(reservation.reservation_id)
+        assert attendant.dispenser.get_fuel("Petrol").unreserved_ml == 100_000
+
+    def test_expired_reservation_releases_stock(self):
+        attendant = make_attendant()
+        dispenser = attendant.dispenser
+        reservation = attendant.reserve_by_liters("Petrol", 50.0, timeout=30.0)
+        kept = attendant.reserve_by_liters("Petrol", 10.0, timeout=300.0)
+        now = dispenser.reservations.clock()
+        assert dispenser.expire_reservations(now + 10.0) == []
+        assert dispenser.expire_reservations(now + 31.0) == [reservation]
+        assert dispenser.get_fuel("Petrol").unreserved_ml == 90_000
+        with pytest.raises(ValueError, match="not found or expired"):
+            attendant.commit_reservation(reservation.reservation_id, 10.0)
+        assert attendant.commit_reservation(kept.reservation_id, 10.0).liters == 10.0
+
+    def test_sales_release_expired_holds(self):
+        attendant = make_attendant()
+        kept = attendant.reserve_by_liters("Diesel", 50.0, timeout=300.0)
+        for _ in range(2):
+            attendant.reserve_by_liters("Petrol", 50.0, timeout=0.01)
+        time.sleep(0.05)
+        # Nobody reserved or committed since; the sale itself sweeps.
+        assert attendant.dispense_by_liters("Petrol", 50.0).liters == 50.0
+        petrol = attendant.dispenser.get_fuel("Petrol")
+        assert petrol.reserved_ml == 0
+        assert len(attendant.dispenser.reservations) == 1
+        assert attendant.dispenser.reservations.get(kept.reservation_id) == kept
+
+    def test_nozzle_and_batch_sales_release_expired_holds(self):
+        attendant = make_attendant()
+        attendant.reserve_by_liters("Petrol", 50.0, timeout=0.01)
+        attendant.reserve_by_liters("Petrol", 50.0, timeout=0.01)
+        time.sleep(0.05)
+        assert attendant.nozzle("Petrol").dispense_by_amount(6500.0).liters == 10.0
+        attendant.reserve_by_liters("Petrol", 50.0, timeout=0.01)
+        attendant.reserve_by_liters("Petrol", 40.0, timeout=0.01)
+        time.sleep(0.05)
+        [result] = attendant.dispense_batch([DispenseRequest("Petrol", liters=50.0)])
+        assert result.error is None
+        assert attendant.dispenser.get_fuel("Petrol").unreserved_ml == 40_000
+
+    def test_expiry_sweep_only_visits_that_fuel(self):
+        attendant = make_attendant()
+        dispenser = attendant.dispenser
+        book = dispenser.reservations
+        petrol, diesel = dispenser.get_fuel("Petrol"), dispenser.get_fuel("Diesel")
+        for _ in range(500):
+            settled = attendant.reserve_by_liters("Diesel", 1.0, timeout=5.0)
+            attendant.cancel_reservation(settled.reservation_id)
+        held = [attendant.reserve_by_liters("Diesel", 1.0, timeout=5.0) for _ in range(10)]
+        due = attendant.reserve_by_liters("Petrol", 1.0, timeout=1.0)
+        # Settled reservations do not pile up in the fuel's deadline heap.
+        assert len(book._deadlines[diesel]) <= 2 * len(held) + 64
+        now = book.clock()
+        assert dispenser.release_expired(diesel, now + 2.0) == []
+        assert dispenser.release_expired(petrol, now + 2.0) == [due]
+        assert dispenser.release_expired(diesel, now + 6.0) == held
+        assert diesel.reserved_ml == 0
+        assert len(book) == 0
+
+    def test_invalid_timeout(self):
+        with pytest.raises(ValueError, match="timeout must be positive"):
+            make_attendant().reserve_by_liters("Petrol", 10.0, timeout=0)
+        with pytest.raises(ValueError, match="not found"):
+            make_attendant().reserve_by_liters("Kerosene", 10.0)
+
+    def test_removed_fuel_closes_reservations(self):
+        attendant = make_attendant()
+        reservation = attendant.reserve_by_liters("Petrol", 10.0)
+        attendant.dispenser.remove_fuel("Petrol")
+        assert len(attendant.dispenser.reservations) == 0
+        with pytest.raises(ValueError, match="not found or expired"):
+            attendant.commit_reservation(reservation.reservation_id, 5.0)
+
+    def test_concurrent_pumps_never_oversell(self):
+        attendant = make_attendant(thread_safe=True)
+        settled = []
+
+        def pump():
+            for _ in range(10):
+                try:
+                    reservation = attendant.reserve_by_liters("Petrol", 5.0)
+                except ValueError:
+                    continue
+                settled.append(attendant.commit_reservation(reservation.reservation_id, 5.0))
+
+        threads = [threading.Thread(target=pump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        petrol = attendant.dispenser.get_fuel("Petrol")
+        assert len(settled) == 20
+        assert petrol.quantity == 0.0
+        assert petrol.reserved_ml == 0
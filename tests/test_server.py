@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant
+from mfd.client import StationClient, StationError, run_load
+from mfd.server import FRAME_HEADER, StationServer
+
+
+def make_server() -> StationServer:
+    dispenser = Dispenser()
+    attendant = FuelAttendant("John Doe", dispenser)
+    attendant.add_fuel("Petrol", 650.0, 1000.0)
+    attendant.add_fuel("Diesel", 700.0, 500.0)
+    return StationServer(dispenser, {"John Doe": attendant})
+
+
+def run_with_server(scenario):
+    async def runner():
+        server = make_server()
+        port = await server.start("127.0.0.1", 0)
+        try:
+            return await scenario(server, port)
+        finally:
+            await server.stop()
+
+    return asyncio.run(runner())
+
+
+class TestStationServer:
+    def test_handle_unknown_operation(self):
+        response = make_server().handle({"id": 7, "op": "explode"})
+        assert response == {"id": 7, "error": "Unknown operation 'explode'"}
+
+    def test_handle_missing_field(self):
+        response = make_server().handle({"id": 1, "op": "restock", "fuel_name": "Petrol"})
+        assert response["error"] == "Missing field 'liters'"
+
+    def test_key_error_in_an_operation_is_not_a_missing_field(self, monkeypatch):
+        server = make_server()
+
+        def broken(request):
+            raise KeyError("internal")
+
+        monkeypatch.setitem(server._operations, "fuels", broken)
+        response = server.handle({"id": 2, "op": "fuels"})
+        assert "Missing field" not in response["error"]
+
+    def test_attendants_are_capped(self):
+        dispenser = Dispenser()
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1000.0))
+        server = StationServer(dispenser, max_attendants=2)
+        for name in ("Pump 1", "Pump 2", "Pump 1"):
+            response = server.handle({"id": 3, "op": "summary", "attendant": name})
+            assert "result" in response
+        response = server.handle({"id": 4, "op": "summary", "attendant": "Pump 3"})
+        assert "Unknown attendant 'Pump 3'" in response["error"]
+        assert sorted(server._attendants) == ["Pump 1", "Pump 2"]
+
+    def test_handle_rejects_mistyped_requests(self):
+        server = make_server()
+        assert server.handle([1, 2]) == {"id": None, "error": "Request must be a JSON object"}
+        bad = [
+            ({"op": "restock", "fuel_name": 7, "liters": 5}, "Field 'fuel_name' must be a string"),
+            ({"op": "restock", "fuel_name": "Petrol", "liters": "5"}, "must be a number"),
+            ({"op": "restock", "fuel_name": "Petrol", "liters": True}, "must be a number"),
+            ({"op": "update_price", "fuel_name": "Petrol", "price": float("inf")}, "finite"),
+            ({"op": "list", "attendant": "John Doe", "cursor": 3}, "'cursor' must be a string"),
+            ({"op": 5}, "Field 'op' must be a string"),
+        ]
+        for request, error in bad:
+            response = server.handle({"id": 9, **request})
+            assert response["id"] == 9
+            assert error in response["error"]
+        response = server.handle({"id": 10, "op": "list", "attendant": "John Doe", "cursor": None})
+        assert response["result"]["transactions"] == []
+
+    def test_dispense_and_summary_over_tcp(self):
+        async def scenario(server, port):
+            client = await StationClient.connect("127.0.0.1", port)
+            try:
+                sale = await client.dispense_by_liters("John Doe", "Petrol", 10.0)
+                await client.dispense_by_amount("John Doe", "Diesel", 3500.0)
+                await client.update_price("Petrol", 700.0)
+                await client.restock("Diesel", 100.0)
+                summary = await client.summary("John Doe")
+                page = await client.list_transactions("John Doe", page_size=1)
+                return sale, summary, page
+            finally:
+                await client.close()
+
+        sale, summary, page = run_with_server(scenario)
+        assert sale["amount"] == 6500.0
+        assert sale["transaction_id"].startswith("TXN")
+        assert summary["total_transactions"] == 2
+        assert summary["by_fuel_type"]["Diesel"]["liters"] == 5.0
+        assert len(page["transactions"]) == 1
+        assert page["next_cursor"] == "1"
+
+    def test_errors_are_returned_to_client(self):
+        async def scenario(server, port):
+            client = await StationClient.connect("127.0.0.1", port)
+            try:
+                with pytest.raises(StationError, match="between 1 and 50"):
+                    await client.dispense_by_liters("John Doe", "Petrol", 100.0)
+                with pytest.raises(StationError, match="not found"):
+                    await client.restock("Kerosene", 10.0)
+                # The connection stays usable after an error.
+                return await client.summary("John Doe")
+            finally:
+                await client.close()
+
+        assert run_with_server(scenario)["total_transactions"] == 0
+
+    def test_oversized_frame_closes_connection(self):
+        async def scenario(server, port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(FRAME_HEADER.pack(1 << 30))
+            await writer.drain()
+            header = await reader.readexactly(FRAME_HEADER.size)
+            body = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+            remainder = await reader.read()
+            writer.close()
+            return body, remainder
+
+        body, remainder = run_with_server(scenario)
+        assert b"Bad frame" in body
+        assert remainder == b""
+
+    def test_many_concurrent_connections(self):
+        async def scenario(server, port):
+            report = await run_load("127.0.0.1", port, connections=50, requests_per_connection=2)
+            return report, server.attendant("Pump 0").get_transaction_summary()
+
+        report, pump_summary = run_with_server(scenario)
+        assert report["requests"] == 100
+        assert report["errors"] == 0
+        assert pump_summary["total_transactions"] == 2
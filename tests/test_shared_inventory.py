@@ -0,0 +1,159 @@
+import multiprocessing
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant, ids
+from mfd.ids import SnowflakeIdGenerator
+from mfd.shared_inventory import SharedFuel, SharedInventory
+
+
+@pytest.fixture
+def inventory():
+    with SharedInventory(capacity=4) as inventory:
+        yield inventory
+
+
+def pump(inventory: SharedInventory, number: int, results):
+    dispenser = Dispenser(inventory=inventory)
+    attendant = FuelAttendant(f"Pump {number}", dispenser)
+    sold = 0.0
+    while True:
+        try:
+            sold += attendant.dispense_by_liters("Petrol", 1.0).liters
+        except ValueError:
+            break
+    results.put(sold)
+    inventory.close()
+
+
+def sell_one(inventory: SharedInventory, results):
+    sale = FuelAttendant("Pump", Dispenser(inventory=inventory)).dispense_by_liters("Petrol", 1.0)
+    results.put(SnowflakeIdGenerator.split_id(sale._id_value)[1])
+    inventory.close()
+
+
+class TestSharedInventory:
+    def test_dispenser_uses_shared_slots(self, inventory):
+        dispenser = Dispenser(inventory=inventory)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 100.0))
+        fuel = dispenser.get_fuel("petrol")
+        assert isinstance(fuel, SharedFuel)
+        assert dispenser.thread_safe
+        assert dispenser.fuel_lock("Petrol") is fuel.lock
+
+        FuelAttendant("John Doe", dispenser).dispense_by_liters("Petrol", 10.0)
+        dispenser.update_fuel_price("Petrol", 700.0)
+        # A second dispenser attached to the same block sees the changes.
+        other = Dispenser(inventory=inventory).get_fuel("Petrol")
+        assert other.quantity == 90.0
+        assert other.price_per_liter == 700.0
+
+    def test_fuel_validation_still_applies(self, inventory):
+        fuel = inventory.add(Fuel("Diesel", 700.0, 5.0))
+        with pytest.raises(ValueError, match="Insufficient fuel"):
+            fuel.reduce_quantity(6.0)
+        with pytest.raises(ValueError):
+            fuel.price_per_liter = -1.0
+        fuel.add_quantity(5.0)
+        assert fuel.quantity == 10.0
+
+    def test_duplicate_and_full(self, inventory):
+        inventory.add(Fuel("Petrol", 650.0, 1.0))
+        with pytest.raises(ValueError, match="already exists"):
+            inventory.add(Fuel("PETROL", 650.0, 1.0))
+        for name in ("Diesel", "Kerosene", "Gas"):
+            inventory.add(Fuel(name, 1.0, 1.0))
+        with pytest.raises(ValueError, match="full"):
+            inventory.add(Fuel("Premium", 1.0, 1.0))
+
+    def test_remove_frees_the_slot(self, inventory):
+        dispenser = Dispenser(inventory=inventory)
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1.0))
+        assert dispenser.remove_fuel("Petrol")
+        assert inventory.fuels() == []
+        assert not inventory.remove("Petrol")
+
+    def test_stale_view_of_a_reused_slot_is_rejected(self, inventory):
+        first = Dispenser(inventory=inventory)
+        first.add_fuel(Fuel("Petrol", 650.0, 100.0))
+        second = Dispenser(inventory=inventory)
+        petrol = second.get_fuel("Petrol")
+        first.remove_fuel("Petrol")
+        first.add_fuel(Fuel("Kerosene", 900.0, 50.0))
+        assert petrol.removed
+        with pytest.raises(ValueError, match="'Petrol' has been removed"):
+            petrol.price_per_liter
+        attendant = FuelAttendant("John Doe", second)
+        with pytest.raises(ValueError, match="'Petrol' has been removed"):
+            attendant.dispense_by_liters("Petrol", 10.0)
+        with pytest.raises(ValueError, match="'Petrol' has been removed"):
+            attendant.nozzle("Petrol").dispense_by_liters(10.0)
+        assert list(second.get_available_fuels()) == ["kerosene"]
+        assert first.get_fuel("Kerosene").quantity == 50.0
+        assert not first.get_fuel("Kerosene").removed
+
+    def test_fuels_added_elsewhere_are_found(self, inventory):
+        first = Dispenser(inventory=inventory)
+        second = Dispenser(inventory=inventory)
+        first.add_fuel(Fuel("Petrol", 650.0, 100.0))
+        assert second.has_fuel("petrol")
+        assert FuelAttendant("John Doe", second).dispense_by_liters("Petrol", 10.0).amount == 6500.0
+        with pytest.raises(ValueError, match="already exists"):
+            second.add_fuel(Fuel("Petrol", 650.0, 1.0))
+
+        # Removed and added again by another process: the stale view is replaced.
+        first.remove_fuel("Petrol")
+        first.add_fuel(Fuel("Petrol", 700.0, 40.0))
+        petrol = second.get_fuel("Petrol")
+        assert not petrol.removed
+        assert petrol.quantity == 40.0
+        assert second.price_snapshot().price_kobo("Petrol") == 70000
+        assert second.remove_fuel("Petrol")
+        assert not first.has_fuel("Petrol")
+
+    def test_name_length_limit(self, inventory):
+        with pytest.raises(ValueError, match="longer than"):
+            inventory.add(Fuel("x" * 64, 1.0, 1.0))
+
+
+class TestSharedInventoryProcesses:
+    def test_no_oversell_across_processes(self, inventory):
+        stock = 2000.0
+        Dispenser(inventory=inventory).add_fuel(Fuel("Petrol", 650.0, stock))
+        results = multiprocessing.Queue()
+        pumps = [
+            multiprocessing.Process(target=pump, args=(inventory, number, results))
+            for number in range(4)
+        ]
+        for process in pumps:
+            process.start()
+        sold = [results.get(timeout=60) for _ in pumps]
+        for process in pumps:
+            process.join()
+        assert sum(sold) == stock
+        assert inventory.fuels()[0].quantity == 0.0
+
+    def test_every_attached_process_gets_its_own_node_id(self, inventory, monkeypatch):
+        for name in ("_default_generator", "_generator"):
+            monkeypatch.setattr(ids, name, getattr(ids, name))
+        Dispenser(inventory=inventory).add_fuel(Fuel("Petrol", 650.0, 100.0))
+        own = ids.assigned_node_id()
+        results = multiprocessing.Queue()
+        pumps = [
+            multiprocessing.Process(target=sell_one, args=(inventory, results))
+            for _ in range(3)
+        ]
+        for process in pumps:
+            process.start()
+        node_ids = [results.get(timeout=60) for _ in pumps]
+        for process in pumps:
+            process.join()
+        assert len(set(node_ids + [own])) == 4
+
+    def test_a_held_node_id_is_not_taken_twice(self, inventory, monkeypatch):
+        for name in ("_default_generator", "_generator"):
+            monkeypatch.setattr(ids, name, getattr(ids, name))
+        inventory._nodes[5] = 1
+        ids.use_node_id(5)
+        with pytest.raises(ValueError, match="Node ID 5 is already held"):
+            Dispenser(inventory=inventory)
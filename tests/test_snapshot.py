@@ -0,0 +1,172 @@
+import os
+
+import pytest
+
+from mfd import FuelAttendant
+from mfd.journal import recover as replay_journal
+from mfd.snapshot import (
+    Snapshotter,
+    list_snapshots,
+    read_snapshot,
+    recover,
+    take_snapshot,
+)
+
+
+def open_station(tmp_path):
+    journal_path = str(tmp_path / "station.journal")
+    snapshot_dir = str(tmp_path / "snapshots")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    dispenser, attendants, journal = recover(journal_path, snapshot_dir, sync_interval=None)
+    return journal_path, snapshot_dir, dispenser, attendants, journal
+
+
+def sell(attendant: FuelAttendant, count: int):
+    for _ in range(count):
+        attendant.dispense_by_liters("Petrol", 10.0)
+
+
+class TestSnapshot:
+    def test_snapshot_round_trip(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        sell(attendant, 3)
+        path = take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        journal.close()
+
+        state = read_snapshot(path)
+        assert state["journal_offset"] == os.path.getsize(journal_path)
+        assert state["fuels"] == [["Petrol", 650.0, 970.0]]
+        assert state["attendants"]["John Doe"] == attendant.get_transaction_summary()
+
+    def test_recover_replays_only_the_tail(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        sell(attendant, 5)
+        take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        sell(attendant, 2)
+        attendant.update_fuel_price("Petrol", 700.0)
+        sell(attendant, 1)
+        expected_summary = attendant.get_transaction_summary()
+        journal.close()
+
+        dispenser, attendants, journal = recover(journal_path, snapshot_dir, sync_interval=None)
+        journal.close()
+        fuel = dispenser.get_fuel("Petrol")
+        assert fuel.quantity == 920.0
+        assert fuel.price_per_liter == 700.0
+        recovered = attendants["John Doe"]
+        assert recovered.get_transaction_summary() == expected_summary
+        # By default only the three sales after the snapshot are replayed
+        # into the ledger; older history is dropped, totals are not.
+        assert len(recovered.show_all_transactions()) == 3
+        assert len(list(recovered.query_transactions(fuel_name="Petrol"))) == 3
+
+    def test_recover_with_history_keeps_older_sales(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        sell(attendant, 5)
+        take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        attendant.restock_fuel("Petrol", 50.0)
+        sell(attendant, 2)
+        expected = [t.transaction_id for t in attendant.show_all_transactions()]
+        expected_summary = attendant.get_transaction_summary()
+        journal.close()
+
+        dispenser, attendants, journal = recover(
+            journal_path, snapshot_dir, history=True, sync_interval=None
+        )
+        journal.close()
+        recovered = attendants["John Doe"]
+        assert [t.transaction_id for t in recovered.show_all_transactions()] == expected
+        assert recovered.get_transaction_summary() == expected_summary
+        # Older sales are history only; their stock was already in the snapshot.
+        assert dispenser.get_fuel("Petrol").quantity == 980.0
+
+    def test_snapshot_and_full_replay_agree(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        attendant.add_fuel("Diesel", 700.0, 1000.0)
+        sell(attendant, 4)
+        take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        attendant.dispense_by_amount("Diesel", 7000.0)
+        attendant.restock_fuel("Petrol", 100.0)
+        journal.close()
+
+        from_snapshot, snapshot_attendants, journal = recover(
+            journal_path, snapshot_dir, sync_interval=None
+        )
+        journal.close()
+        from_journal, journal_attendants, journal = replay_journal(
+            journal_path, sync_interval=None
+        )
+        journal.close()
+        for name in ("Petrol", "Diesel"):
+            assert from_snapshot.get_fuel(name).quantity == from_journal.get_fuel(name).quantity
+        assert (
+            snapshot_attendants["John Doe"].get_transaction_summary()
+            == journal_attendants["John Doe"].get_transaction_summary()
+        )
+
+    def test_old_snapshots_are_pruned(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        for _ in range(4):
+            sell(attendant, 1)
+            take_snapshot(snapshot_dir, dispenser, attendants, journal, keep=2)
+        journal.close()
+        snapshots = list_snapshots(snapshot_dir)
+        assert len(snapshots) == 2
+        assert read_snapshot(snapshots[0])["fuels"] == [["Petrol", 650.0, 960.0]]
+
+    def test_corrupt_snapshot_falls_back_to_older_one(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        sell(attendant, 1)
+        take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        sell(attendant, 1)
+        newest = take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        sell(attendant, 1)
+        journal.close()
+        with open(newest, "r+b") as snapshot_file:
+            snapshot_file.seek(-1, os.SEEK_END)
+            snapshot_file.write(b"\x00")
+
+        with pytest.raises(ValueError, match="corrupt"):
+            read_snapshot(newest)
+        dispenser, attendants, journal = recover(journal_path, snapshot_dir, sync_interval=None)
+        journal.close()
+        assert dispenser.get_fuel("Petrol").quantity == 970.0
+        assert attendants["John Doe"].get_transaction_summary()["total_transactions"] == 3
+
+    def test_background_snapshotter(self, tmp_path):
+        journal_path, snapshot_dir, dispenser, attendants, journal = open_station(tmp_path)
+        attendant = attendants["John Doe"] = FuelAttendant("John Doe", dispenser)
+        attendant.add_fuel("Petrol", 650.0, 1000.0)
+        snapshotter = Snapshotter(snapshot_dir, dispenser, attendants, journal, interval=3600)
+        snapshotter.start()
+        sell(attendant, 2)
+        path = snapshotter.snapshot()
+        snapshotter.stop()
+        journal.close()
+        assert read_snapshot(path)["fuels"] == [["Petrol", 650.0, 980.0]]
+
+    def test_snapshots_need_a_thread_safe_dispenser(self, tmp_path):
+        journal_path = str(tmp_path / "station.journal")
+        snapshot_dir = str(tmp_path / "snapshots")
+        dispenser, attendants, journal = recover(
+            journal_path, snapshot_dir, thread_safe=False, sync_interval=None
+        )
+        assert not dispenser.thread_safe
+        with pytest.raises(ValueError, match="thread-safe"):
+            take_snapshot(snapshot_dir, dispenser, attendants, journal)
+        with pytest.raises(ValueError, match="thread-safe"):
+            Snapshotter(snapshot_dir, dispenser, attendants, journal)
+        journal.close()
+        assert list_snapshots(snapshot_dir) == []
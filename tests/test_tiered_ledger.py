@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from mfd import Dispenser, Fuel, FuelAttendant, Transaction
+from mfd.ledger import TransactionLedger, to_micros
+from mfd.tiered_ledger import TieredLedger, read_segment
+
+START = datetime(2026, 3, 1, 8, 0)
+
+
+def make_transaction(i: int, **kwargs) -> Transaction:
+    fields = dict(
+        fuel_name=("Petrol", "Diesel", "Kerosene")[i % 3],
+        liters=10.0 + i % 7,
+        amount=6500.0 + i,
+        transaction_type="by_liters" if i % 2 else "by_amount",
+        attendant_name="John Doe",
+        timestamp=START + timedelta(minutes=i),
+    )
+    fields.update(kwargs)
+    return Transaction(**fields)
+
+
+def fill(ledger, count: int, **kwargs):
+    reference = TransactionLedger()
+    for i in range(count):
+        transaction = make_transaction(i, **kwargs)
+        ledger.append(transaction)
+        reference.append(transaction)
+    return reference
+
+
+def small_ledger(directory, **kwargs) -> TieredLedger:
+    options = dict(memory_budget=32 * 1024, segment_rows=100)
+    options.update(kwargs)
+    return TieredLedger(str(directory), **options)
+
+
+class TestTieredLedger:
+    def test_seals_old_rows_to_disk(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        fill(ledger, 2000)
+        assert len(ledger) == 2000
+        assert ledger.sealed_rows > 0
+        assert sum(segment.rows for segment in ledger.segments) == ledger.sealed_rows
+        assert len(list(tmp_path.glob("segment-*.mfdseg"))) == len(ledger.segments)
+        first = ledger.segments[0]
+        assert (first.first_row, first.rows) == (0, 100)
+        assert first.in_time_order
+
+    def test_rows_read_across_tiers(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        reference = fill(ledger, 1500)
+        assert list(ledger) == list(reference)
+        assert ledger[0].to_dict() == reference[0].to_dict()
+        assert ledger[-1] == reference[-1]
+        with pytest.raises(IndexError):
+            ledger[-1501]
+
+    def test_query_across_tiers(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        reference = fill(ledger, 1500)
+        start, end = START + timedelta(minutes=250), START + timedelta(minutes=1300)
+        for filters in (
+            {},
+            {"start": start, "end": end},
+            {"start": start, "fuel_name": "petrol"},
+            {"end": end, "transaction_type": "by_amount", "min_liters": 14.0},
+        ):
+            assert list(ledger.query(**filters)) == list(reference.query(**filters))
+
+    def test_query_skips_segments_outside_window(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        fill(ledger, 1500)
+        for segment in ledger.segments[1:]:
+            with open(segment.path, "wb") as f:
+                f.write(b"corrupt")
+        window = list(ledger.query(end=START + timedelta(minutes=50)))
+        assert len(window) == 50
+
+    def test_positions_and_cursors(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        reference = fill(ledger, 1200)
+        for position in (0, 99, 100, 750, 1199):
+            assert ledger.row_at_position(position) == reference.row_at_position(position)
+        for minutes in (-5, 0, 150, 1000, 5000):
+            timestamp = START + timedelta(minutes=minutes)
+            assert ledger.time_position(timestamp) == reference.time_position(timestamp)
+
+    def test_out_of_order_rows_within_a_segment(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        for i in range(600):
+            # Pairs arrive swapped.
+            ledger.append(make_transaction(i + 1 if i % 2 == 0 else i - 1))
+        assert not ledger.segments[0].in_time_order
+        positions = [ledger[ledger.row_at_position(p)].timestamp for p in range(600)]
+        assert positions == sorted(positions)
+
+    def test_sales_columns_across_tiers(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        reference = fill(ledger, 900)
+        start = START + timedelta(minutes=150)
+        stamps, volumes, codes, values = ledger.sales_columns(start)
+        assert len(stamps) == len(volumes) == len(codes)
+        rows = [
+            (volume, values[code])
+            for stamp, volume, code in zip(stamps, volumes, codes)
+            if stamp >= to_micros(start)
+        ]
+        assert rows == [
+            (transaction.milliliters, transaction.fuel_name)
+            for transaction in reference.query(start=start)
+        ]
+
+    def test_custom_ids_survive_sealing(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        ledger.append(make_transaction(0, transaction_id="CUSTOM-1"))
+        fill(ledger, 1000)
+        assert ledger.sealed_rows > 0
+        assert ledger[0].transaction_id == "CUSTOM-1"
+        assert ledger[1].transaction_id.startswith("TXN")
+
+    def test_reopen_keeps_sealed_history(self, tmp_path):
+        ledger = small_ledger(tmp_path)
+        reference = fill(ledger, 1000)
+        sealed = ledger.sealed_rows
+        reopened = small_ledger(tmp_path)
+        assert len(reopened) == sealed
+        assert list(reopened) == list(reference)[:sealed]
+        row = reopened.append(make_transaction(5000))
+        assert row == sealed
+
+    def test_lzma_segments(self, tmp_path):
+        ledger = small_ledger(tmp_path, compression="lzma")
+        reference = fill(ledger, 500)
+        assert ledger.segments
+        assert list(read_segment(ledger.segments[0].path)) == list(reference)[:100]
+
+    def test_memory_stays_within_budget(self, tmp_path):
+        budget = 128 * 1024
+        ledger = small_ledger(tmp_path, memory_budget=budget, segment_rows=200)
+        for i in range(20_000):
+            ledger.append(make_transaction(i))
+            if i % 1000 == 0:
+                assert ledger.nbytes() <= budget
+        list(ledger.query(start=START, end=START + timedelta(minutes=5000)))
+        assert ledger.nbytes() <= budget
+
+    def test_invalid_arguments(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown compression"):
+            TieredLedger(str(tmp_path), compression="gzip")
+        with pytest.raises(ValueError, match="at least one row"):
+            TieredLedger(str(tmp_path), segment_rows=0)
+        with pytest.raises(ValueError, match="must be positive"):
+            TieredLedger(str(tmp_path), memory_budget=0)
+        (tmp_path / "segment-000000000000.mfdseg").write_bytes(b"nope")
+        with pytest.raises(ValueError, match="not a ledger segment"):
+            TieredLedger(str(tmp_path))
+
+
+class TestAttendantWithTieredLedger:
+    def test_history_reads_across_tiers(self, tmp_path):
+        dispenser = Dispenser()
+        dispenser.add_fuel(Fuel("Petrol", 650.0, 1e6))
+        ledger = small_ledger(tmp_path)
+        attendant = FuelAttendant("John Doe", dispenser, ledger=ledger)
+        sold = [attendant.dispense_by_liters("Petrol", 10.0) for _ in range(1000)]
+        assert ledger.sealed_rows > 0
+        assert attendant.show_all_transactions() == sold
+        page = attendant.list_transactions(page_size=5, cursor="10")
+        assert page.transactions == sold[10:15]
+        assert list(attendant.query_transactions(fuel_name="Petrol")) == sold
+        summary = attendant.get_transaction_summary()
+        assert summary["total_transactions"] == 1000
+        assert summary["total_liters"] == 10_000.0
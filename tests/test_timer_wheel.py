@@ -0,0 +1,54 @@
+import pytest
+
+from mfd.timer_wheel import TimerWheel
+
+
+class TestTimerWheel:
+    def test_fires_at_or_after_deadline(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.schedule("a", 2.5)
+        wheel.schedule("b", 3.0)
+        assert wheel.advance(2.9) == []
+        assert wheel.advance(3.0) == ["a", "b"]
+        assert len(wheel) == 0
+
+    def test_cancel(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.schedule("a", 2.0)
+        assert "a" in wheel
+        assert wheel.cancel("a")
+        assert not wheel.cancel("a")
+        assert wheel.advance(10.0) == []
+
+    def test_reschedule_moves_deadline(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.schedule("a", 2.0)
+        wheel.schedule("a", 5.0)
+        assert wheel.advance(4.0) == []
+        assert wheel.advance(5.0) == ["a"]
+
+    def test_deadline_beyond_one_turn_waits_its_round(self):
+        wheel = TimerWheel(tick=1.0, slots=4)
+        wheel.schedule("later", 10.0)
+        wheel.schedule("soon", 2.0)
+        assert wheel.advance(3.0) == ["soon"]
+        assert wheel.advance(7.0) == []
+        assert wheel.advance(10.0) == ["later"]
+
+    def test_long_gap_sweeps_every_slot_once(self):
+        wheel = TimerWheel(tick=1.0, slots=4)
+        for deadline in range(1, 20):
+            wheel.schedule(deadline, float(deadline))
+        assert sorted(wheel.advance(100.0)) == list(range(1, 20))
+
+    def test_past_deadline_fires_on_next_tick(self):
+        wheel = TimerWheel(tick=1.0, slots=4, start=50.0)
+        wheel.schedule("late", 10.0)
+        assert wheel.advance(50.5) == []
+        assert wheel.advance(51.0) == ["late"]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="Tick must be positive"):
+            TimerWheel(tick=0)
+        with pytest.raises(ValueError, match="at least one slot"):
+            TimerWheel(slots=0)
@@ -1,8 +1,12 @@
 
 
-from datetime import datetime
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
 
 from mfd import Transaction
+from mfd.ledger import to_micros
 
 
 class TestTransaction:
@@ -126,3 +130,54 @@ class TestTransaction:
         assert "Transaction" in repr_str
         assert "TEST123" in repr_str
         assert "Petrol" in repr_str
+
+    def test_from_fixed_point(self):
+        txn = Transaction.from_fixed_point("Petrol", 1538, 99970, "by_amount", "John Doe")
+        assert txn.liters == 1.538
+        assert txn.amount == 999.7
+        assert (txn.milliliters, txn.kobo) == (1538, 99970)
+        assert txn == Transaction(
+            "Petrol", 1.538, 999.7, "by_amount", "John Doe",
+            transaction_id=txn.transaction_id, timestamp=txn.timestamp,
+        )
+
+    def test_compact_record(self):
+        transaction = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        assert not hasattr(transaction, "__dict__")
+        with pytest.raises(AttributeError):
+            transaction.liters = 20.0
+        with pytest.raises(AttributeError):
+            transaction.note = "extra"
+        name = "".join(["Pet", "rol"])
+        other = Transaction(name, 10.0, 6500.0, "by_liters", "John Doe")
+        assert other.fuel_name is transaction.fuel_name
+
+    def test_lazy_timestamp(self):
+        before = datetime.now()
+        transaction = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        micros = transaction._micros
+        assert transaction._timestamp is None
+        timestamp = transaction.timestamp
+        assert before - timedelta(seconds=1) <= timestamp <= datetime.now()
+        assert transaction.timestamp is timestamp
+        assert micros == to_micros(timestamp) == transaction._micros
+
+    def test_pickle_round_trip(self):
+        transaction = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        restored = pickle.loads(pickle.dumps(transaction))
+        assert restored == transaction
+        assert restored.timestamp == transaction.timestamp
+
+    def test_attributes_cannot_be_changed(self):
+        transaction = Transaction("Petrol", 10.0, 6500.0, "by_liters", "John Doe")
+        with pytest.raises(AttributeError, match="immutable"):
+            transaction._fuel_name = "Diesel"
+        with pytest.raises(AttributeError, match="immutable"):
+            transaction._kobo = 1
+        with pytest.raises(AttributeError, match="immutable"):
+            del transaction._milliliters
+        with pytest.raises(AttributeError):
+            transaction.fuel_name = "Diesel"
+        assert transaction.fuel_name == "Petrol"
+        assert transaction.amount == 6500.0
+        assert transaction.liters == 10.0
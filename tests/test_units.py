@@ -0,0 +1,42 @@
+import pytest
+
+from mfd.units import (
+    cost_in_kobo,
+    from_kobo,
+    from_milliliters,
+    milliliters_for,
+    to_kobo,
+    to_milliliters,
+)
+
+
+class TestUnits:
+    def test_round_trip(self):
+        assert to_kobo(650.1) == 65010
+        assert from_kobo(65010) == 650.1
+        assert to_milliliters(1.538) == 1538
+        assert from_milliliters(1538) == 1.538
+
+    def test_float_noise_is_rounded_away(self):
+        assert to_kobo(0.1 + 0.2) == 30
+        assert to_milliliters(0.1 + 0.2) == 300
+
+    def test_non_finite_values_are_rejected(self):
+        for value in (float("inf"), float("-inf"), float("nan"), 1e308):
+            with pytest.raises(ValueError, match="Amount must be a finite number"):
+                to_kobo(value)
+            with pytest.raises(ValueError, match="Volume must be a finite number"):
+                to_milliliters(value)
+
+    def test_cost_rounds_half_up(self):
+        assert cost_in_kobo(10_000, 65_000) == 650_000
+        # 1.538 L at 650.00/L is 999.70
+        assert cost_in_kobo(1538, 65_000) == 99_970
+        # 0.003 L at 0.50/L is 0.15 kobo; 0.03 L is 1.5 kobo.
+        assert cost_in_kobo(3, 50) == 0
+        assert cost_in_kobo(30, 50) == 2
+
+    def test_milliliters_for_never_exceeds_amount(self):
+        milliliters = milliliters_for(100_000, 65_000)
+        assert milliliters == 1538
+        assert cost_in_kobo(milliliters, 65_000) <= 100_000